@@ -0,0 +1,52 @@
+"""
+Email login.
+
+Emails are matched case-insensitively on LOWER(email), which the
+accounts_user_email_lower_idx index covers.
+
+The user row is deliberately not cached: it carries ``password``,
+``is_active`` and ``is_staff``, and a copy that outlives a password change,
+deactivation or demotion made elsewhere (changepassword, a shell, a
+QuerySet.update()) would keep old sessions and admin access alive. Sessions
+themselves use the cached_db engine; the user is one primary-key query.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models.functions import Lower
+
+MAX_EMAIL_MATCHES = 5
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def users_with_email(email):
+    return get_user_model()._default_manager.alias(email_lower=Lower('email')).filter(
+        email_lower=normalize_email(email)
+    )
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticate with ``email=`` (or an email typed into a username field);
+    plain usernames fall through to the standard ModelBackend check.
+    """
+
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        if email is None and username and '@' in username:
+            email = username
+        if email is None:
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        if not email or password is None:
+            return None
+
+        candidates = list(users_with_email(email).order_by('id')[:MAX_EMAIL_MATCHES])
+        if not candidates:
+            # Run the hasher anyway so unknown emails take as long as wrong passwords
+            get_user_model()().set_password(password)
+            return None
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        # auth.User belongs to Django, so the index on the lookup used by
+        # accounts.backends.users_with_email is created here in SQL
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS accounts_user_email_lower_idx ON auth_user (LOWER(email))',
+            'DROP INDEX IF EXISTS accounts_user_email_lower_idx',
+        ),
+    ]
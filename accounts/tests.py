@@ -1,3 +1,26 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+
+class SessionInvalidationTests(TestCase):
+    """Changes made without save() signals must still reach open sessions"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('member@example.com', 'member@example.com', 'old-password')
+        self.assertTrue(self.client.login(email='member@example.com', password='old-password'))
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+
+    def test_password_changed_by_update_logs_old_session_out(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('new-password'))
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/login/'))
+
+    def test_deactivation_by_update_logs_session_out(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/dashboard/').status_code, 302)
+
+    def test_email_login_is_case_insensitive(self):
+        self.client.logout()
+        self.assertTrue(self.client.login(email='Member@Example.COM', password='old-password'))
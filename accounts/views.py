@@ -6,6 +6,7 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.views.decorators.csrf import csrf_protect
 from django.contrib.auth.decorators import login_required
+from .backends import normalize_email, users_with_email
 from .email_notifications import send_login_notification, send_signup_notification
 
 @csrf_protect
@@ -17,16 +18,8 @@ def login_view(request):
         email = request.POST.get('email')
         password = request.POST.get('password')
 
-        # Try to find user by email
-        try:
-            user = User.objects.get(email=email)
-            username = user.username
-        except User.DoesNotExist:
-            messages.error(request, 'Invalid email or password.')
-            return render(request, 'accounts/login.html')
-
-        # Authenticate user
-        user = authenticate(request, username=username, password=password)
+        # Authenticate user by email (case-insensitive, see accounts.backends)
+        user = authenticate(request, email=email, password=password)
 
         if user is not None:
             login(request, user)
@@ -52,7 +45,7 @@ def signup_view(request):
         return redirect('dashboard')
 
     if request.method == 'POST':
-        email = request.POST.get('email')
+        email = normalize_email(request.POST.get('email'))
         password = request.POST.get('password')
         first_name = request.POST.get('first_name')
         last_name = request.POST.get('last_name')
@@ -63,7 +56,7 @@ def signup_view(request):
             return render(request, 'accounts/signup.html')
 
         # Check if user already exists
-        if User.objects.filter(email=email).exists():
+        if users_with_email(email).exists():
             messages.error(request, 'A user with this email already exists.')
             return render(request, 'accounts/signup.html')
 
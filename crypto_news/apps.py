@@ -5,3 +5,6 @@ class CryptoNewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'crypto_news'
     verbose_name = 'Crypto News Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
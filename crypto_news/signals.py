@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import CryptoNews
+from .versioning import bump_news_version
+
+
+@receiver([post_save, post_delete], sender=CryptoNews)
+def invalidate_news_pages(sender, **kwargs):
+    """Any news change invalidates cached pages that list news"""
+    bump_news_version()
@@ -0,0 +1,12 @@
+"""Content version for crypto news, bumped on every CryptoNews change"""
+from pipsmade.page_cache import get_content_version, bump_content_version
+
+NEWS_VERSION_KEY = 'crypto_news:version'
+
+
+def get_news_version():
+    return get_content_version(NEWS_VERSION_KEY)
+
+
+def bump_news_version():
+    bump_content_version(NEWS_VERSION_KEY)
@@ -1,6 +1,10 @@
 from django.shortcuts import render
 from django.views.generic import ListView, DetailView
+from django.utils.decorators import method_decorator
+from pipsmade.db_router import use_read_replica
+from pipsmade.page_cache import cache_anonymous_page
 from .models import CryptoNews
+from .versioning import get_news_version
 
 def get_latest_crypto_news(limit=3):
     """Get latest crypto news for display"""
@@ -8,6 +12,8 @@ def get_latest_crypto_news(limit=3):
         is_active=True
     ).order_by('-published_at', '-priority')[:limit]
 
+@method_decorator(cache_anonymous_page(get_news_version), name='dispatch')
+@method_decorator(use_read_replica, name='dispatch')
 class CryptoNewsListView(ListView):
     model = CryptoNews
     template_name = 'crypto_news/news_list.html'
@@ -25,6 +31,7 @@ class CryptoNewsListView(ListView):
         context['page_title'] = 'Crypto Market News'
         return context
 
+@method_decorator(use_read_replica, name='dispatch')
 class CryptoNewsDetailView(DetailView):
     model = CryptoNews
     template_name = 'crypto_news/news_detail.html'
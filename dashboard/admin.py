@@ -1,3 +1,74 @@
+import os
+
 from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Profiles captured with ?_profile=1; see dashboard.profiling"""
+    list_display = [
+        'created_at', 'method', 'path', 'view_name', 'user', 'status_code',
+        'duration_ms', 'query_count', 'downloads'
+    ]
+    list_filter = ['view_name', 'method', 'status_code']
+    search_fields = ['path', 'view_name', 'user__username']
+    readonly_fields = [
+        'user', 'method', 'path', 'view_name', 'status_code', 'duration_ms',
+        'query_count', 'created_at', 'downloads'
+    ]
+    ordering = ['-created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}" target="_blank">Flame graph</a> | <a href="{}">.prof</a>',
+            reverse('admin:dashboard_requestprofile_flamegraph', args=[obj.pk]),
+            reverse('admin:dashboard_requestprofile_download', args=[obj.pk]),
+        )
+    downloads.short_description = 'Profile'
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<int:profile_id>/flamegraph/',
+                self.admin_site.admin_view(self.flamegraph_view),
+                name='dashboard_requestprofile_flamegraph',
+            ),
+            path(
+                '<int:profile_id>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='dashboard_requestprofile_download',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def _open(self, request, profile_id, attribute):
+        if not self.has_view_permission(request):
+            raise Http404
+        profile = get_object_or_404(RequestProfile, pk=profile_id)
+        file_path = getattr(profile, attribute)
+        if not os.path.exists(file_path):
+            raise Http404('Profile file is missing')
+        return open(file_path, 'rb')
+
+    def flamegraph_view(self, request, profile_id):
+        return FileResponse(self._open(request, profile_id, 'html_path'), content_type='text/html; charset=utf-8')
 
-# Register your models here.
+    def download_view(self, request, profile_id):
+        return FileResponse(
+            self._open(request, profile_id, 'prof_path'),
+            as_attachment=True,
+            filename=f'profile-{profile_id}.prof',
+            content_type='application/octet-stream',
+        )
@@ -0,0 +1,381 @@
+"""
+HTTP load test of the main user flows against a running server.
+
+Start the server the way production does (``./start-robust.sh``, gunicorn on
+``$PORT``) from the same checkout and database, seed it with
+``generate_synthetic_data``, then run ``manage.py run_load_test``.
+
+Each virtual investor logs in and repeats a fixed script: dashboard,
+transaction history pages, deposit form and submission, calculator and
+projection, investment creation, and support search. Virtual admins page
+the admin transaction list and approve the deposits the investors
+submitted during the run. Every request goes over a real socket
+(``http.client``, keep-alive when the server allows it, no redirects
+followed), so the timings include the whole server stack.
+
+Runs are reproducible: each virtual user draws from its own
+``random.Random`` seeded from ``--seed``, and runs are sized in iterations
+rather than wall time. Results are written as sorted JSON (p50/p95/p99,
+mean, max, throughput and errors per endpoint), ready to diff against a
+run from another commit.
+
+The database is only read directly to pick fixtures (users, plans,
+wallets, deposits awaiting approval); everything measured goes over HTTP.
+"""
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from http.client import HTTPConnection, HTTPException, HTTPSConnection, RemoteDisconnected
+from http.cookies import CookieError, SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from investments.models import InvestmentPlan
+from transactions.models import CryptoWallet, DepositRequest
+
+SEARCH_TERMS = ['deposit', 'withdrawal', 'password', 'investment', 'verification', 'wallet']
+TRANSACTION_PAGES = 3
+PERCENTILES = (50, 95, 99)
+STALE_CONNECTION_ERRORS = (RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes
+    headers: object
+
+
+class HttpSession:
+    """One browser: a persistent connection and a cookie jar"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        connection_class = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+        self.base_url = base_url.rstrip('/')
+        self.host = parts.netloc
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.cookies = {}
+        self._reused = False
+
+    def request(self, method, path, data=None, ajax=False):
+        headers = {
+            'Host': self.host,
+            'User-Agent': 'pipsmade-loadtest',
+            'Referer': self.base_url + path,
+        }
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = None
+        if method == 'POST':
+            body = urlencode(data or {})
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.cookies.get('csrftoken', '')
+        if ajax:
+            headers['X-Requested-With'] = 'XMLHttpRequest'
+        try:
+            response, content = self._send(method, path, body, headers)
+        except STALE_CONNECTION_ERRORS:
+            # The server closed an idle keep-alive connection as we reused
+            # it; browsers retry these once on a fresh connection
+            if not self._reused:
+                raise
+            response, content = self._send(method, path, body, headers)
+        self._store_cookies(response.headers.get_all('Set-Cookie') or [])
+        return Response(response.status, content, response.headers)
+
+    def _send(self, method, path, body, headers):
+        self._reused = self.connection.sock is not None
+        try:
+            self.connection.request(method, path, body, headers)
+            response = self.connection.getresponse()
+            return response, response.read()
+        except (OSError, HTTPException):
+            # Reconnect on the next request
+            self.connection.close()
+            raise
+
+    def _store_cookies(self, set_cookie_headers):
+        for header in set_cookie_headers:
+            cookie = SimpleCookie()
+            try:
+                cookie.load(header)
+            except CookieError:
+                continue
+            for name, morsel in cookie.items():
+                if morsel['max-age'] == '0' or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+
+    def close(self):
+        self.connection.close()
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.statuses = defaultdict(Counter)
+
+    def record(self, name, milliseconds, status, ok):
+        with self._lock:
+            self.latencies[name].append(milliseconds)
+            self.statuses[name][str(status)] += 1
+            if not ok:
+                self.errors[name] += 1
+
+    def summary(self, seconds):
+        endpoints = {}
+        for name, values in self.latencies.items():
+            endpoints[name] = summarize(values, seconds, self.errors[name], self.statuses[name])
+        all_values = [value for values in self.latencies.values() for value in values]
+        total = summarize(all_values, seconds, sum(self.errors.values()), Counter())
+        total.pop('statuses')
+        return endpoints, total
+
+
+class NullRecorder:
+    """Used for warm-up iterations"""
+
+    def record(self, name, milliseconds, status, ok):
+        pass
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(values, seconds, errors, statuses):
+    values = sorted(values)
+    summary = {
+        'count': len(values),
+        'errors': errors,
+        'mean_ms': round(sum(values) / len(values), 2) if values else 0.0,
+        'max_ms': round(values[-1], 2) if values else 0.0,
+        'rps': round(len(values) / seconds, 2) if seconds else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+    }
+    for percent in PERCENTILES:
+        summary[f'p{percent}_ms'] = round(percentile(values, percent), 2)
+    return summary
+
+
+@dataclass
+class Fixtures:
+    investors: list
+    admins: list
+    plans: list
+    wallets: list
+
+
+def load_fixtures(prefix, investors, admins):
+    """Synthetic users (see generate_synthetic_data), plans and wallets to drive the flows"""
+    users = User.objects.filter(username__startswith=prefix, is_active=True).order_by('id')
+    return Fixtures(
+        investors=list(users.filter(is_staff=False).values_list('id', 'email')[:investors]),
+        admins=list(users.filter(is_staff=True).values_list('id', 'email')[:admins]),
+        plans=list(InvestmentPlan.objects.filter(is_active=True).values_list('id', 'min_investment').order_by('id')),
+        wallets=list(CryptoWallet.objects.filter(is_active=True).values_list('id', 'minimum_deposit').order_by('id')),
+    )
+
+
+class VirtualUser:
+    def __init__(self, runner, index, user_id, email):
+        self.runner = runner
+        self.user_id = user_id
+        self.email = email
+        self.rng = random.Random(f'{runner.seed}:{index}')
+        self.session = HttpSession(runner.base_url, runner.timeout)
+        self.recorder = runner.recorder
+
+    def step(self, name, method, path, data=None, ajax=False, expect=(200,), check=None):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, path, data, ajax)
+        except (OSError, HTTPException):
+            self.recorder.record(name, (time.perf_counter() - started) * 1000, 'error', False)
+            return None
+        elapsed = (time.perf_counter() - started) * 1000
+        ok = response.status in expect
+        if ok and check is not None:
+            try:
+                ok = check(response)
+            except ValueError:
+                ok = False
+        self.recorder.record(name, elapsed, response.status, ok)
+        if self.runner.server is None:
+            self.runner.server = response.headers.get('Server', '')
+        return response
+
+    def login(self):
+        self.step('login_form', 'GET', '/login/')
+        response = self.step(
+            'login', 'POST', '/login/', {'email': self.email, 'password': self.runner.password}, expect=(302,)
+        )
+        return response is not None and response.status == 302
+
+    def run(self, iterations, warmup):
+        try:
+            if not self.login():
+                return
+            measured = self.recorder
+            self.recorder = NullRecorder()
+            for iteration in range(warmup + iterations):
+                if iteration == warmup:
+                    self.recorder = measured
+                self.iteration()
+                if self.runner.think_time:
+                    time.sleep(self.runner.think_time)
+        finally:
+            self.session.close()
+            connection.close()
+
+
+class Investor(VirtualUser):
+    def iteration(self):
+        fixtures = self.runner.fixtures
+        self.step('dashboard', 'GET', '/dashboard/')
+        for page in range(1, TRANSACTION_PAGES + 1):
+            self.step('transactions_page', 'GET', f'/transactions/?page={page}')
+
+        if fixtures.wallets:
+            wallet_id, minimum = self.rng.choice(fixtures.wallets)
+            self.step('deposit_form', 'GET', '/transactions/deposit/')
+            self.step('deposit_submit', 'POST', '/transactions/deposit/', {
+                'crypto_wallet': wallet_id,
+                'amount': str(max(minimum, 1) * self.rng.randint(1, 5)),
+                'transaction_hash': f'{self.rng.getrandbits(256):064x}',
+                'sender_address': f'{self.rng.getrandbits(160):040x}',
+            }, expect=(302,))
+
+        if fixtures.plans:
+            plan_id, minimum = self.rng.choice(fixtures.plans)
+            amount = minimum * self.rng.randint(1, 3)
+            query = urlencode({'plan_id': plan_id, 'amount': amount})
+            self.step('calculator', 'GET', f'/investments/calculator/?{query}')
+            self.step('calculator_projection', 'GET', f'/investments/calculator/projection/?{query}')
+            self.step(
+                'investment_create', 'POST', '/investments/create/', {'plan_id': plan_id, 'amount': amount},
+                ajax=True, check=lambda response: json.loads(response.body).get('success') is True,
+            )
+
+        term = self.rng.choice(SEARCH_TERMS)
+        self.step('support_search', 'GET', f"/support/kb/?{urlencode({'search': term})}")
+        self.step('support_ajax_search', 'GET', f"/support/api/search/?{urlencode({'q': term})}")
+
+
+class Admin(VirtualUser):
+    def iteration(self):
+        self.step('admin_transactions', 'GET', '/transactions/admin/?status=pending')
+        for deposit_id in self.runner.claim_deposits(self.runner.approvals_per_iteration):
+            self.step(
+                'admin_approve_deposit', 'POST', f'/transactions/admin/deposit/{deposit_id}/approve/',
+                {'action': 'approve', 'admin_notes': 'load test'}, expect=(302,),
+            )
+
+
+class LoadTestRunner:
+    def __init__(self, base_url, fixtures, password, iterations=20, warmup=1, seed=42, think_time=0.0,
+                 approvals_per_iteration=2, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.fixtures = fixtures
+        self.password = password
+        self.iterations = iterations
+        self.warmup = warmup
+        self.seed = seed
+        self.think_time = think_time
+        self.approvals_per_iteration = approvals_per_iteration
+        self.timeout = timeout
+        self.recorder = LatencyRecorder()
+        self.server = None
+        self._claim_lock = threading.Lock()
+        self._claimed = set()
+        self.started_at = None
+
+    def claim_deposits(self, limit):
+        """Deposits submitted by this run's investors, each handed to one admin"""
+        investor_ids = [user_id for user_id, _ in self.fixtures.investors]
+        with self._claim_lock:
+            pending = DepositRequest.objects.filter(
+                user_id__in=investor_ids, admin_verified=False,
+                transaction__status='pending', created_at__gte=self.started_at,
+            ).exclude(id__in=self._claimed).order_by('id').values_list('id', flat=True)[:limit]
+            claimed = list(pending)
+            self._claimed.update(claimed)
+        return claimed
+
+    def run(self):
+        self.started_at = timezone.now()
+        users = [Investor(self, index, user_id, email) for index, (user_id, email) in enumerate(self.fixtures.investors)]
+        offset = len(users)
+        users += [
+            Admin(self, offset + index, user_id, email) for index, (user_id, email) in enumerate(self.fixtures.admins)
+        ]
+        threads = [
+            threading.Thread(target=user.run, args=(self.iterations, self.warmup), name=f'loadtest-{index}')
+            for index, user in enumerate(users)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+
+        endpoints, total = self.recorder.summary(seconds)
+        return {
+            'meta': {
+                'base_url': self.base_url,
+                'commit': current_commit(),
+                'server': self.server,
+                'started_at': self.started_at.isoformat(),
+                'duration_s': round(seconds, 2),
+                'investors': len(self.fixtures.investors),
+                'admins': len(self.fixtures.admins),
+                'iterations': self.iterations,
+                'warmup': self.warmup,
+                'seed': self.seed,
+                'think_time_s': self.think_time,
+            },
+            'endpoints': endpoints,
+            'total': total,
+        }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline):
+    """Rows of (endpoint, metric, baseline, current, change %) for the percentiles"""
+    rows = []
+    for name, current in sorted(results['endpoints'].items()):
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        for percent in PERCENTILES:
+            key = f'p{percent}_ms'
+            before, after = previous.get(key, 0), current[key]
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append((name, key, before, after, change))
+    return rows
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.synthetic_data import (
+    DEFAULT_BATCH_SIZE, DEFAULT_SEED, DEFAULT_VOLUMES, SyntheticDataGenerator
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate production-scale synthetic data for benchmarking (bulk inserts, deterministic seed)'
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, default=None, help=f'Rows to create (default {default:,} x --scale)')
+        parser.add_argument(
+            '--scale', type=float, default=1.0,
+            help='Multiply the default volumes, e.g. 0.01 for a quick local run'
+        )
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Same seed, same rows')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per bulk insert')
+        parser.add_argument('--days', type=int, default=365, help='History span in days')
+        parser.add_argument(
+            '--return-days', type=int, default=30,
+            help='Daily return rows kept per investment (the most recent accrued days)'
+        )
+        parser.add_argument('--messages-per-ticket', type=float, default=3.0, help='Average messages per ticket')
+        parser.add_argument('--prefix', default='synthetic', help='Username prefix of generated users')
+        parser.add_argument('--password', default='synthetic', help='Password of every generated user')
+        parser.add_argument(
+            '--replace', action='store_true',
+            help='Delete users left by an earlier (or failed) run with the same --prefix and --seed first'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        volumes = {
+            name: options[name] if options[name] is not None else int(default * options['scale'])
+            for name, default in DEFAULT_VOLUMES.items()
+        }
+        if any(count < 0 for count in volumes.values()):
+            raise CommandError('Volumes must not be negative')
+
+        generator = SyntheticDataGenerator(
+            volumes,
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            days=options['days'],
+            return_days=options['return_days'],
+            messages_per_ticket=options['messages_per_ticket'],
+            prefix=options['prefix'],
+            password=options['password'],
+            replace=options['replace'],
+            progress=self.stdout.write if options['verbosity'] > 1 else None,
+        )
+        problems = generator.check_prerequisites()
+        if problems:
+            raise CommandError('\n'.join(problems))
+        if options['replace']:
+            deleted = generator.delete_previous_rows()
+            self.stdout.write(f'Deleted {deleted:,} earlier users starting with {generator.username_prefix!r}')
+
+        self.stdout.write(
+            'Generating ' + ', '.join(f'{count:,} {name}' for name, count in volumes.items())
+            + f" (seed {options['seed']})"
+        )
+        stats = generator.run()
+
+        total_rows = sum(phase.total_rows for phase in stats)
+        total_seconds = sum(phase.seconds for phase in stats)
+        for phase in stats:
+            breakdown = ', '.join(f'{count:,} {table}' for table, count in phase.rows.items())
+            self.stdout.write(
+                f'{phase.name:<22} {phase.total_rows:>11,} rows {phase.seconds:>8.1f}s '
+                f'{phase.rows_per_second:>10,.0f} rows/s  ({breakdown or "nothing"})'
+            )
+        rate = total_rows / total_seconds if total_seconds else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {total_rows:,} rows in {total_seconds:.1f}s ({rate:,.0f} rows/s). '
+            f"Generated users log in as {generator.username_prefix}0000000@example.com / {options['password']}"
+        ))
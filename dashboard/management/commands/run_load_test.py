@@ -0,0 +1,95 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.loadtest import LoadTestRunner, compare, current_commit, load_fixtures
+
+
+class Command(BaseCommand):
+    help = 'Load test the main user flows against a running server and write latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url', default=f"http://127.0.0.1:{os.environ.get('PORT', '8000')}",
+            help='Server started with start-robust.sh (default http://127.0.0.1:$PORT)'
+        )
+        parser.add_argument('--investors', type=int, default=20, help='Concurrent investor sessions')
+        parser.add_argument('--admins', type=int, default=1, help='Concurrent admin sessions')
+        parser.add_argument('--iterations', type=int, default=20, help='Measured script runs per session')
+        parser.add_argument('--warmup', type=int, default=1, help='Unmeasured script runs per session first')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--think-time', type=float, default=0.0, help='Seconds between script runs')
+        parser.add_argument('--approvals', type=int, default=2, help='Deposits each admin approves per run')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument(
+            '--user-prefix', default='synthetic-42-',
+            help='Username prefix of the generate_synthetic_data users to log in as'
+        )
+        parser.add_argument('--password', default='synthetic', help='Password of those users')
+        parser.add_argument('--output', default=None, help='JSON file (default logs/loadtest-<commit>.json)')
+        parser.add_argument('--baseline', default=None, help='Earlier JSON result to compare percentiles with')
+        parser.add_argument(
+            '--max-error-rate', type=float, default=0.01,
+            help='Fail when more than this fraction of requests errored'
+        )
+
+    def handle(self, *args, **options):
+        fixtures = load_fixtures(options['user_prefix'], options['investors'], options['admins'])
+        if not fixtures.investors:
+            raise CommandError(
+                f"No users starting with {options['user_prefix']!r}; run generate_synthetic_data first"
+            )
+        if options['admins'] and not fixtures.admins:
+            self.stderr.write(f"No staff users starting with {options['user_prefix']!r}; admin flow skipped")
+
+        runner = LoadTestRunner(
+            options['base_url'],
+            fixtures,
+            options['password'],
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            seed=options['seed'],
+            think_time=options['think_time'],
+            approvals_per_iteration=options['approvals'],
+            timeout=options['timeout'],
+        )
+        self.stdout.write(
+            f"Load testing {options['base_url']} with {len(fixtures.investors)} investors and "
+            f"{len(fixtures.admins)} admins, {options['iterations']} iterations each"
+        )
+        results = runner.run()
+
+        if 'gunicorn' not in (results['meta']['server'] or '').lower():
+            self.stderr.write(
+                f"Server header is {results['meta']['server']!r}; production numbers need start-robust.sh (gunicorn)"
+            )
+
+        self.stdout.write(f"{'endpoint':<24} {'count':>7} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}")
+        for name, row in sorted(results['endpoints'].items()) + [('TOTAL', results['total'])]:
+            self.stdout.write(
+                f"{name:<24} {row['count']:>7} {row['errors']:>5} {row['p50_ms']:>7.1f}ms "
+                f"{row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {row['rps']:>8.1f}"
+            )
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'logs', f"loadtest-{(current_commit() or 'unknown')[:12]}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as result_file:
+            json.dump(results, result_file, indent=2, sort_keys=True)
+            result_file.write('\n')
+        self.stdout.write(f'Results written to {output}')
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+            self.stdout.write(f"Compared with {options['baseline']} ({baseline.get('meta', {}).get('commit')}):")
+            for name, key, before, after, change in compare(results, baseline):
+                self.stdout.write(f'  {name:<24} {key:<7} {before:>9.1f} -> {after:>9.1f} ms ({change:+.1f}%)')
+
+        total = results['total']
+        error_rate = total['errors'] / total['count'] if total['count'] else 1.0
+        if error_rate > options['max_error_rate']:
+            raise CommandError(f"{total['errors']} of {total['count']} requests failed ({error_rate:.1%})")
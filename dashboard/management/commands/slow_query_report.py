@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = 'Summarize the slow-query log: top queries by total time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None, help='Log file (default: SLOW_QUERY_LOG_FILE)')
+        parser.add_argument('--top', type=int, default=10, help='Number of queries to show')
+        parser.add_argument('--hours', type=float, default=None, help='Only entries from the last N hours')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def read_entries(self, path):
+        # Oldest rotated file first so the latest SQL/plan wins
+        backups = getattr(settings, 'SLOW_QUERY_LOG_BACKUPS', 5)
+        paths = [f'{path}.{n}' for n in range(backups, 0, -1)] + [path]
+        for file_path in paths:
+            if not os.path.exists(file_path):
+                continue
+            with open(file_path) as log_file:
+                for line in log_file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def handle(self, *args, **options):
+        path = options['file'] or str(settings.SLOW_QUERY_LOG_FILE)
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] else None
+
+        queries = {}
+        for entry in self.read_entries(path):
+            if since:
+                logged_at = parse_datetime(entry.get('ts', ''))
+                if logged_at is None or logged_at < since:
+                    continue
+            query = queries.setdefault(entry['digest'], {
+                'digest': entry['digest'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': {},
+                'sql': None,
+                'plan': None,
+            })
+            query['count'] += 1
+            query['total_ms'] += entry['ms']
+            query['max_ms'] = max(query['max_ms'], entry['ms'])
+            query['views'][entry['view']] = query['views'].get(entry['view'], 0) + 1
+            if entry.get('sql'):
+                query['sql'] = entry['sql']
+            if entry.get('plan'):
+                query['plan'] = entry['plan']
+
+        top = sorted(queries.values(), key=lambda q: q['total_ms'], reverse=True)[:options['top']]
+        for query in top:
+            query['total_ms'] = round(query['total_ms'], 2)
+            query['avg_ms'] = round(query['total_ms'] / query['count'], 2)
+
+        if options['json']:
+            self.stdout.write(json.dumps(top, indent=2))
+            return
+
+        if not top:
+            self.stdout.write(f'No slow queries logged in {path}')
+            return
+
+        self.stdout.write(f'Top {len(top)} of {len(queries)} slow queries by total time ({path})')
+        for rank, query in enumerate(top, 1):
+            views = ', '.join(
+                f'{view} ({count})'
+                for view, count in sorted(query['views'].items(), key=lambda item: -item[1])[:3]
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\n{rank}. {query['digest']}  total {query['total_ms']:.0f} ms  "
+                f"count {query['count']}  avg {query['avg_ms']:.1f} ms  max {query['max_ms']:.1f} ms"
+            ))
+            self.stdout.write(f'   Views: {views}')
+            self.stdout.write(f"   SQL:   {(query['sql'] or '(not captured)')[:500]}")
+            for row in query['plan'] or []:
+                self.stdout.write(f'   Plan:  {row}')
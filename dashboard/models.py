@@ -1,3 +1,40 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class RequestProfile(models.Model):
+    """A cProfile capture of one staff request (see dashboard.profiling)"""
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='request_profiles')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+    @property
+    def prof_path(self):
+        return os.path.join(settings.PROFILE_DIR, f'profile-{self.pk}.prof')
+
+    @property
+    def html_path(self):
+        return os.path.join(settings.PROFILE_DIR, f'profile-{self.pk}.html')
+
+
+class ContentVersion(models.Model):
+    """Version counter behind an in-process snapshot or cached pages (see pipsmade.page_cache)"""
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
@@ -0,0 +1,207 @@
+"""
+On-demand cProfile captures of single requests, for staff only.
+
+A staff user adds ``?_profile=1`` to any URL (or sends ``X-Profile: 1``) and
+that one request runs under cProfile. The raw ``.prof`` file and an HTML
+flame graph are written to ``PROFILE_DIR`` (outside MEDIA_ROOT, so they are
+only reachable through the RequestProfile admin), and the response carries
+an ``X-Profile-Id`` header. Only ``PROFILE_MAX_STORED`` captures are kept.
+
+For everyone else the middleware looks at the query string and one header
+and passes the request straight through; it never touches request.user
+unless a profile was asked for.
+"""
+import cProfile
+import html
+import io
+import logging
+import os
+import pstats
+import threading
+from collections import defaultdict
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from pipsmade.metrics import QueryTimer
+from .models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 60
+MIN_FRACTION = 0.005
+TOP_FUNCTIONS = 30
+
+# One capture at a time: profilers in concurrent threads would skew each other
+_profile_lock = threading.Lock()
+
+
+def _function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def build_call_tree(stats):
+    """
+    Approximate call tree from pstats caller/callee data.
+
+    cProfile keeps cumulative time per caller->callee edge, not full stacks,
+    so deeper levels are an estimate (the same approach as snakeviz). Each
+    middleware layer shares one wrapper function, so functions may repeat
+    along a path; MAX_DEPTH bounds the walk.
+    """
+    children = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+    roots = [(func, entry[3]) for func, entry in stats.stats.items() if not entry[4]]
+    total = sum(seconds for _, seconds in roots) or 1e-9
+
+    def node(func, seconds, depth):
+        item = {'label': _function_label(func), 'seconds': seconds, 'children': []}
+        if depth >= MAX_DEPTH:
+            return item
+        remaining = seconds
+        for child, child_seconds in sorted(children.get(func, ()), key=lambda c: -c[1]):
+            if child_seconds / total < MIN_FRACTION:
+                break
+            child_seconds = min(child_seconds, remaining)
+            if child_seconds / total < MIN_FRACTION:
+                break
+            remaining -= child_seconds
+            item['children'].append(node(child, child_seconds, depth + 1))
+        return item
+
+    return {
+        'label': 'request',
+        'seconds': total,
+        'children': [node(func, seconds, 1) for func, seconds in sorted(roots, key=lambda r: -r[1])],
+    }
+
+
+def _render_node(item, parent_seconds, total):
+    width = 100 * item['seconds'] / (parent_seconds or 1e-9)
+    share = 100 * item['seconds'] / (total or 1e-9)
+    label = html.escape(item['label'])
+    title = f"{label} - {item['seconds'] * 1000:.1f} ms ({share:.1f}%)"
+    children = ''.join(_render_node(child, item['seconds'], total) for child in item['children'])
+    return (
+        f'<div class="frame" style="width:{width:.3f}%">'
+        f'<div class="bar" title="{title}">{label}</div>'
+        f'<div class="children">{children}</div></div>'
+    )
+
+
+def render_flame_graph(stats, profile):
+    tree = build_call_tree(stats)
+    summary = io.StringIO()
+    stats.stream = summary
+    stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    summary.write('\n')
+    stats.sort_stats('tottime').print_stats(TOP_FUNCTIONS)
+    heading = html.escape(f'{profile.method} {profile.path}')
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Profile #{profile.pk}</title>
+<style>
+body {{ font: 13px sans-serif; margin: 20px; }}
+.graph {{ display: flex; }}
+.frame {{ box-sizing: border-box; min-width: 0; }}
+.bar {{ background: #f3a65a; border: 1px solid #fff; padding: 2px 4px; white-space: nowrap;
+        overflow: hidden; text-overflow: ellipsis; cursor: default; }}
+.bar:hover {{ background: #e8743b; }}
+.children {{ display: flex; }}
+pre {{ background: #f6f6f6; padding: 10px; overflow-x: auto; }}
+</style></head><body>
+<h1>{heading}</h1>
+<p>View {html.escape(profile.view_name or '-')} &middot; status {profile.status_code} &middot;
+{profile.duration_ms:.1f} ms &middot; {profile.query_count} queries &middot; {profile.created_at:%Y-%m-%d %H:%M:%S}</p>
+<p>Width is time spent, callers above callees. Hover a frame for its time.</p>
+<div class="graph">{_render_node(tree, tree['seconds'], tree['seconds'])}</div>
+<h2>Top functions</h2>
+<pre>{html.escape(summary.getvalue())}</pre>
+</body></html>
+"""
+
+
+def profiled_request(get_response, request):
+    """Entry frame of every capture: the one function without a profiled caller"""
+    return get_response(request)
+
+
+def prune_profiles():
+    """Keep only the newest PROFILE_MAX_STORED captures"""
+    keep = getattr(settings, 'PROFILE_MAX_STORED', 50)
+    stale_ids = list(RequestProfile.objects.values_list('id', flat=True)[keep:])
+    if stale_ids:
+        # Deleted one by one so post_delete removes the files
+        for profile in RequestProfile.objects.filter(id__in=stale_ids):
+            profile.delete()
+
+
+def save_profile(request, response, profiler, duration, query_count):
+    match = getattr(request, 'resolver_match', None)
+    profile = RequestProfile.objects.create(
+        user=request.user,
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view_name=(match.view_name if match else '')[:200],
+        status_code=response.status_code,
+        duration_ms=duration * 1000,
+        query_count=query_count,
+    )
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(profile.prof_path)
+    stats = pstats.Stats(profiler)
+    with open(profile.html_path, 'w', encoding='utf-8') as html_file:
+        html_file.write(render_flame_graph(stats, profile))
+    prune_profiles()
+    return profile
+
+
+class ProfilingMiddleware:
+    """Must come after AuthenticationMiddleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_param = getattr(settings, 'PROFILE_QUERY_PARAM', '_profile')
+        self.header = 'HTTP_' + getattr(settings, 'PROFILE_HEADER', 'X-Profile').upper().replace('-', '_')
+
+    def __call__(self, request):
+        requested = self.query_param in request.GET or request.META.get(self.header)
+        if not requested or not request.user.is_staff:
+            return self.get_response(request)
+        if not _profile_lock.acquire(blocking=False):
+            response = self.get_response(request)
+            response['X-Profile'] = 'busy'
+            return response
+        try:
+            return self.profile(request)
+        finally:
+            _profile_lock.release()
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        timer = QueryTimer()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            profiler.enable()
+            try:
+                response = profiled_request(self.get_response, request)
+            finally:
+                profiler.disable()
+        duration = perf_counter() - start
+
+        try:
+            profile = save_profile(request, response, profiler, duration, timer.count)
+        except Exception as e:
+            logger.error(f'Could not store profile for {request.path}: {e}')
+            return response
+        response['X-Profile-Id'] = str(profile.pk)
+        logger.info(f'Profiled {request.method} {request.path} for {request.user}: {duration * 1000:.1f} ms, profile #{profile.pk}')
+        return response
@@ -0,0 +1,15 @@
+import os
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import RequestProfile
+
+
+@receiver(post_delete, sender=RequestProfile)
+def delete_profile_files(sender, instance, **kwargs):
+    for path in (instance.prof_path, instance.html_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,554 @@
+"""
+Synthetic production-scale data for benchmarking.
+
+``manage.py generate_synthetic_data`` fills the database with users,
+wallets, transactions (with their deposit/withdrawal requests),
+notifications, investments with daily returns, and support tickets with
+messages. Volumes are configurable; the defaults approximate production
+(100k users, 5M transactions, 1M notifications, 500k investments).
+
+Distributions aim for realistic query shapes rather than realistic money:
+activity per user is Pareto-distributed (a few heavy users own most rows),
+sign-ups grow towards the present, amounts are log-normal, most rows are
+completed and most old notifications are read. Returns use the same
+formula as ``investments.accrual`` for the last ``return_days`` accrued days.
+
+Every phase draws from its own ``random.Random`` seeded from ``seed`` and
+the phase name, so the same seed and volumes produce the same rows (only
+the timestamps move with the time of the run), and changing one volume
+does not reshuffle the other tables.
+
+Rows are written with ``bulk_create`` in ``batch_size`` batches, one
+database transaction per batch. bulk_create skips signals and save(), so
+the denormalized data is rebuilt at the end: notification counters from
+one grouped query, and portfolios with ``recompute_portfolios``.
+
+Because batches commit as they go, a run that fails half way leaves its
+users behind. ``check_prerequisites`` catches the usual causes (pending
+migrations, no active plans or wallets) before anything is written, and
+``replace=True`` (``--replace``) deletes an earlier run's users, and with
+them every row they own, so the same seed can be generated again.
+"""
+import logging
+import math
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count
+from django.utils import timezone
+
+from investments.accrual import compute_accrual
+from investments.models import InvestmentPlan, InvestmentReturn, UserInvestment
+from investments.portfolio import recompute_portfolios
+from support.models import SupportCategory, SupportMessage, SupportTicket
+from transactions.models import (
+    CryptoWallet, DepositRequest, NotificationCounter, Transaction, TransactionNotification,
+    UserWallet, WithdrawalRequest
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOLUMES = {
+    'users': 100_000,
+    'transactions': 5_000_000,
+    'notifications': 1_000_000,
+    'investments': 500_000,
+    'tickets': 50_000,
+}
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_SEED = 42
+
+CENT = Decimal('0.01')
+SATOSHI = Decimal('0.00000001')
+
+# Pareto shape of per-user activity; 1.16 gives the classic 80/20 split
+ACTIVITY_SHAPE = 1.16
+
+TRANSACTION_TYPES = [
+    ('deposit', 45), ('withdrawal', 20), ('investment', 18), ('profit', 12),
+    ('bonus', 2), ('fee', 2), ('refund', 1),
+]
+TRANSACTION_STATUSES = [
+    ('completed', 85), ('pending', 5), ('processing', 2), ('failed', 3), ('cancelled', 3), ('rejected', 2),
+]
+CRYPTO_WEIGHTS = {
+    'USDT': 40, 'BTC': 25, 'ETH': 20, 'BNB': 5, 'LTC': 3, 'ADA': 2, 'XRP': 2, 'DOGE': 1, 'DOT': 1, 'MATIC': 1,
+}
+# Rough USD prices, only used to turn USD amounts into plausible crypto amounts
+USD_PRICES = {
+    'USDT': 1, 'BTC': 60000, 'ETH': 3000, 'BNB': 500, 'LTC': 80, 'ADA': 0.5, 'XRP': 0.6, 'DOGE': 0.15,
+    'DOT': 7, 'MATIC': 0.7,
+}
+NETWORKS = {'USDT': 'TRC-20', 'ETH': 'ERC-20', 'BNB': 'BEP-20'}
+TICKET_STATUSES = [('resolved', 40), ('closed', 20), ('open', 20), ('in_progress', 10), ('waiting_user', 10)]
+TICKET_PRIORITIES = [('medium', 45), ('low', 30), ('high', 20), ('urgent', 5)]
+TICKET_SUBJECTS = [
+    'Deposit not credited', 'Withdrawal pending for too long', 'How do I change my email?',
+    'Question about investment returns', 'Two-factor authentication problem', 'Wrong network selected',
+    'Account verification', 'Portfolio value looks wrong',
+]
+FIRST_NAMES = ['Ada', 'Ben', 'Chen', 'Dami', 'Eva', 'Femi', 'Grace', 'Hugo', 'Ines', 'Jon', 'Kemi', 'Luis']
+LAST_NAMES = ['Adeyemi', 'Brown', 'Costa', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Ito', 'Johnson', 'Kim']
+
+
+@dataclass
+class PhaseStats:
+    name: str
+    seconds: float = 0.0
+    rows: Counter = field(default_factory=Counter)
+
+    @property
+    def total_rows(self):
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total_rows / self.seconds if self.seconds else 0.0
+
+
+def _cumulative(table):
+    values = [value for value, _ in table]
+    return values, list(accumulate(weight for _, weight in table))
+
+
+def _batches(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+def _aware(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """
+    Let bulk_create keep generated created_at/updated_at values.
+
+    auto_now and auto_now_add overwrite the field in pre_save, including in
+    bulk_create, so they are switched off for the duration of the block.
+    Not thread-safe; meant for management commands only.
+    """
+    fields = [
+        model_field for model in models for model_field in model._meta.concrete_fields
+        if getattr(model_field, 'auto_now', False) or getattr(model_field, 'auto_now_add', False)
+    ]
+    saved = [(model_field, model_field.auto_now, model_field.auto_now_add) for model_field in fields]
+    for model_field in fields:
+        model_field.auto_now = model_field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for model_field, auto_now, auto_now_add in saved:
+            model_field.auto_now, model_field.auto_now_add = auto_now, auto_now_add
+
+
+class SyntheticDataGenerator:
+    def __init__(self, volumes, seed=DEFAULT_SEED, batch_size=DEFAULT_BATCH_SIZE, days=365,
+                 return_days=30, messages_per_ticket=3.0, prefix='synthetic', password='synthetic',
+                 replace=False, progress=None):
+        self.volumes = dict(DEFAULT_VOLUMES, **volumes)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.days = days
+        self.return_days = return_days
+        self.messages_per_ticket = messages_per_ticket
+        self.username_prefix = f'{prefix}-{seed}-'
+        self.password = password
+        self.replace = replace
+        self.progress = progress or (lambda message: None)
+
+        self.now = timezone.now().timestamp()
+        self.start = self.now - days * 86400
+        self.user_ids = []
+        self.user_joined = []
+        self.user_cum_weights = []
+        self.agent_id = None
+        self.stats = []
+
+    def rng(self, phase):
+        return random.Random(f'{self.seed}:{phase}')
+
+    def existing_users(self):
+        return User.objects.filter(username__startswith=self.username_prefix).exists()
+
+    def check_prerequisites(self):
+        """Problems that would stop the run, as a list of messages"""
+        problems = []
+        if self.volumes['users'] < 1:
+            problems.append('At least one user is needed')
+        if not connection.features.can_return_rows_from_bulk_insert:
+            problems.append(f'{connection.vendor} does not return primary keys from bulk inserts')
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            problems.append('The database has unapplied migrations; run migrate first')
+            # The checks below query tables that may not exist yet
+            return problems
+        if self.existing_users() and not self.replace:
+            problems.append(
+                f'Users starting with {self.username_prefix!r} already exist; use --replace, another --seed or --prefix'
+            )
+        if self.volumes['investments'] and not InvestmentPlan.objects.filter(is_active=True).exists():
+            problems.append('No active investment plans; run create_sample_plans first')
+        if self.volumes['transactions'] and not CryptoWallet.objects.filter(is_active=True).exists():
+            problems.append('No active crypto wallets; run setup_crypto_wallets first')
+        return problems
+
+    def delete_previous_rows(self):
+        """
+        Delete the users of an earlier run with the same prefix and seed, and
+        through the cascade everything they own. Returns the users deleted.
+        """
+        user_ids = list(
+            User.objects.filter(username__startswith=self.username_prefix).order_by('id').values_list('id', flat=True)
+        )
+        for start, size in _batches(len(user_ids), self.batch_size):
+            with transaction.atomic():
+                User.objects.filter(id__in=user_ids[start:start + size]).delete()
+            self.progress(f'  deleted {start + size:,}/{len(user_ids):,} earlier users')
+        return len(user_ids)
+
+    def run(self):
+        models = [
+            UserWallet, Transaction, DepositRequest, WithdrawalRequest, TransactionNotification,
+            UserInvestment, InvestmentReturn, SupportTicket, SupportMessage,
+        ]
+        with historical_timestamps(*models):
+            self._phase('users', self.create_users)
+            if self.volumes['transactions']:
+                self._phase('transactions', self.create_transactions)
+            if self.volumes['investments']:
+                self._phase('investments', self.create_investments)
+            if self.volumes['tickets']:
+                self._phase('tickets', self.create_tickets)
+        self._phase('notification counters', self.rebuild_notification_counters)
+        self._phase('portfolios', self.rebuild_portfolios)
+        return self.stats
+
+    def _phase(self, name, method):
+        stats = PhaseStats(name)
+        started = time.perf_counter()
+        method(stats)
+        stats.seconds = time.perf_counter() - started
+        self.stats.append(stats)
+        logger.info(f'Synthetic data: {name} wrote {stats.total_rows} rows in {stats.seconds:.1f}s')
+        return stats
+
+    def _report(self, stats, done, total, started):
+        elapsed = time.perf_counter() - started
+        rate = stats.total_rows / elapsed if elapsed else 0
+        self.progress(f'  {stats.name}: {done:,}/{total:,} ({stats.total_rows:,} rows, {rate:,.0f} rows/s)')
+
+    def pick_users(self, rng, count):
+        """Indexes into self.user_ids, weighted by each user's activity"""
+        return rng.choices(range(len(self.user_ids)), cum_weights=self.user_cum_weights, k=count)
+
+    def activity_time(self, rng, user_index):
+        joined = self.user_joined[user_index]
+        return joined + (self.now - joined) * rng.random()
+
+    def create_users(self, stats):
+        rng = self.rng('users')
+        total = self.volumes['users']
+        password = make_password(self.password)
+        span = self.now - self.start
+        crypto_types = list(CRYPTO_WEIGHTS)[:5]
+        started = time.perf_counter()
+
+        agent = User.objects.create(
+            username=f'{self.username_prefix}agent@example.com', email=f'{self.username_prefix}agent@example.com',
+            password=password, is_staff=True, first_name='Support', last_name='Agent',
+        )
+        self.agent_id = agent.id
+        stats.rows['users'] += 1
+
+        for start, size in _batches(total, self.batch_size):
+            users = []
+            for number in range(start, start + size):
+                email = f'{self.username_prefix}{number:07d}@example.com'
+                # beta(2, 1) leans towards recent sign-ups, like a growing user base
+                joined = self.start + span * rng.betavariate(2, 1)
+                users.append(User(
+                    username=email, email=email, password=password,
+                    first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                    date_joined=_aware(joined),
+                ))
+                self.user_joined.append(joined)
+            wallets = []
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+                for user in users:
+                    self.user_ids.append(user.id)
+                    created = user.date_joined
+                    for crypto_type in rng.sample(crypto_types, 1 + (rng.random() < 0.5) + (rng.random() < 0.2)):
+                        balance = Decimal(rng.lognormvariate(4, 1.5) / USD_PRICES[crypto_type]).quantize(SATOSHI)
+                        wallets.append(UserWallet(
+                            user_id=user.id, crypto_type=crypto_type, balance=balance,
+                            created_at=created, updated_at=created,
+                        ))
+                UserWallet.objects.bulk_create(wallets, batch_size=self.batch_size)
+            stats.rows['users'] += len(users)
+            stats.rows['wallets'] += len(wallets)
+            self._report(stats, start + size, total, started)
+
+        weights = (rng.paretovariate(ACTIVITY_SHAPE) for _ in self.user_ids)
+        self.user_cum_weights = list(accumulate(weights))
+
+    def create_transactions(self, stats):
+        rng = self.rng('transactions')
+        total = self.volumes['transactions']
+        # Exactly ``notifications`` rows, spread evenly over the transactions
+        ratio = self.volumes['notifications'] / total
+        wallets = {wallet.crypto_type: wallet.id for wallet in CryptoWallet.objects.filter(is_active=True)}
+        # Only types with an active wallet, since deposit requests point at one
+        crypto_table = [(crypto, weight) for crypto, weight in CRYPTO_WEIGHTS.items() if crypto in wallets]
+        crypto_table += [(crypto, 1) for crypto in sorted(wallets) if crypto not in CRYPTO_WEIGHTS]
+        crypto_types, crypto_cum = _cumulative(crypto_table)
+        types, type_cum = _cumulative(TRANSACTION_TYPES)
+        statuses, status_cum = _cumulative(TRANSACTION_STATUSES)
+        started = time.perf_counter()
+
+        for start, size in _batches(total, self.batch_size):
+            transactions = []
+            for user_index, kind, status, crypto_type in zip(
+                self.pick_users(rng, size),
+                rng.choices(types, cum_weights=type_cum, k=size),
+                rng.choices(statuses, cum_weights=status_cum, k=size),
+                rng.choices(crypto_types, cum_weights=crypto_cum, k=size),
+            ):
+                created = self.activity_time(rng, user_index)
+                usd = min(rng.lognormvariate(5.5, 1.2), 250000)
+                completed = _aware(min(created + rng.uniform(60, 86400), self.now)) if status == 'completed' else None
+                created_at = _aware(created)
+                transactions.append(Transaction(
+                    user_id=self.user_ids[user_index],
+                    transaction_type=kind,
+                    status=status,
+                    amount=max(Decimal(usd / USD_PRICES.get(crypto_type, 1)).quantize(SATOSHI), SATOSHI),
+                    crypto_type=crypto_type,
+                    usd_equivalent=Decimal(usd).quantize(CENT),
+                    transaction_hash=f'{rng.getrandbits(256):064x}' if kind in ('deposit', 'withdrawal') else None,
+                    approved_at=completed,
+                    completed_at=completed,
+                    created_at=created_at,
+                    updated_at=completed or created_at,
+                ))
+
+            with transaction.atomic():
+                Transaction.objects.bulk_create(transactions, batch_size=self.batch_size)
+                deposits, withdrawals = self._requests_for(rng, transactions, wallets)
+                DepositRequest.objects.bulk_create(deposits, batch_size=self.batch_size)
+                WithdrawalRequest.objects.bulk_create(withdrawals, batch_size=self.batch_size)
+                notifications = self._notifications_for(rng, transactions, start, ratio)
+                TransactionNotification.objects.bulk_create(notifications, batch_size=self.batch_size)
+            stats.rows['transactions'] += len(transactions)
+            stats.rows['deposit requests'] += len(deposits)
+            stats.rows['withdrawal requests'] += len(withdrawals)
+            stats.rows['notifications'] += len(notifications)
+            self._report(stats, start + size, total, started)
+
+    def _requests_for(self, rng, transactions, wallets):
+        deposits = []
+        withdrawals = []
+        for tx in transactions:
+            if tx.transaction_type == 'deposit':
+                deposits.append(DepositRequest(
+                    user_id=tx.user_id, transaction_id=tx.id, crypto_wallet_id=wallets[tx.crypto_type],
+                    amount=tx.amount, transaction_hash=tx.transaction_hash,
+                    sender_address=f'{rng.getrandbits(160):040x}',
+                    admin_verified=tx.status == 'completed', verified_at=tx.completed_at,
+                    created_at=tx.created_at, updated_at=tx.updated_at,
+                ))
+            elif tx.transaction_type == 'withdrawal':
+                withdrawals.append(WithdrawalRequest(
+                    user_id=tx.user_id, transaction_id=tx.id, crypto_type=tx.crypto_type, amount=tx.amount,
+                    destination_address=f'{rng.getrandbits(160):040x}',
+                    network=NETWORKS.get(tx.crypto_type, tx.crypto_type),
+                    two_factor_verified=rng.random() < 0.6,
+                    ip_address=f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+                    user_agent='Mozilla/5.0 (synthetic)',
+                    processed_at=tx.completed_at, sent_at=tx.completed_at,
+                    sent_transaction_hash=tx.transaction_hash if tx.completed_at else None,
+                    created_at=tx.created_at, updated_at=tx.updated_at,
+                ))
+        return deposits, withdrawals
+
+    def _notifications_for(self, rng, transactions, offset, ratio):
+        notifications = []
+        recent = self.now - 7 * 86400
+        for index, tx in enumerate(transactions, offset):
+            count = math.floor((index + 1) * ratio) - math.floor(index * ratio)
+            if not count:
+                continue
+            notification_type, title = self._notification_kind(tx)
+            sent = (tx.completed_at or tx.created_at).timestamp()
+            for _ in range(count):
+                notifications.append(TransactionNotification(
+                    user_id=tx.user_id, transaction_id=tx.id, title=title,
+                    message=f'{title}: {tx.amount.normalize()} {tx.crypto_type}',
+                    notification_type=notification_type,
+                    # Old notifications have mostly been read, recent ones mostly not
+                    is_read=rng.random() < (0.95 if sent < recent else 0.35),
+                    created_at=tx.completed_at or tx.created_at,
+                ))
+        return notifications
+
+    def _notification_kind(self, tx):
+        if tx.status in ('failed', 'cancelled'):
+            return 'transaction_failed', 'Transaction Failed'
+        if tx.transaction_type == 'withdrawal':
+            if tx.status == 'rejected':
+                return 'withdrawal_rejected', 'Withdrawal Rejected'
+            if tx.status == 'completed':
+                return 'withdrawal_completed', 'Withdrawal Completed'
+            return 'withdrawal_approved', 'Withdrawal Approved'
+        if tx.transaction_type in ('investment', 'profit'):
+            return 'investment_matured', 'Investment Matured'
+        return 'deposit_confirmed', 'Deposit Confirmed'
+
+    def create_investments(self, stats):
+        rng = self.rng('investments')
+        total = self.volumes['investments']
+        plans = list(InvestmentPlan.objects.filter(is_active=True).order_by('min_investment', 'id'))
+        # Cheaper plans are more popular
+        plan_cum = list(accumulate(1 / (rank + 1) for rank in range(len(plans))))
+        today = timezone.localdate()
+        started = time.perf_counter()
+
+        for start, size in _batches(total, self.batch_size):
+            investments = []
+            pending_returns = []
+            for user_index, plan in zip(self.pick_users(rng, size), rng.choices(plans, cum_weights=plan_cum, k=size)):
+                started_at = self.activity_time(rng, user_index)
+                start_date = _aware(started_at)
+                end_date = start_date + timedelta(days=plan.duration_days)
+                max_investment = plan.max_investment or plan.min_investment * 50
+                amount = (plan.min_investment + (max_investment - plan.min_investment)
+                          * Decimal(rng.betavariate(1.2, 5))).quantize(CENT)
+                roi = Decimal(rng.uniform(float(plan.min_roi_percentage), float(plan.max_roi_percentage))).quantize(CENT)
+                if rng.random() < 0.02:
+                    status = 'cancelled'
+                else:
+                    status = 'completed' if end_date.timestamp() <= self.now else 'active'
+
+                start_day = timezone.localdate(start_date)
+                duration_days = max((timezone.localdate(end_date) - start_day).days, 1)
+                accrued = 0 if status == 'cancelled' else min((today - start_day).days, duration_days)
+                total_profit = current_value = Decimal('0')
+                if accrued > 0:
+                    _, _, _, current_value, total_profit = compute_accrual(amount, roi, 0, duration_days, accrued)
+
+                investment = UserInvestment(
+                    user_id=self.user_ids[user_index], investment_plan_id=plan.id, amount=amount,
+                    roi_percentage=roi, start_date=start_date, end_date=end_date, status=status,
+                    expected_return=(amount * roi / 100).quantize(CENT),
+                    current_value=current_value, total_profit=total_profit,
+                    total_withdrawable=total_profit if status == 'completed' else Decimal('0'),
+                    created_at=start_date, updated_at=_aware(min(end_date.timestamp(), self.now)),
+                )
+                investments.append(investment)
+                pending_returns.append((investment, start_day, duration_days, accrued))
+
+            with transaction.atomic():
+                UserInvestment.objects.bulk_create(investments, batch_size=self.batch_size)
+                returns = self._returns_for(pending_returns)
+                InvestmentReturn.objects.bulk_create(returns, batch_size=self.batch_size)
+            stats.rows['investments'] += len(investments)
+            stats.rows['investment returns'] += len(returns)
+            self._report(stats, start + size, total, started)
+
+    def _returns_for(self, pending_returns):
+        returns = []
+        for investment, start_day, duration_days, accrued in pending_returns:
+            for day_index in range(max(1, accrued - self.return_days + 1), accrued + 1):
+                daily, cumulative, percentage, _, _ = compute_accrual(
+                    investment.amount, investment.roi_percentage, 0, duration_days, day_index
+                )
+                day = start_day + timedelta(days=day_index)
+                returns.append(InvestmentReturn(
+                    investment_id=investment.id, date=day, daily_return=daily,
+                    cumulative_return=cumulative, return_percentage=percentage,
+                    created_at=datetime.combine(day, datetime.min.time(), tzinfo=dt_timezone.utc),
+                ))
+        return returns
+
+    def create_tickets(self, stats):
+        rng = self.rng('tickets')
+        total = self.volumes['tickets']
+        categories = list(SupportCategory.objects.filter(is_active=True).values_list('id', flat=True)) or [None]
+        statuses, status_cum = _cumulative(TICKET_STATUSES)
+        priorities, priority_cum = _cumulative(TICKET_PRIORITIES)
+        extra_messages = max(self.messages_per_ticket - 1, 0)
+        started = time.perf_counter()
+
+        for start, size in _batches(total, self.batch_size):
+            tickets = []
+            threads = []
+            for user_index, status, priority in zip(
+                self.pick_users(rng, size),
+                rng.choices(statuses, cum_weights=status_cum, k=size),
+                rng.choices(priorities, cum_weights=priority_cum, k=size),
+            ):
+                opened = self.activity_time(rng, user_index)
+                # Opening message plus an exponentially distributed back-and-forth
+                count = 1 + (int(rng.expovariate(1 / extra_messages)) if extra_messages else 0)
+                times = [opened]
+                for _ in range(count - 1):
+                    times.append(min(times[-1] + rng.expovariate(1 / 14400), self.now))
+                last = _aware(times[-1])
+                subject = rng.choice(TICKET_SUBJECTS)
+                tickets.append(SupportTicket(
+                    user_id=self.user_ids[user_index], category_id=rng.choice(categories),
+                    subject=subject, description=f'{subject}. Please help.',
+                    status=status, priority=priority,
+                    assigned_to_id=self.agent_id if status != 'open' else None,
+                    resolved_at=last if status in ('resolved', 'closed') else None,
+                    closed_at=last if status == 'closed' else None,
+                    created_at=_aware(opened), updated_at=last,
+                ))
+                threads.append(times)
+
+            with transaction.atomic():
+                SupportTicket.objects.bulk_create(tickets, batch_size=self.batch_size)
+                messages = []
+                for ticket, times in zip(tickets, threads):
+                    for position, sent in enumerate(times):
+                        staff_reply = position % 2 == 1
+                        sent_at = _aware(sent)
+                        messages.append(SupportMessage(
+                            ticket_id=ticket.id,
+                            user_id=self.agent_id if staff_reply else ticket.user_id,
+                            message='Thanks, we are looking into it.' if staff_reply else ticket.description,
+                            is_staff_reply=staff_reply,
+                            created_at=sent_at, updated_at=sent_at,
+                        ))
+                SupportMessage.objects.bulk_create(messages, batch_size=self.batch_size)
+            stats.rows['tickets'] += len(tickets)
+            stats.rows['ticket messages'] += len(messages)
+            self._report(stats, start + size, total, started)
+
+    def rebuild_notification_counters(self, stats):
+        """One NotificationCounter per generated user, from a single grouped query"""
+        if not self.user_ids:
+            return
+        unread = TransactionNotification.objects.filter(
+            user_id__gte=self.user_ids[0], user_id__lte=self.user_ids[-1], is_read=False
+        ).order_by().values_list('user_id').annotate(Count('id'))
+        counts = dict(unread.iterator(chunk_size=self.batch_size))
+        counters = [NotificationCounter(user_id=user_id, unread_count=counts.get(user_id, 0)) for user_id in self.user_ids]
+        NotificationCounter.objects.bulk_create(counters, batch_size=self.batch_size, ignore_conflicts=True)
+        stats.rows['notification counters'] += len(counters)
+
+    def rebuild_portfolios(self, stats):
+        if self.user_ids:
+            stats.rows['portfolios'] += recompute_portfolios(self.user_ids)
@@ -1,3 +1,88 @@
-from django.test import TestCase
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pipsmade.testing import QueryBudgetTestCase, clear_caches
+
+from .models import RequestProfile
+
+DASHBOARD_QUERIES = 14
+
+
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_dashboard_view(self):
+        self.login(self.investor)
+        self.seed_activity(self.investor, 3)
+        self.assertQueryBudget('/dashboard/', DASHBOARD_QUERIES, grow=lambda: self.seed_activity(self.investor, 30))
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        clear_caches()
+        profile_dir = self.settings(PROFILE_DIR=tempfile.mkdtemp())
+        profile_dir.enable()
+        self.addCleanup(profile_dir.disable)
+        self.member = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.admin = User.objects.create_superuser('admin@example.com', 'admin@example.com', 'pw')
+
+    def capture(self, url='/about/?_profile=1', **headers):
+        self.client.force_login(self.admin)
+        response = self.client.get(url, **headers)
+        return response, RequestProfile.objects.get(pk=response['X-Profile-Id'])
+
+    def test_non_staff_requests_are_never_profiled(self):
+        self.client.force_login(self.member)
+        with mock.patch('dashboard.profiling.cProfile.Profile') as profiler:
+            response = self.client.get('/about/?_profile=1', HTTP_X_PROFILE='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Id', response)
+        profiler.assert_not_called()
+        self.assertFalse(RequestProfile.objects.exists())
+        self.assertEqual(os.listdir(settings.PROFILE_DIR), [])
+
+    def test_staff_capture_stores_a_row_and_its_files(self):
+        response, profile = self.capture()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((profile.user, profile.method, profile.path), (self.admin, 'GET', '/about/?_profile=1'))
+        self.assertEqual(profile.view_name, 'about')
+        self.assertTrue(os.path.exists(profile.prof_path))
+        with open(profile.html_path, encoding='utf-8') as html_file:
+            self.assertIn('GET /about/?_profile=1', html_file.read())
+
+        _, by_header = self.capture('/about/', HTTP_X_PROFILE='1')
+        self.assertNotEqual(by_header.pk, profile.pk)
+
+    @override_settings(PROFILE_MAX_STORED=2)
+    def test_only_the_newest_captures_are_kept(self):
+        oldest = self.capture()[1]
+        newer = [self.capture()[1] for _ in range(2)]
+        self.assertEqual(set(RequestProfile.objects.all()), set(newer))
+        self.assertFalse(os.path.exists(oldest.prof_path))
+        self.assertFalse(os.path.exists(oldest.html_path))
+        self.assertTrue(all(os.path.exists(profile.prof_path) for profile in newer))
+
+    def test_downloads_require_staff(self):
+        profile = self.capture()[1]
+        urls = [
+            reverse('admin:dashboard_requestprofile_flamegraph', args=[profile.pk]),
+            reverse('admin:dashboard_requestprofile_download', args=[profile.pk]),
+        ]
+        self.client.logout()
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(self.member)
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(self.admin)
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Drained rather than close()d: close() fires request_finished, which
+            # would close the test's connection on a backend with CONN_MAX_AGE=0
+            self.assertTrue(response.getvalue())
@@ -9,14 +9,17 @@ from decimal import Decimal
 from datetime import timedelta
 import json
 
+from pipsmade.db_router import use_read_replica
+
 # Import models
-from transactions.models import UserWallet, Transaction, WithdrawalRequest, DepositRequest, TransactionNotification
+from transactions.models import UserWallet, Transaction, WithdrawalRequest, DepositRequest
 from investments.models import UserInvestment, UserPortfolio, InvestmentReturn
 
 # Import forms
 from transactions.forms import WithdrawalForm
 
 @login_required
+@use_read_replica
 def dashboard_view(request):
     try:
         # Get or create user portfolio
@@ -37,7 +40,9 @@ def dashboard_view(request):
         # portfolio.update_portfolio_metrics()  # REMOVED - NO AUTOMATIC UPDATES
 
         # Get recent investments
-        recent_investments = UserInvestment.objects.filter(user=request.user).order_by('-created_at')[:5]
+        recent_investments = UserInvestment.objects.filter(user=request.user).select_related(
+            'investment_plan', 'admin_investment_plan'
+        ).order_by('-created_at')[:5]
 
         # Get recent transactions (last 10)
         recent_transactions = Transaction.objects.filter(
@@ -48,7 +53,7 @@ def dashboard_view(request):
         pending_deposits = DepositRequest.objects.filter(
             user=request.user,
             admin_verified=False
-        ).order_by('-created_at')[:5]
+        ).select_related('crypto_wallet').order_by('-created_at')[:5]
 
         # Get pending withdrawals (not yet processed)
         pending_withdrawals = WithdrawalRequest.objects.filter(
@@ -59,17 +64,6 @@ def dashboard_view(request):
         # Get user wallets for asset allocation
         user_wallets = UserWallet.objects.filter(user=request.user)
         
-        # Get user notifications
-        from transactions.models import TransactionNotification
-        unread_notifications = TransactionNotification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).order_by('-created_at')[:10]
-        
-        recent_notifications = TransactionNotification.objects.filter(
-            user=request.user
-        ).order_by('-created_at')[:5]
-        
         # Calculate total crypto balance in USD (simplified - you might want to add real-time rates)
         total_crypto_balance = sum(wallet.balance for wallet in user_wallets)
         
@@ -188,8 +182,6 @@ def dashboard_view(request):
             'monthly_change_percentage': monthly_change_percentage,
             'total_withdrawable': portfolio.total_withdrawable if portfolio else Decimal('0'),
             'manual_profit_total': portfolio.manual_profit_total if portfolio else Decimal('0'),
-            'unread_notifications': unread_notifications,
-            'recent_notifications': recent_notifications,
         }
         
         return render(request, 'dashboard/dashboard.html', context)
@@ -219,8 +211,6 @@ def dashboard_view(request):
             'monthly_change': 0,
             'monthly_change_percentage': 0,
             'total_withdrawable': 0,
-            'unread_notifications': [],
-            'recent_notifications': [],
         }
         
         return render(request, 'dashboard/dashboard.html', context)
@@ -230,20 +220,6 @@ class DepositView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        try:
-            # Get user notifications
-            from transactions.models import TransactionNotification
-            unread_notifications = TransactionNotification.objects.filter(
-                user=self.request.user,
-                is_read=False
-            ).order_by('-created_at')[:10]
-            
-            context['unread_notifications'] = unread_notifications
-        except Exception as e:
-            print(f"DepositView notification error: {str(e)}")
-            context['unread_notifications'] = []
-        
         context['page_title'] = 'Deposit Funds'
         return context
 
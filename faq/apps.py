@@ -5,3 +5,6 @@ class FaqConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'faq'
     verbose_name = 'FAQ Management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
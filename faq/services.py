@@ -0,0 +1,105 @@
+"""
+Shared, in-process snapshot of the active FAQ content.
+
+The home page, contact page, FAQ pages and the faq_tags template tags all read
+from one snapshot loaded in two queries. A content version (a database
+counter, see pipsmade.page_cache) is bumped whenever an FAQ or FAQCategory is
+saved or deleted; each process reloads its snapshot the next time it sees a
+newer version.
+
+The snapshot is always loaded from the primary database: it is stored under
+the version read from the primary, and rows from a lagging replica would stay
+in it until the next edit.
+"""
+import logging
+import threading
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Prefetch
+
+from pipsmade.page_cache import get_content_version, bump_content_version
+from .models import FAQCategory, FAQ
+
+logger = logging.getLogger(__name__)
+
+FAQ_VERSION_KEY = 'faq:version'
+
+# Well-known categories used on the public pages
+MAIN_CATEGORY = 'Platform & Security'
+SUPPORT_CATEGORY = 'Support & Contact'
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+class FAQSnapshot:
+    """Immutable view of active categories with their active FAQs attached"""
+
+    def __init__(self, version, categories):
+        self.version = version
+        self.categories = categories
+        for category in categories:
+            for faq in category.active_faqs:
+                # Attach the cached category so templates never lazy-load it
+                faq.category = category
+
+        self.by_name = {category.name: category for category in categories}
+        self.by_slug = {category.slug: category for category in categories}
+        self.total_faqs = sum(len(category.active_faqs) for category in categories)
+        # Rendered HTML fragments, discarded together with this snapshot
+        self.fragments = {}
+
+    def get_category(self, name=None, slug=None):
+        if slug is not None:
+            return self.by_slug.get(slug)
+        return self.by_name.get(name)
+
+    def faqs_for(self, name=None, slug=None, limit=None):
+        """Active FAQs for a category (by name or slug), optionally limited"""
+        category = self.get_category(name=name, slug=slug)
+        if category is None:
+            return []
+        faqs = category.active_faqs
+        return faqs[:limit] if limit else list(faqs)
+
+
+def get_faq_version():
+    return get_content_version(FAQ_VERSION_KEY)
+
+
+def bump_faq_version():
+    """Invalidate every process's FAQ snapshot"""
+    bump_content_version(FAQ_VERSION_KEY)
+
+
+def load_faq_snapshot(version):
+    categories = list(
+        FAQCategory.objects.db_manager(DEFAULT_DB_ALIAS).filter(is_active=True).prefetch_related(
+            Prefetch('faqs', queryset=FAQ.objects.filter(is_active=True), to_attr='active_faqs')
+        )
+    )
+    logger.info(f"Loaded FAQ snapshot v{version}: {len(categories)} categories")
+    return FAQSnapshot(version, categories)
+
+
+def get_cached_fragment(key, render):
+    """Return a rendered fragment for the current snapshot, rendering it once"""
+    snapshot = get_faq_snapshot()
+    fragment = snapshot.fragments.get(key)
+    if fragment is None:
+        fragment = snapshot.fragments[key] = render()
+    return fragment
+
+
+def get_faq_snapshot():
+    """Return the current snapshot, reloading it if the version has moved on"""
+    global _snapshot
+    version = get_faq_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_faq_snapshot(version)
+        return _snapshot
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import FAQCategory, FAQ
+from .services import bump_faq_version
+
+
+@receiver([post_save, post_delete], sender=FAQ)
+@receiver([post_save, post_delete], sender=FAQCategory)
+def invalidate_faq_snapshot(sender, **kwargs):
+    """Any FAQ content change invalidates the shared snapshot"""
+    bump_faq_version()
@@ -1,45 +1,35 @@
 from django import template
 from django.utils.safestring import mark_safe
-from faq.models import FAQCategory, FAQ
+from faq.services import get_faq_snapshot, get_cached_fragment, MAIN_CATEGORY, SUPPORT_CATEGORY
 
 register = template.Library()
 
 @register.simple_tag
 def get_faqs_by_category(category_name, limit=None):
     """Get FAQs for a specific category"""
-    try:
-        category = FAQCategory.objects.get(name=category_name, is_active=True)
-        faqs = category.faqs.filter(is_active=True)
-        if limit:
-            faqs = faqs[:limit]
-        return faqs
-    except FAQCategory.DoesNotExist:
-        return []
+    return get_faq_snapshot().faqs_for(category_name, limit=limit)
 
 @register.simple_tag
 def get_main_faqs(limit=6):
     """Get main platform FAQs for the home page"""
-    try:
-        category = FAQCategory.objects.get(name='Platform & Security', is_active=True)
-        return category.faqs.filter(is_active=True)[:limit]
-    except FAQCategory.DoesNotExist:
-        return []
+    return get_faq_snapshot().faqs_for(MAIN_CATEGORY, limit=limit)
 
 @register.simple_tag
 def get_support_faqs(limit=3):
     """Get support FAQs for the contact page"""
-    try:
-        category = FAQCategory.objects.get(name='Support & Contact', is_active=True)
-        return category.faqs.filter(is_active=True)[:limit]
-    except FAQCategory.DoesNotExist:
-        return []
+    return get_faq_snapshot().faqs_for(SUPPORT_CATEGORY, limit=limit)
 
 @register.simple_tag
 def render_faq_accordion(faqs, accordion_id='faqAccordion'):
-    """Render FAQ accordion HTML"""
+    """Render FAQ accordion HTML, cached per FAQ content version"""
     if not faqs:
         return mark_safe('<p class="text-muted">No FAQs available at the moment.</p>')
-    
+
+    faqs = list(faqs)
+    key = (accordion_id, tuple(faq.id for faq in faqs))
+    return get_cached_fragment(key, lambda: _build_faq_accordion(faqs, accordion_id))
+
+def _build_faq_accordion(faqs, accordion_id):
     html = f'<div class="accordion" id="{accordion_id}">'
     
     for i, faq in enumerate(faqs, 1):
@@ -49,12 +39,12 @@ def render_faq_accordion(faqs, accordion_id='faqAccordion'):
         
         html += f'''
         <div class="accordion-item">
-            <h2 class="accordion-header" id="faq{i}">
-                <button class="{button_class}" type="button" data-bs-toggle="collapse" data-bs-target="#collapse{i}">
+            <h2 class="accordion-header" id="{accordion_id}-faq{i}">
+                <button class="{button_class}" type="button" data-bs-toggle="collapse" data-bs-target="#{accordion_id}-collapse{i}">
                     {faq.question}
                 </button>
             </h2>
-            <div id="collapse{i}" class="accordion-collapse {collapse_class}" data-bs-parent="#{accordion_id}">
+            <div id="{accordion_id}-collapse{i}" class="accordion-collapse {collapse_class}" data-bs-parent="#{accordion_id}">
                 <div class="accordion-body">
                     {faq.answer}
                 </div>
@@ -63,4 +53,4 @@ def render_faq_accordion(faqs, accordion_id='faqAccordion'):
         '''
     
     html += '</div>'
-    return mark_safe(html) 
\ No newline at end of file
+    return mark_safe(html)
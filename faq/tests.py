@@ -1,3 +1,16 @@
-from django.test import TestCase
+from faq.models import FAQ, FAQCategory
+from pipsmade.testing import QueryBudgetTestCase
 
-# Create your tests here.
+FAQ_LIST_QUERIES = 3
+
+
+class FAQQueryBudgetTests(QueryBudgetTestCase):
+    def add_faqs(self):
+        for index in range(5):
+            category = FAQCategory.objects.create(name=f'Extra {index}', order=10 + index)
+            FAQ.objects.bulk_create([
+                FAQ(category=category, question=f'Extra {index}.{n}?', answer='Answer', order=n) for n in range(10)
+            ])
+
+    def test_faq_list(self):
+        self.assertQueryBudget('/faq/', FAQ_LIST_QUERIES, grow=self.add_faqs)
@@ -1,32 +1,31 @@
 from django.shortcuts import render
-from .models import FAQCategory, FAQ
+from pipsmade.db_router import use_read_replica
+from pipsmade.page_cache import cache_anonymous_page
+from .services import get_faq_snapshot, get_faq_version
 
+@cache_anonymous_page(get_faq_version)
+@use_read_replica
 def faq_list(request):
     """Display all FAQ categories and questions"""
-    categories = FAQCategory.objects.filter(is_active=True).prefetch_related('faqs')
-    
-    # Filter active FAQs for each category
-    for category in categories:
-        category.faqs = category.faqs.filter(is_active=True)
-    
+    snapshot = get_faq_snapshot()
+
     context = {
-        'categories': categories,
-        'total_faqs': FAQ.objects.filter(is_active=True).count()
+        'categories': snapshot.categories,
+        'total_faqs': snapshot.total_faqs
     }
     return render(request, 'faq/faq_list.html', context)
 
+@cache_anonymous_page(get_faq_version)
+@use_read_replica
 def faq_by_category(request, category_slug):
     """Display FAQs for a specific category"""
-    try:
-        category = FAQCategory.objects.get(slug=category_slug, is_active=True)
-        faqs = category.faqs.filter(is_active=True)
-    except FAQCategory.DoesNotExist:
-        category = None
-        faqs = []
-    
+    snapshot = get_faq_snapshot()
+    category = snapshot.get_category(slug=category_slug)
+    faqs = category.active_faqs if category else []
+
     context = {
         'category': category,
         'faqs': faqs,
-        'categories': FAQCategory.objects.filter(is_active=True)
+        'categories': snapshot.categories
     }
     return render(request, 'faq/faq_category.html', context)
@@ -0,0 +1,137 @@
+"""
+Batch accrual of daily returns for active investments.
+
+This engine is opt-in: it only runs when an admin triggers it (management
+command ``accrue_returns`` or the UserInvestment admin action). Each run
+walks active investments in primary-key chunks, computes the day's return
+from ``roi_percentage`` spread evenly over the investment duration, and
+writes the results with one ``bulk_create`` and one batched UPDATE per chunk.
+Re-running for the same date is harmless: existing InvestmentReturn rows are
+skipped through the (investment, date) unique constraint and the investment
+totals are recomputed to the same values. Backfilling an earlier date adds
+its missing return rows but leaves the totals alone once a later date has
+been accrued.
+"""
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from pipsmade.db import bulk_update_rows
+from .models import UserInvestment, InvestmentReturn
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+HUNDRED = Decimal('100')
+DEFAULT_CHUNK_SIZE = 2000
+
+
+@dataclass
+class AccrualResult:
+    as_of: object
+    investments_scanned: int = 0
+    investments_accrued: int = 0
+    returns_submitted: int = 0
+    chunks: int = 0
+
+
+def compute_accrual(amount, roi_percentage, manual_profit, duration_days, day_index):
+    """
+    Return (daily_return, cumulative_return, return_percentage, current_value, total_profit).
+
+    Everything is Decimal and rounded to cents, so a full duration accrues
+    exactly ``amount * roi_percentage / 100`` with any rounding remainder
+    booked on the final day.
+    """
+    total_return = (amount * roi_percentage / HUNDRED).quantize(CENT, ROUND_HALF_UP)
+    daily_return = (total_return / duration_days).quantize(CENT, ROUND_HALF_UP)
+    if day_index >= duration_days:
+        cumulative = total_return
+        daily_return = total_return - daily_return * (duration_days - 1)
+    else:
+        cumulative = daily_return * day_index
+    return_percentage = (cumulative / amount * HUNDRED).quantize(CENT, ROUND_HALF_UP) if amount else Decimal('0')
+    total_profit = cumulative + (manual_profit or Decimal('0'))
+    return daily_return, cumulative, return_percentage, amount + total_profit, total_profit
+
+
+def accrue_daily_returns(as_of=None, queryset=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Accrue returns for ``as_of`` (default today) on all active investments"""
+    as_of = as_of or timezone.localdate()
+    result = AccrualResult(as_of=as_of)
+
+    investments = (queryset if queryset is not None else UserInvestment.objects.all()).filter(
+        status='active',
+        start_date__date__lt=as_of,
+    ).only(
+        'id', 'amount', 'roi_percentage', 'manual_profit', 'start_date', 'end_date',
+        'current_value', 'total_profit',
+    ).order_by('id')
+
+    last_id = 0
+    while True:
+        chunk = list(investments.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+        result.chunks += 1
+        result.investments_scanned += len(chunk)
+        _accrue_chunk(chunk, as_of, result)
+
+    logger.info(
+        f"Accrued returns for {result.as_of}: {result.investments_accrued} investments, "
+        f"{result.returns_submitted} return rows submitted in {result.chunks} chunks"
+    )
+    return result
+
+
+def _accrue_chunk(chunk, as_of, result):
+    now = timezone.now()
+    returns = []
+    updated = []
+    latest_accrued = dict(
+        InvestmentReturn.objects.filter(investment_id__in=[investment.id for investment in chunk])
+        .order_by().values('investment_id').annotate(latest=Max('date')).values_list('investment_id', 'latest')
+    )
+
+    for investment in chunk:
+        start = timezone.localdate(investment.start_date)
+        duration_days = max((timezone.localdate(investment.end_date) - start).days, 1)
+        day_index = (as_of - start).days
+        if day_index < 1 or day_index > duration_days:
+            continue
+
+        daily, cumulative, percentage, current_value, total_profit = compute_accrual(
+            investment.amount, investment.roi_percentage, investment.manual_profit,
+            duration_days, day_index,
+        )
+        returns.append(InvestmentReturn(
+            investment_id=investment.id,
+            date=as_of,
+            daily_return=daily,
+            cumulative_return=cumulative,
+            return_percentage=percentage,
+        ))
+        latest = latest_accrued.get(investment.id)
+        if latest is None or as_of >= latest:
+            # The totals are cumulative: a backfill must not roll them back
+            investment.current_value = current_value
+            investment.total_profit = total_profit
+            investment.updated_at = now
+            updated.append(investment)
+
+    if not returns:
+        return
+
+    with transaction.atomic():
+        created = InvestmentReturn.objects.bulk_create(returns, ignore_conflicts=True)
+        bulk_update_rows(updated, ['current_value', 'total_profit', 'updated_at'])
+
+    result.investments_accrued += len(returns)
+    # ignore_conflicts gives no per-row feedback, so this counts rows sent, not rows inserted
+    result.returns_submitted += len(created)
+
@@ -13,6 +13,7 @@ class UserInvestmentAdmin(admin.ModelAdmin):
     list_filter = ['status', 'created_at', 'investment_plan__plan_type']
     search_fields = ['user__username', 'user__email', 'investment_plan__name']
     readonly_fields = ['created_at', 'updated_at']
+    actions = ['accrue_daily_returns']
     
     def get_plan_name(self, obj):
         if obj.investment_plan:
@@ -22,6 +23,16 @@ class UserInvestmentAdmin(admin.ModelAdmin):
         return "No Plan"
     get_plan_name.short_description = 'Investment Plan'
 
+    def accrue_daily_returns(self, request, queryset):
+        from .accrual import accrue_daily_returns
+        result = accrue_daily_returns(queryset=queryset)
+        messages.success(
+            request,
+            f'Accrued {result.as_of} returns for {result.investments_accrued} of '
+            f'{result.investments_scanned} active investments.'
+        )
+    accrue_daily_returns.short_description = "Accrue today's returns for selected active investments"
+
 class InvestmentReturnAdmin(admin.ModelAdmin):
     list_display = ['investment', 'date', 'daily_return', 'cumulative_return', 'return_percentage']
     list_filter = ['date', 'investment__status']
@@ -0,0 +1,143 @@
+"""
+In-memory plan table for the investment calculator.
+
+The calculator is hit on every slider movement, so plans are loaded once
+into a column-oriented table (ids, names, ROI rates, limits) and kept per
+process until any InvestmentPlan is saved or deleted. A content version
+(a database counter, see pipsmade.page_cache), bumped by the plan signals,
+tells every process when to reload. The table is loaded from the primary
+database, whose rows match the version it is stored under.
+Projections for many plans are computed in one pass over the rate columns
+without touching the database.
+"""
+import hashlib
+import logging
+import threading
+from decimal import Decimal, InvalidOperation
+
+from django.db import DEFAULT_DB_ALIAS
+
+from pipsmade.page_cache import get_content_version, bump_content_version
+from .models import InvestmentPlan
+
+logger = logging.getLogger(__name__)
+
+PLAN_TABLE_VERSION_KEY = 'investments:plan_table_version'
+HUNDRED = Decimal('100')
+MAX_BATCH_SIZE = 100
+# Largest value an investment amount column (max_digits=12, decimal_places=2)
+# can hold; anything above it is not a real amount and may overflow float()
+MAX_AMOUNT = Decimal('9999999999.99')
+
+_table = None
+_table_lock = threading.Lock()
+
+
+class PlanTable:
+    """Column-oriented snapshot of every investment plan"""
+
+    def __init__(self, version, plans):
+        self.version = version
+        self.ids = [plan.id for plan in plans]
+        self.names = [plan.name for plan in plans]
+        self.durations = [plan.duration_days for plan in plans]
+        self.min_investments = [plan.min_investment for plan in plans]
+        self.max_investments = [plan.max_investment for plan in plans]
+        self.active = [plan.is_active for plan in plans]
+        # ROI percentages pre-divided so a projection is a single multiply
+        self.min_rates = [plan.min_roi_percentage / HUNDRED for plan in plans]
+        self.max_rates = [plan.max_roi_percentage / HUNDRED for plan in plans]
+        self.avg_rates = [plan.get_average_roi() / HUNDRED for plan in plans]
+        self.index = {plan_id: i for i, plan_id in enumerate(self.ids)}
+        self.active_rows = [i for i, active in enumerate(self.active) if active]
+
+    def project(self, rows, amounts):
+        """Projected returns for parallel lists of table rows and amounts"""
+        results = []
+        for i, amount in zip(rows, amounts):
+            min_return = amount * self.min_rates[i]
+            max_return = amount * self.max_rates[i]
+            avg_return = amount * self.avg_rates[i]
+            max_investment = self.max_investments[i]
+            results.append({
+                'plan_id': self.ids[i],
+                'plan_name': self.names[i],
+                'amount': float(amount),
+                'min_return': float(min_return),
+                'max_return': float(max_return),
+                'avg_return': float(avg_return),
+                'min_total': float(amount + min_return),
+                'max_total': float(amount + max_return),
+                'avg_total': float(amount + avg_return),
+                'duration_days': self.durations[i],
+                'within_limits': amount >= self.min_investments[i] and (
+                    max_investment is None or amount <= max_investment
+                ),
+            })
+        return results
+
+    def project_all(self, amount):
+        """Project one amount across every active plan"""
+        return self.project(self.active_rows, [amount] * len(self.active_rows))
+
+
+def get_plan_table_version():
+    return get_content_version(PLAN_TABLE_VERSION_KEY)
+
+
+def bump_plan_table_version():
+    """Invalidate every process's plan table"""
+    bump_content_version(PLAN_TABLE_VERSION_KEY)
+
+
+def get_plan_table():
+    """Return the current plan table, reloading it if a plan has changed"""
+    global _table
+    version = get_plan_table_version()
+    table = _table
+    if table is not None and table.version == version:
+        return table
+
+    with _table_lock:
+        if _table is None or _table.version != version:
+            _table = PlanTable(version, list(InvestmentPlan.objects.db_manager(DEFAULT_DB_ALIAS).all()))
+            logger.info(f"Loaded plan table v{version}: {len(_table.ids)} plans")
+        return _table
+
+
+def parse_amount(value):
+    """Parse a positive Decimal amount up to MAX_AMOUNT, raising ValueError otherwise"""
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, TypeError):
+        raise ValueError(f'Invalid amount: {value}')
+    if not amount.is_finite() or amount <= 0:
+        raise ValueError(f'Invalid amount: {value}')
+    if amount > MAX_AMOUNT:
+        raise ValueError(f'Amount exceeds {MAX_AMOUNT}: {value}')
+    return amount
+
+
+def parse_pairs(value):
+    """Parse ``plan_id:amount,plan_id:amount`` into two parallel lists"""
+    plan_ids, amounts = [], []
+    for pair in filter(None, value.split(',')):
+        plan_id, sep, amount = pair.partition(':')
+        if not sep:
+            raise ValueError(f'Invalid pair: {pair}')
+        try:
+            plan_ids.append(int(plan_id))
+        except ValueError:
+            raise ValueError(f'Invalid plan id: {plan_id}')
+        amounts.append(parse_amount(amount))
+    if not plan_ids:
+        raise ValueError('No pairs given')
+    if len(plan_ids) > MAX_BATCH_SIZE:
+        raise ValueError(f'At most {MAX_BATCH_SIZE} pairs per request')
+    return plan_ids, amounts
+
+
+def calculator_etag(request):
+    """ETag from the plan table version and the query string"""
+    key = f'{get_plan_table_version()}:{request.GET.urlencode()}'
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
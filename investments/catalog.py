@@ -0,0 +1,76 @@
+"""
+Cached catalog of active investment plans.
+
+The homepage pricing section, the investments page and anything else that
+lists plans read from one catalog: active InvestmentPlan and
+AdminInvestmentPlan rows plus the pricing stats, built in a single pass.
+The catalog is kept per process and in the shared cache under the plan
+version also used by the calculator's plan table, so saving or deleting any
+plan invalidates both. Like the plan table, it is loaded from the primary
+database so a lagging replica cannot pin old plans under a new version.
+"""
+import logging
+import threading
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .calculator import get_plan_table_version
+from .models import InvestmentPlan, AdminInvestmentPlan
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CACHE_KEY = 'investments:plan_catalog:{version}'
+# Superseded versions simply expire
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 24
+HOMEPAGE_PLAN_LIMIT = 6
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+class PlanCatalog:
+    """Active plans and pricing stats for one plan version"""
+
+    def __init__(self, version, plans, admin_plans):
+        self.version = version
+        self.plans = plans
+        self.admin_plans = admin_plans
+        self.homepage_plans = sorted(plans, key=lambda plan: plan.min_investment)[:HOMEPAGE_PLAN_LIMIT]
+        self.pricing_stats = {
+            'total_plans': len(plans),
+            'min_roi': min((plan.min_roi_percentage for plan in plans), default=0),
+            'max_roi': max((plan.max_roi_percentage for plan in plans), default=0),
+        }
+
+
+def load_plan_catalog(version):
+    catalog = PlanCatalog(
+        version,
+        list(InvestmentPlan.objects.db_manager(DEFAULT_DB_ALIAS).filter(is_active=True)),
+        list(AdminInvestmentPlan.objects.db_manager(DEFAULT_DB_ALIAS).filter(is_active=True)),
+    )
+    logger.info(
+        f"Loaded plan catalog v{version}: {len(catalog.plans)} plans, "
+        f"{len(catalog.admin_plans)} admin plans"
+    )
+    return catalog
+
+
+def get_plan_catalog():
+    """Return the current catalog from this process, the shared cache or the database"""
+    global _catalog
+    version = get_plan_table_version()
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+
+    with _catalog_lock:
+        if _catalog is None or _catalog.version != version:
+            key = CATALOG_CACHE_KEY.format(version=version)
+            catalog = cache.get(key)
+            if catalog is None:
+                catalog = load_plan_catalog(version)
+                cache.set(key, catalog, CATALOG_CACHE_TIMEOUT)
+            _catalog = catalog
+        return _catalog
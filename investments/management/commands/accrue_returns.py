@@ -0,0 +1,43 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from investments.accrual import accrue_daily_returns, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Accrue daily returns for all active investments (opt-in, safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=str,
+            help='Date to accrue for (YYYY-MM-DD), defaults to today'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help='Number of investments loaded and written per batch'
+        )
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options['date']:
+            try:
+                as_of = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Invalid date: {options['date']}")
+
+        started = time.perf_counter()
+        result = accrue_daily_returns(as_of=as_of, chunk_size=options['chunk_size'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Accrued {result.as_of}: {result.investments_accrued} of '
+                f'{result.investments_scanned} active investments in {result.chunks} chunks '
+                f'({elapsed:.2f}s)'
+            )
+        )
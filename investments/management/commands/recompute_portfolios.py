@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from investments.portfolio import recompute_portfolios, recompute_changed_portfolios
+
+
+class Command(BaseCommand):
+    help = 'Rebuild user portfolios from investments and manual profits'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only rebuild portfolios whose sources changed since the last incremental run'
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='With --incremental, use this ISO datetime as the watermark instead of the stored one'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid datetime for --since: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        if options['incremental'] or since:
+            written, watermark = recompute_changed_portfolios(since=since)
+            self.stdout.write(
+                self.style.SUCCESS(f'Recomputed {written} changed portfolios (watermark {watermark.isoformat()})')
+            )
+        else:
+            written = recompute_portfolios()
+            self.stdout.write(self.style.SUCCESS(f'Recomputed {written} portfolios'))
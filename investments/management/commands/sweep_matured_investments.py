@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from investments.maturity import sweep_matured_investments, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Complete matured investments and pay out their profit (idempotent, safe to run every minute)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of investments completed per database transaction'
+        )
+
+    def handle(self, *args, **options):
+        result = sweep_matured_investments(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Completed {result.completed} matured investments, '
+                f'{result.payouts} payouts, {result.portfolios_updated} portfolios updated'
+            )
+        )
@@ -0,0 +1,135 @@
+"""
+Sweeper that completes matured investments in bulk.
+
+Designed to run every minute (management command ``sweep_matured_investments``).
+Matured rows are found with a range scan on the (status, end_date) index,
+flipped to ``completed`` with a single UPDATE, and their payout transactions,
+notifications and portfolio counters are written in bulk inside the same
+database transaction. Because the status flip and the side effects commit
+together, an investment is only ever paid out once no matter how often the
+sweeper runs.
+"""
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from transactions.models import Transaction, TransactionNotification
+from transactions.notifications import record_notifications_created
+from .models import UserInvestment, UserPortfolio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class SweepResult:
+    completed: int = 0
+    payouts: int = 0
+    portfolios_updated: int = 0
+
+
+def get_payout_amount(investment):
+    """Profit paid out at maturity: accrued/admin profit, else the expected return"""
+    return investment.total_profit or investment.expected_return or 0
+
+
+def sweep_matured_investments(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Complete every active investment whose end_date has passed"""
+    now = now or timezone.now()
+    result = SweepResult()
+    while True:
+        completed = _sweep_batch(now, batch_size, result)
+        if completed < batch_size:
+            break
+    if result.completed:
+        logger.info(
+            f"Matured {result.completed} investments, {result.payouts} payouts, "
+            f"{result.portfolios_updated} portfolios updated"
+        )
+    return result
+
+
+def _sweep_batch(now, batch_size, result):
+    with transaction.atomic():
+        matured = UserInvestment.objects.filter(status='active', end_date__lte=now).order_by('end_date')
+        if connection.features.has_select_for_update_skip_locked:
+            # Overlapping sweeper runs each take a disjoint set of rows
+            matured = matured.select_for_update(skip_locked=True)
+        ids = list(matured.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0
+
+        # Flip first, then read back only the rows this run flipped (tagged by
+        # swept_at). Without row locks (SQLite) a concurrent run blocks on the
+        # UPDATE and afterwards finds nothing left to pay out.
+        swept_at = timezone.now()
+        UserInvestment.objects.filter(id__in=ids, status='active').update(
+            status='completed', updated_at=swept_at
+        )
+        investments = list(UserInvestment.objects.filter(
+            id__in=ids, status='completed', updated_at=swept_at
+        ).only('id', 'user_id', 'amount', 'total_profit', 'expected_return', 'end_date'))
+
+        _create_payouts(investments, swept_at, result)
+        _adjust_portfolio_counts(investments, result)
+
+    result.completed += len(investments)
+    return len(ids)
+
+
+def _create_payouts(investments, now, result):
+    payouts = []
+    for investment in investments:
+        amount = get_payout_amount(investment)
+        if amount <= 0:
+            continue
+        payouts.append(Transaction(
+            user_id=investment.user_id,
+            transaction_type='profit',
+            status='completed',
+            amount=amount,
+            usd_equivalent=amount,
+            crypto_type='USD',
+            admin_notes=f'Investment #{investment.id} matured on {investment.end_date:%Y-%m-%d}',
+            approved_at=now,
+            completed_at=now,
+        ))
+    if not payouts:
+        return
+
+    payouts = Transaction.objects.bulk_create(payouts)
+    notifications = TransactionNotification.objects.bulk_create([
+        TransactionNotification(
+            user_id=payout.user_id,
+            transaction=payout,
+            title='Investment Matured',
+            message=f'Your investment has matured. A profit of ${payout.amount} has been credited.',
+            notification_type='investment_matured',
+        )
+        for payout in payouts
+    ])
+    # bulk_create skips the signals that keep unread counters current
+    record_notifications_created(notifications)
+    result.payouts += len(payouts)
+
+
+def _adjust_portfolio_counts(investments, result):
+    # Users sharing the same matured count are updated together, so a batch
+    # costs one UPDATE per distinct count rather than one per user
+    matured_per_user = Counter(investment.user_id for investment in investments)
+    users_by_count = defaultdict(list)
+    for user_id, count in matured_per_user.items():
+        users_by_count[count].append(user_id)
+
+    for count, user_ids in users_by_count.items():
+        result.portfolios_updated += UserPortfolio.objects.filter(user_id__in=user_ids).update(
+            active_investments=Greatest(F('active_investments') - count, Value(0)),
+            completed_investments=F('completed_investments') + count,
+            last_updated=timezone.now(),
+        )
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0004_alter_userinvestment_investment_plan_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userinvestment',
+            index=models.Index(fields=['status', 'end_date'], name='investment_status_end_idx'),
+        ),
+    ]
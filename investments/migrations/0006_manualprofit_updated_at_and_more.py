@@ -0,0 +1,22 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0005_userinvestment_status_end_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='manualprofit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='userinvestment',
+            index=models.Index(fields=['updated_at'], name='investment_updated_idx'),
+        ),
+    ]
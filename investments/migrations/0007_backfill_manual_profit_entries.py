@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Sum
+
+
+def backfill_manual_profits(apps, schema_editor):
+    """
+    Portfolios used to be patched in place by the admin "add profit" view
+    without a ManualProfit row. Record the difference as a ManualProfit entry
+    so recomputing portfolios from source tables keeps those profits.
+    """
+    UserPortfolio = apps.get_model('investments', 'UserPortfolio')
+    ManualProfit = apps.get_model('investments', 'ManualProfit')
+
+    recorded = dict(
+        ManualProfit.objects.filter(is_active=True).order_by().values('user_id')
+        .annotate(total=Sum('amount')).values_list('user_id', 'total')
+    )
+    missing = []
+    for user_id, manual_total in UserPortfolio.objects.filter(manual_profit_total__gt=0).values_list('user_id', 'manual_profit_total'):
+        difference = manual_total - (recorded.get(user_id) or Decimal('0'))
+        if difference > 0:
+            missing.append(ManualProfit(
+                user_id=user_id,
+                amount=difference,
+                description='Backfilled from portfolio manual profit total',
+            ))
+    ManualProfit.objects.bulk_create(missing)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0006_manualprofit_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_manual_profits, migrations.RunPython.noop),
+    ]
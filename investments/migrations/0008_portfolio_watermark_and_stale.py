@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investments', '0007_backfill_manual_profit_entries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioRecomputeWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recomputed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StalePortfolio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField(unique=True)),
+                ('marked_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -159,6 +159,10 @@ class UserInvestment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'end_date'], name='investment_status_end_idx'),
+            models.Index(fields=['updated_at'], name='investment_updated_idx'),
+        ]
 
     def __str__(self):
         plan_name = self.investment_plan.name if self.investment_plan else self.admin_investment_plan.name
@@ -297,6 +301,7 @@ class ManualProfit(models.Model):
     given_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='profits_given', help_text="Admin who gave this profit")
     given_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True, help_text="Whether this profit is still active")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     class Meta:
         ordering = ['-given_at']
@@ -330,13 +335,34 @@ class UserPortfolio(models.Model):
         return f"{self.user.username}'s Portfolio"
 
     def update_portfolio_metrics(self):
-        """NO AUTOMATIC UPDATES - Admin must update manually"""
-        # This method does nothing - admin controls all values
-        pass
+        """Rebuild this portfolio from the user's investments and manual profits"""
+        from .portfolio import recompute_portfolios
+        recompute_portfolios([self.user_id])
+        self.refresh_from_db()
 
     @classmethod
     def get_or_create_portfolio(cls, user):
         """Get or create portfolio for user - no automatic updates"""
-        portfolio, created = cls.objects.get_or_create(user=user)
+        # Always on the primary, also in views routed to the read replica: a
+        # lagging replica misses a fresh row and the insert then collides
+        portfolio, created = cls.objects.db_manager(router.db_for_write(cls)).get_or_create(user=user)
         # NO automatic updates - admin must set all values manually
         return portfolio
+
+
+class PortfolioRecomputeWatermark(models.Model):
+    """Start time of the last incremental portfolio rebuild (a single row)"""
+    recomputed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Portfolios recomputed through {self.recomputed_at}"
+
+
+class StalePortfolio(models.Model):
+    """A user whose investments or manual profits were deleted since the last incremental rebuild"""
+    # Not a foreign key: rows are marked while the user may be deleted in the same transaction
+    user_id = models.IntegerField(unique=True)
+    marked_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Stale portfolio for user {self.user_id}"
@@ -0,0 +1,178 @@
+"""
+Rebuild UserPortfolio rows from their source tables.
+
+Portfolios are derived data: totals come from the user's active/completed
+UserInvestment rows plus their active ManualProfit entries. Everything is
+computed with grouped aggregate queries (one per source table, per chunk of
+users) and written back in batches, so a full reconciliation costs a handful
+of queries instead of a query set per user.
+
+Incremental runs rebuild users whose rows changed after the watermark (kept
+in PortfolioRecomputeWatermark, so every ``manage.py`` process sees it) plus
+users marked in StalePortfolio: a deleted row leaves no ``updated_at`` behind,
+so the post_delete signals mark its user instead.
+
+Wallet balances are deliberately not folded in: the dashboard and withdraw
+views already add UserWallet balances on top of ``total_withdrawable``.
+"""
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.utils import timezone
+
+from pipsmade.db import bulk_update_rows
+from .models import UserInvestment, ManualProfit, UserPortfolio, PortfolioRecomputeWatermark, StalePortfolio
+
+logger = logging.getLogger(__name__)
+
+USER_CHUNK_SIZE = 500
+ZERO = Decimal('0')
+MAX_ROI = Decimal('999.99')
+
+PORTFOLIO_FIELDS = [
+    'total_invested', 'total_current_value', 'total_profit', 'total_roi_percentage',
+    'total_withdrawable', 'manual_profit_total', 'active_investments',
+    'completed_investments', 'last_updated',
+]
+
+
+def aggregate_portfolio_sources(user_ids=None):
+    """Return {user_id: metrics} computed with one grouped query per source table"""
+    investments = UserInvestment.objects.filter(status__in=['active', 'completed'])
+    manual_profits = ManualProfit.objects.filter(is_active=True)
+    if user_ids is not None:
+        investments = investments.filter(user_id__in=user_ids)
+        manual_profits = manual_profits.filter(user_id__in=user_ids)
+
+    metrics = {}
+    investment_rows = investments.order_by().values('user_id').annotate(
+        invested=Sum('amount'),
+        # get_current_value() treats an unset current_value as the principal
+        current_value=Sum(Case(When(current_value=0, then=F('amount')), default=F('current_value'))),
+        profit=Sum('total_profit'),
+        withdrawable=Sum('total_withdrawable'),
+        active=Count('id', filter=Q(status='active')),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+    for row in investment_rows:
+        metrics[row['user_id']] = dict(row, manual_profit=ZERO)
+
+    for row in manual_profits.order_by().values('user_id').annotate(total=Sum('amount')):
+        entry = metrics.setdefault(row['user_id'], {
+            'invested': ZERO, 'current_value': ZERO, 'profit': ZERO,
+            'withdrawable': ZERO, 'active': 0, 'completed': 0,
+        })
+        entry['manual_profit'] = row['total'] or ZERO
+
+    return metrics
+
+
+def apply_metrics(portfolio, entry, now):
+    """Set portfolio fields from an aggregate entry (or zero them when entry is None)"""
+    entry = entry or {}
+    invested = entry.get('invested') or ZERO
+    manual_profit = entry.get('manual_profit') or ZERO
+    profit = (entry.get('profit') or ZERO) + manual_profit
+
+    portfolio.total_invested = invested
+    portfolio.total_current_value = (entry.get('current_value') or ZERO) + manual_profit
+    portfolio.total_profit = profit
+    portfolio.total_withdrawable = (entry.get('withdrawable') or ZERO) + manual_profit
+    portfolio.manual_profit_total = manual_profit
+    portfolio.active_investments = entry.get('active') or 0
+    portfolio.completed_investments = entry.get('completed') or 0
+    if invested > 0:
+        roi = (profit / invested * 100).quantize(Decimal('0.01'), ROUND_HALF_UP)
+        portfolio.total_roi_percentage = min(roi, MAX_ROI)
+    else:
+        portfolio.total_roi_percentage = ZERO
+    portfolio.last_updated = now
+    return portfolio
+
+
+def _write_chunk(user_ids, metrics, now):
+    existing = {p.user_id: p for p in UserPortfolio.objects.filter(user_id__in=user_ids)}
+    to_update = [apply_metrics(existing[user_id], metrics.get(user_id), now) for user_id in existing]
+    to_create = [
+        apply_metrics(UserPortfolio(user_id=user_id), metrics[user_id], now)
+        for user_id in user_ids if user_id not in existing and user_id in metrics
+    ]
+    with transaction.atomic():
+        bulk_update_rows(to_update, PORTFOLIO_FIELDS)
+        UserPortfolio.objects.bulk_create(to_create, ignore_conflicts=True)
+    return len(to_update) + len(to_create)
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def recompute_portfolios(user_ids=None):
+    """
+    Rebuild portfolios for ``user_ids`` (or every user when None).
+
+    Returns the number of portfolios written.
+    """
+    now = timezone.now()
+    written = 0
+    if user_ids is None:
+        metrics = aggregate_portfolio_sources()
+        all_user_ids = set(metrics) | set(UserPortfolio.objects.values_list('user_id', flat=True))
+        for chunk in _chunks(sorted(all_user_ids), USER_CHUNK_SIZE):
+            written += _write_chunk(chunk, metrics, now)
+    else:
+        for chunk in _chunks(sorted(set(user_ids)), USER_CHUNK_SIZE):
+            written += _write_chunk(chunk, aggregate_portfolio_sources(chunk), now)
+
+    logger.info(f"Recomputed {written} portfolios")
+    return written
+
+
+def recompute_user_portfolio(user):
+    """Rebuild a single user's portfolio, used after admin edits"""
+    recompute_portfolios([user.id])
+    return UserPortfolio.objects.get(user=user)
+
+
+def users_changed_since(watermark):
+    """Users with investment or manual profit rows touched after ``watermark``"""
+    user_ids = set(UserInvestment.objects.filter(updated_at__gt=watermark).values_list('user_id', flat=True))
+    user_ids |= set(ManualProfit.objects.filter(updated_at__gt=watermark).values_list('user_id', flat=True))
+    return user_ids
+
+
+def mark_portfolio_stale(user_id):
+    """Queue ``user_id`` for the next incremental rebuild"""
+    StalePortfolio.objects.bulk_create(
+        [StalePortfolio(user_id=user_id, marked_at=timezone.now())],
+        update_conflicts=True, unique_fields=['user_id'], update_fields=['marked_at'],
+    )
+
+
+def get_watermark():
+    return PortfolioRecomputeWatermark.objects.values_list('recomputed_at', flat=True).first()
+
+
+def recompute_changed_portfolios(since=None):
+    """
+    Incremental mode: only rebuild portfolios whose sources changed since the
+    last run (or ``since``), plus users marked stale by deletions. Falls back
+    to a full run when no watermark is known.
+
+    Returns (portfolios written, new watermark).
+    """
+    started = timezone.now()
+    since = since or get_watermark()
+    stale = StalePortfolio.objects.filter(marked_at__lte=started)
+    if since is None:
+        written = recompute_portfolios()
+    else:
+        written = recompute_portfolios(users_changed_since(since) | set(stale.values_list('user_id', flat=True)))
+    # Marks made while this run was going keep their row for the next one
+    stale.delete()
+    PortfolioRecomputeWatermark.objects.update_or_create(pk=1, defaults={'recomputed_at': started})
+    return written, started
@@ -0,0 +1,75 @@
+"""
+ROI projections for investment plans.
+
+``create_investment`` assigns an investment a single ROI drawn uniformly
+from the plan's range and pays it out at maturity, so the profit is
+uniformly distributed between the plan's minimum and maximum. Its
+percentiles and histogram have closed forms (the p-th percentile is
+``min + spread * p / 100`` and every histogram bin of equal width holds the
+same share), so they are computed directly instead of simulated.
+
+``duration_days`` turns each band into a daily profit and a simple
+annualized ROI, which is what makes plans of different lengths comparable.
+Everything comes from the calculator's in-memory plan table, so a
+projection costs no queries and a few microseconds.
+"""
+from .calculator import get_plan_table
+
+PERCENTILES = (5, 50, 95)
+HISTOGRAM_BINS = 20
+DAYS_PER_YEAR = 365
+
+
+def roi_percentile(min_roi, max_roi, pct):
+    """ROI percentage at the ``pct``-th percentile of a uniform draw"""
+    return min_roi + (max_roi - min_roi) * pct / 100
+
+
+def summarize(min_roi, max_roi, amount, duration_days):
+    """Percentile bands and a histogram (over the plan's ROI range) in money terms"""
+    spread = max_roi - min_roi
+    duration_days = max(duration_days, 1)
+
+    def profit_at(roi):
+        return round(amount * roi / 100, 2)
+
+    rois = {f'p{pct}': roi_percentile(min_roi, max_roi, pct) for pct in PERCENTILES}
+    bands = {key: profit_at(roi) for key, roi in rois.items()}
+    histogram = [
+        {
+            'from': profit_at(min_roi + spread * i / HISTOGRAM_BINS),
+            'to': profit_at(min_roi + spread * (i + 1) / HISTOGRAM_BINS),
+            # Equal-width bins of a uniform distribution are equally likely
+            'probability': round(1 / HISTOGRAM_BINS, 4),
+        }
+        for i in range(HISTOGRAM_BINS)
+    ]
+    return {
+        'profit': bands,
+        'total': {key: round(amount + value, 2) for key, value in bands.items()},
+        'daily_profit': {key: round(amount * roi / 100 / duration_days, 2) for key, roi in rois.items()},
+        'annualized_roi': {key: round(roi * DAYS_PER_YEAR / duration_days, 2) for key, roi in rois.items()},
+        'histogram': histogram,
+    }
+
+
+def project_plan(plan_id, amount):
+    """
+    Projection of ``amount`` invested in a plan, or None for an unknown plan.
+    """
+    table = get_plan_table()
+    row = table.index.get(plan_id)
+    if row is None:
+        return None
+
+    duration_days = table.durations[row]
+    result = {
+        'plan_id': plan_id,
+        'plan_name': table.names[row],
+        'amount': float(amount),
+        'duration_days': duration_days,
+    }
+    result.update(summarize(
+        float(table.min_rates[row] * 100), float(table.max_rates[row] * 100), float(amount), duration_days,
+    ))
+    return result
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .calculator import bump_plan_table_version
+from .models import InvestmentPlan, AdminInvestmentPlan, UserInvestment, ManualProfit
+from .portfolio import mark_portfolio_stale
+
+
+@receiver([post_save, post_delete], sender=InvestmentPlan)
+@receiver([post_save, post_delete], sender=AdminInvestmentPlan)
+def invalidate_plan_table(sender, **kwargs):
+    """Any plan change invalidates the calculator's plan table and the plan catalog"""
+    bump_plan_table_version()
+
+
+@receiver(post_delete, sender=UserInvestment)
+@receiver(post_delete, sender=ManualProfit)
+def mark_portfolio_stale_on_delete(sender, instance, **kwargs):
+    """A deleted row has no updated_at for the incremental rebuild to find"""
+    mark_portfolio_stale(instance.user_id)
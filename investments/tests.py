@@ -1,3 +1,253 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pipsmade.testing import QueryBudgetTestCase
+from transactions.models import Transaction, TransactionNotification
+
+from .accrual import accrue_daily_returns, compute_accrual
+from .calculator import MAX_AMOUNT, parse_amount
+from .maturity import sweep_matured_investments
+from .models import InvestmentPlan, InvestmentReturn, ManualProfit, StalePortfolio, UserInvestment, UserPortfolio
+from .portfolio import get_watermark, recompute_changed_portfolios, recompute_portfolios
+from .projection import HISTOGRAM_BINS, project_plan
+
+INVESTMENTS_QUERIES = 9
+
+
+class InvestmentsQueryBudgetTests(QueryBudgetTestCase):
+    def test_investments_view(self):
+        self.login(self.investor)
+        self.seed_activity(self.investor, 3)
+        self.assertQueryBudget(
+            '/investments/', INVESTMENTS_QUERIES, grow=lambda: self.seed_activity(self.investor, 30)
+        )
+
+
+class InvestmentTestMixin:
+    @classmethod
+    def create_plan(cls, **overrides):
+        fields = dict(
+            name='Growth', plan_type='standard', description='Growth plan', min_investment=Decimal('100'),
+            max_investment=Decimal('10000'), min_roi_percentage=Decimal('10'), max_roi_percentage=Decimal('20'),
+            duration_days=10,
+        )
+        fields.update(overrides)
+        return InvestmentPlan.objects.create(**fields)
+
+    def invest(self, user, amount, roi='20', days=10, status='active', started_days_ago=0, **fields):
+        start = timezone.now() - timedelta(days=started_days_ago)
+        investment = UserInvestment.objects.create(
+            user=user, investment_plan=self.plan, amount=Decimal(amount), roi_percentage=Decimal(roi),
+            end_date=start + timedelta(days=days), status=status,
+            expected_return=Decimal(amount) * Decimal(roi) / 100, **fields
+        )
+        # start_date is auto_now_add
+        UserInvestment.objects.filter(pk=investment.pk).update(start_date=start)
+        investment.refresh_from_db()
+        return investment
+
+
+class PortfolioRecomputeTests(InvestmentTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = cls.create_plan()
+        cls.alice = User.objects.create_user('alice@example.com', 'alice@example.com', 'pw')
+        cls.bob = User.objects.create_user('bob@example.com', 'bob@example.com', 'pw')
+
+    def test_full_rebuild_sums_investments_and_manual_profits(self):
+        self.invest(self.alice, '1000', current_value=Decimal('1100'), total_profit=Decimal('100'))
+        self.invest(self.alice, '500', status='completed', total_profit=Decimal('50'))
+        self.invest(self.alice, '700', status='cancelled', total_profit=Decimal('70'))
+        ManualProfit.objects.create(user=self.alice, amount=Decimal('25'), description='Bonus')
+        ManualProfit.objects.create(user=self.alice, amount=Decimal('99'), description='Revoked', is_active=False)
+
+        recompute_portfolios()
+
+        portfolio = UserPortfolio.objects.get(user=self.alice)
+        self.assertEqual(portfolio.total_invested, Decimal('1500'))
+        # The completed investment has no current_value yet, so it counts at its principal
+        self.assertEqual(portfolio.total_current_value, Decimal('1625'))
+        self.assertEqual(portfolio.total_profit, Decimal('175'))
+        self.assertEqual(portfolio.manual_profit_total, Decimal('25'))
+        self.assertEqual(portfolio.total_roi_percentage, Decimal('11.67'))
+        self.assertEqual((portfolio.active_investments, portfolio.completed_investments), (1, 1))
+        self.assertFalse(UserPortfolio.objects.filter(user=self.bob).exists())
+
+    def test_incremental_watermark_survives_the_cache(self):
+        self.invest(self.alice, '1000')
+        written, watermark = recompute_changed_portfolios()
+        self.assertEqual(written, 1)
+
+        # A new manage.py process starts with an empty process-local cache
+        for cache in caches.all():
+            cache.clear()
+        self.assertEqual(get_watermark(), watermark)
+        self.invest(self.bob, '300')
+
+        written, _ = recompute_changed_portfolios()
+        self.assertEqual(written, 1)
+        self.assertEqual(UserPortfolio.objects.get(user=self.bob).total_invested, Decimal('300'))
+
+    def test_incremental_run_picks_up_deletions(self):
+        investment = self.invest(self.alice, '1000')
+        profit = ManualProfit.objects.create(user=self.alice, amount=Decimal('40'), description='Bonus')
+        recompute_changed_portfolios()
+
+        investment.delete()
+        profit.delete()
+        self.assertTrue(StalePortfolio.objects.filter(user_id=self.alice.id).exists())
+
+        recompute_changed_portfolios()
+        portfolio = UserPortfolio.objects.get(user=self.alice)
+        self.assertEqual((portfolio.total_invested, portfolio.manual_profit_total), (Decimal('0'), Decimal('0')))
+        self.assertFalse(StalePortfolio.objects.exists())
+
+
+class AccrualTests(InvestmentTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = cls.create_plan()
+        cls.user = User.objects.create_user('accrual@example.com', 'accrual@example.com', 'pw')
+
+    def test_final_day_books_the_rounding_remainder(self):
+        daily = [compute_accrual(Decimal('1000'), Decimal('10'), 0, 3, day)[0] for day in (1, 2, 3)]
+        self.assertEqual(daily, [Decimal('33.33'), Decimal('33.33'), Decimal('33.34')])
+        self.assertEqual(sum(daily), Decimal('100.00'))
+        self.assertEqual(compute_accrual(Decimal('1000'), Decimal('10'), 0, 3, 3)[1], Decimal('100.00'))
+
+    def test_full_duration_accrues_the_exact_return(self):
+        investment = self.invest(self.user, '1000', roi='10', days=3, started_days_ago=3)
+        start = timezone.localdate(investment.start_date)
+        for day in (1, 2, 3):
+            accrue_daily_returns(as_of=start + timedelta(days=day))
+
+        investment.refresh_from_db()
+        returns = InvestmentReturn.objects.filter(investment=investment).order_by('date')
+        self.assertEqual([r.daily_return for r in returns], [Decimal('33.33'), Decimal('33.33'), Decimal('33.34')])
+        self.assertEqual(investment.total_profit, Decimal('100.00'))
+        self.assertEqual(investment.current_value, Decimal('1100.00'))
+
+    def test_running_twice_for_the_same_date_is_idempotent(self):
+        investment = self.invest(self.user, '1000', roi='10', days=10, started_days_ago=5)
+        as_of = timezone.localdate(investment.start_date) + timedelta(days=2)
+
+        accrue_daily_returns(as_of=as_of)
+        investment.refresh_from_db()
+        first = (investment.current_value, investment.total_profit)
+        accrue_daily_returns(as_of=as_of)
+        investment.refresh_from_db()
+
+        self.assertEqual(InvestmentReturn.objects.filter(investment=investment).count(), 1)
+        self.assertEqual((investment.current_value, investment.total_profit), first)
+        self.assertEqual(first, (Decimal('1020.00'), Decimal('20.00')))
+
+    def test_backfilling_an_earlier_date_keeps_the_latest_totals(self):
+        investment = self.invest(self.user, '1000', roi='10', days=10, started_days_ago=5)
+        start = timezone.localdate(investment.start_date)
+
+        accrue_daily_returns(as_of=start + timedelta(days=4))
+        accrue_daily_returns(as_of=start + timedelta(days=2))
+
+        investment.refresh_from_db()
+        self.assertEqual(investment.total_profit, Decimal('40.00'))
+        self.assertEqual(InvestmentReturn.objects.filter(investment=investment).count(), 2)
+
+
+class MaturitySweepTests(InvestmentTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.plan = cls.create_plan()
+        cls.user = User.objects.create_user('sweep@example.com', 'sweep@example.com', 'pw')
+
+    def test_each_matured_investment_completes_exactly_once(self):
+        accrued = self.invest(self.user, '1000', days=5, started_days_ago=6, total_profit=Decimal('150'))
+        expected = self.invest(self.user, '500', roi='10', days=5, started_days_ago=6)
+        running = self.invest(self.user, '800', days=10, started_days_ago=6)
+        recompute_portfolios([self.user.id])
+
+        first = sweep_matured_investments(batch_size=1)
+        second = sweep_matured_investments()
+
+        self.assertEqual((first.completed, first.payouts), (2, 2))
+        self.assertEqual((second.completed, second.payouts), (0, 0))
+        statuses = dict(UserInvestment.objects.values_list('id', 'status'))
+        self.assertEqual(
+            statuses, {accrued.id: 'completed', expected.id: 'completed', running.id: 'active'}
+        )
+        payouts = Transaction.objects.filter(user=self.user, transaction_type='profit')
+        self.assertEqual(sorted(payouts.values_list('amount', flat=True)), [Decimal('50.00'), Decimal('150.00')])
+        self.assertEqual(
+            TransactionNotification.objects.filter(user=self.user, notification_type='investment_matured').count(), 2
+        )
+        portfolio = UserPortfolio.objects.get(user=self.user)
+        self.assertEqual((portfolio.active_investments, portfolio.completed_investments), (1, 2))
+
+
+class ProjectionTests(InvestmentTestMixin, TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.plan = self.create_plan(duration_days=10)
+
+    def test_bands_are_the_uniform_roi_percentiles(self):
+        with self.assertNumQueries(2):
+            # Version and plan table; the projection itself reads nothing
+            result = project_plan(self.plan.id, Decimal('1000'))
+        self.assertEqual(result['profit'], {'p5': 105.0, 'p50': 150.0, 'p95': 195.0})
+        self.assertEqual(result['total'], {'p5': 1105.0, 'p50': 1150.0, 'p95': 1195.0})
+        self.assertEqual(result['daily_profit'], {'p5': 10.5, 'p50': 15.0, 'p95': 19.5})
+
+        histogram = result['histogram']
+        self.assertEqual(len(histogram), HISTOGRAM_BINS)
+        self.assertEqual((histogram[0]['from'], histogram[-1]['to']), (100.0, 200.0))
+        self.assertAlmostEqual(sum(item['probability'] for item in histogram), 1)
+
+    def test_longer_plans_annualize_lower(self):
+        long_plan = self.create_plan(name='Long', duration_days=73)
+        short = project_plan(self.plan.id, Decimal('1000'))
+        long = project_plan(long_plan.id, Decimal('1000'))
+        self.assertEqual(short['profit'], long['profit'])
+        self.assertEqual(short['annualized_roi']['p50'], 547.5)
+        self.assertEqual(long['annualized_roi']['p50'], 75.0)
+
+    def test_unknown_plan(self):
+        self.assertIsNone(project_plan(0, Decimal('1000')))
+
+
+class CalculatorAmountTests(InvestmentTestMixin, TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.plan = self.create_plan()
+        self.client.force_login(User.objects.create_user('member', 'member@example.com', 'pw'))
+
+    def test_parse_amount_bounds(self):
+        self.assertEqual(parse_amount('1000'), Decimal('1000'))
+        self.assertEqual(parse_amount(str(MAX_AMOUNT)), MAX_AMOUNT)
+        for value in ('0', '-5', 'NaN', 'Infinity', '1e400', MAX_AMOUNT + Decimal('0.01'), None, 'abc'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_amount(value)
+
+    def test_huge_amounts_are_rejected_instead_of_serialized_as_infinity(self):
+        requests = [
+            (reverse('investment_calculator'), {'plan_id': self.plan.id, 'amount': '1e400'}),
+            (reverse('investment_projection'), {'plan_id': self.plan.id, 'amount': '1e400'}),
+            (reverse('investment_calculator_batch'), {'amount': '1e400'}),
+            (reverse('investment_calculator_batch'), {'pairs': f'{self.plan.id}:1e400'}),
+        ]
+        for url, params in requests:
+            with self.subTest(url=url, params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
 
-# Create your tests here.
+    def test_amounts_up_to_the_bound_are_projected(self):
+        response = self.client.get(reverse('investment_calculator'), {'plan_id': self.plan.id, 'amount': '1000'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['max_total'], 1200.0)
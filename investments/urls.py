@@ -7,4 +7,6 @@ urlpatterns = [
     path('<int:investment_id>/', views.investment_detail, name='investment_detail'),
     path('<int:investment_id>/cancel/', views.cancel_investment, name='cancel_investment'),
     path('calculator/', views.investment_calculator, name='investment_calculator'),
+    path('calculator/projection/', views.investment_projection, name='investment_projection'),
+    path('calculator/batch/', views.investment_calculator_batch, name='investment_calculator_batch'),
 ]
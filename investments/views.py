@@ -4,19 +4,24 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, DetailView
 from django.contrib import messages
 from django.http import JsonResponse
+from django.views.decorators.http import require_GET, etag
 from django.core.mail import send_mail
 from django.conf import settings
 from decimal import Decimal
 import random
 from .models import InvestmentPlan, UserInvestment, UserPortfolio
-from transactions.models import TransactionNotification
+from .calculator import get_plan_table, parse_amount, parse_pairs, calculator_etag
+from .projection import project_plan
+from .catalog import get_plan_catalog
 from .forms import InvestmentForm
 
 @login_required
 def investments_view(request):
     """Display available investment plans and user's investments"""
-    investment_plans = InvestmentPlan.objects.filter(is_active=True)
-    user_investments = UserInvestment.objects.filter(user=request.user).order_by('-created_at')
+    investment_plans = get_plan_catalog().plans
+    user_investments = UserInvestment.objects.filter(user=request.user).select_related(
+        'investment_plan', 'admin_investment_plan'
+    ).order_by('-created_at')
 
     # NO automatic updates - admin controls everything manually
     # for investment in user_investments.filter(status='active'):
@@ -32,10 +37,6 @@ def investments_view(request):
         'portfolio': portfolio,
         'active_investments': user_investments.filter(status='active'),
         'completed_investments': user_investments.filter(status='completed'),
-        'unread_notifications': TransactionNotification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).order_by('-created_at')[:10],
     }
 
     return render(request, 'dashboard/investments.html', context)
@@ -231,37 +232,66 @@ def cancel_investment(request, investment_id):
     return redirect('investments')
 
 @login_required
+@require_GET
+@etag(calculator_etag)
 def investment_calculator(request):
     """AJAX endpoint for investment calculator"""
-    if request.method == 'GET':
-        plan_id = request.GET.get('plan_id')
-        amount = request.GET.get('amount')
+    table = get_plan_table()
+    try:
+        row = table.index[int(request.GET.get('plan_id'))]
+    except (KeyError, ValueError, TypeError):
+        return JsonResponse({'error': 'Plan not found'}, status=404)
 
-        try:
-            plan = get_object_or_404(InvestmentPlan, id=plan_id)
-            amount = Decimal(str(amount))
+    try:
+        amount = parse_amount(request.GET.get('amount'))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid amount'}, status=400)
 
-            # Calculate potential returns
-            min_return = amount * (plan.min_roi_percentage / 100)
-            max_return = amount * (plan.max_roi_percentage / 100)
-            avg_return = amount * (plan.get_average_roi() / 100)
-
-            data = {
-                'min_return': float(min_return),
-                'max_return': float(max_return),
-                'avg_return': float(avg_return),
-                'min_total': float(amount + min_return),
-                'max_total': float(amount + max_return),
-                'avg_total': float(amount + avg_return),
-                'duration_days': plan.duration_days,
-                'plan_name': plan.name,
-            }
+    data = table.project([row], [amount])[0]
+    return JsonResponse({key: data[key] for key in (
+        'min_return', 'max_return', 'avg_return', 'min_total', 'max_total', 'avg_total',
+        'duration_days', 'plan_name',
+    )})
 
-            return JsonResponse(data)
 
-        except (ValueError, TypeError):
-            return JsonResponse({'error': 'Invalid amount'}, status=400)
-        except Exception as e:
-            return JsonResponse({'error': 'Calculation error'}, status=400)
+@login_required
+@require_GET
+@etag(calculator_etag)
+def investment_calculator_batch(request):
+    """
+    AJAX endpoint projecting many plans at once.
+
+    ``?amount=1000`` projects one amount across every active plan;
+    ``?pairs=1:1000,2:2500`` projects specific (plan, amount) pairs.
+    """
+    table = get_plan_table()
+    try:
+        if 'pairs' in request.GET:
+            plan_ids, amounts = parse_pairs(request.GET['pairs'])
+            missing = [plan_id for plan_id in plan_ids if plan_id not in table.index]
+            if missing:
+                return JsonResponse({'error': f'Unknown plans: {missing}'}, status=404)
+            results = table.project([table.index[plan_id] for plan_id in plan_ids], amounts)
+        else:
+            results = table.project_all(parse_amount(request.GET.get('amount')))
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'results': results})
 
-    return JsonResponse({'error': 'Invalid request'}, status=400)
+
+@login_required
+@require_GET
+@etag(calculator_etag)
+def investment_projection(request):
+    """AJAX endpoint returning ROI percentile bands and a histogram for a plan"""
+    try:
+        plan_id = int(request.GET.get('plan_id'))
+        amount = parse_amount(request.GET.get('amount'))
+    except (ValueError, TypeError):
+        return JsonResponse({'error': 'Invalid plan or amount'}, status=400)
+
+    result = project_plan(plan_id, amount)
+    if result is None:
+        return JsonResponse({'error': 'Plan not found'}, status=404)
+    return JsonResponse(result)
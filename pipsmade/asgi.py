@@ -2,6 +2,8 @@
 ASGI config for pipsmade project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by uvicorn workers when gunicorn runs with SERVER_MODE=asgi
+(see pipsmade/gunicorn_conf.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
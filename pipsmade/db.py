@@ -0,0 +1,39 @@
+"""
+Database helpers shared by the batch jobs.
+"""
+from django.db import connections, router
+
+
+def bulk_update_rows(objs, fields, using=None):
+    """
+    Write ``fields`` of already-loaded model instances back by primary key.
+
+    Same effect as ``Model.objects.bulk_update(objs, fields)``, but instead of
+    building a CASE WHEN expression per row and field (about a millisecond per
+    row) it runs one parameterised UPDATE through executemany. Like
+    bulk_update it bypasses save() and signals, so auto_now fields must be set
+    by the caller.
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+
+    model = type(objs[0])
+    meta = model._meta
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    model_fields = [meta.get_field(name) for name in fields]
+    qn = connection.ops.quote_name
+    sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+        qn(meta.db_table),
+        ', '.join(f'{qn(field.column)} = %s' for field in model_fields),
+        qn(meta.pk.column),
+    )
+    params = [
+        [field.get_db_prep_save(getattr(obj, field.attname), connection) for field in model_fields]
+        + [obj.pk]
+        for obj in objs
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+    return len(objs)
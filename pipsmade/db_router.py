@@ -0,0 +1,115 @@
+"""
+Send read-only page views to the replica database.
+
+Views wrapped in ``use_read_replica`` run their queries against the
+``DATABASE_REPLICA_ALIAS`` connection when one is configured (see
+DATABASE_REPLICA_URL in settings). Everything else stays on the primary:
+writes, select_for_update() (Django routes it as a write), reads inside an
+atomic block on the primary, and requests from a browser that posted a form
+in the last ``DATABASE_REPLICA_PIN_SECONDS``, so users always see their own
+deposits and tickets straight after submitting them.
+
+Responses that get cached under a content version (pipsmade.page_cache) are
+rendered inside ``use_primary``: the version is read from the primary, and a
+page built from a lagging replica would be served as current until it
+expires.
+
+To try it locally, point both URLs at SQLite files:
+
+    DATABASE_URL=sqlite:///primary.sqlite3
+    DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.deprecation import MiddlewareMixin
+
+PIN_COOKIE = 'db_primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_primary_only = ContextVar('primary_only', default=False)
+
+
+def get_replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def use_primary():
+    """Keep every read in the block on the primary, even in use_read_replica views"""
+    token = _primary_only.set(True)
+    replica_token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(replica_token)
+        _primary_only.reset(token)
+
+
+def use_read_replica(view_func):
+    """Run a read-only view's queries on the replica"""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+            or _primary_only.get() or not get_replica_alias()
+        ):
+            return view_func(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            response = view_func(request, *args, **kwargs)
+            # Class-based views render lazily; do it while still routed
+            if callable(getattr(response, 'render', None)):
+                response = response.render()
+            return response
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            alias = get_replica_alias()
+            if alias:
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Never fall back to the instance's database: rows read from the
+        # replica are saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """After a write request, keep this browser on the primary for a few seconds"""
+
+    def process_response(self, request, response):
+        if request.method not in SAFE_METHODS and get_replica_alias():
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
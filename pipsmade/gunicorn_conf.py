@@ -0,0 +1,185 @@
+"""
+Gunicorn settings for every deployment: ``gunicorn -c pipsmade/gunicorn_conf.py``
+
+SERVER_MODE picks the worker type:
+
+``gthread`` (default)
+    pipsmade.wsgi under threaded workers. A slow SMTP send or news fetch
+    ties up one thread instead of the whole server.
+``asgi``
+    pipsmade.asgi under uvicorn workers. Async views (the notification
+    event stream and long poll) wait on the event loop instead of holding
+    a thread for up to EVENT_STREAM_MAX_SECONDS, and sync views run in
+    per-request threads. Persistent connections are turned off
+    (DATABASE_CONN_MAX_AGE=0) because Django closes ASGI connections per
+    request anyway; use DATABASE_POOL on PostgreSQL.
+``sync``
+    The old one-request-at-a-time workers, for comparison.
+
+The mode also decides how dashboards receive live notifications. Only
+asgi turns on the SSE stream (EVENT_STREAM_ENABLED, see settings.py).
+Django's WSGI handler buffers an async streaming body until it ends, so
+under gthread or sync each open dashboard would hold a thread for
+EVENT_STREAM_MAX_SECONDS and receive nothing meanwhile. In those modes
+the dashboard polls every EVENT_POLL_INTERVAL_MS with requests that return
+at once. Forcing EVENT_STREAM_ENABLED=true under gthread is safe but gains
+nothing, because the stream endpoint then answers like a poll. gthread stays
+the default because it is faster on the ordinary pages (table below).
+Choose asgi when notifications must arrive within seconds.
+
+Workers and threads come from the CPU count, the database and the cache:
+
+* A process-local cache (CACHE_BACKEND=locmem, the default) means one
+  worker. Cache version counters and cached sessions must be shared, and
+  a second process would serve stale pages until its own entries expire.
+  Concurrency then comes from threads.
+* SQLite in WAL mode serves readers in parallel but has one writer at a
+  time for the whole file, so extra processes mostly add lock waits:
+  at most min(CPUs, 4) workers with 8 threads each.
+* PostgreSQL: 2 x CPUs + 1 workers with 4 threads each, reduced until
+  workers x threads fits in GUNICORN_MAX_DB_CONNECTIONS (default 80, under
+  PostgreSQL's stock max_connections of 100).
+
+Measured with ``manage.py run_load_test --investors 20 --iterations 5``
+on one CPU, with SQLite WAL, the locmem cache and
+``generate_synthetic_data --scale 0.01``. The second group used an SMTP
+server that waits 1 s before its greeting, so every login, deposit and
+investment email blocks its request for a second:
+
+    mode     workers x threads   SMTP    req/s   p50 ms   p95 ms   p99 ms
+    sync     1 x 1               fast     39.7      232      899     3901
+    gthread  1 x 4               fast     37.9      288      846     4119
+    gthread  1 x 8               fast     34.0      285      929     6563
+    asgi     1                   fast     29.5      330      964    10078
+    sync     1 x 1               1 s       3.9      407    18126    20158
+    gthread  1 x 4               1 s      13.2      824     3047     7531
+    gthread  1 x 8               1 s      21.6      360     1868     5048
+    asgi     1                   1 s      28.0      176     1397     9624
+
+On one CPU the fast case is bound by Python rendering under the GIL, so
+threads cost a little throughput. When I/O is slow, the serial worker
+collapses and 8 threads keep p95 under 2 s, hence the gthread default.
+The asgi mode handles slow I/O best but is slowest on the fast path:
+every request crosses the sync-only middleware through thread hops, and
+concurrent password hashing on logins drives the p99 up. Use it when
+many notification event streams stay open.
+
+The same runs against PostgreSQL 16 (stock settings, on the same CPU as
+the server) with the same data. Several workers need a shared cache, so
+those rows use CACHE_BACKEND=file:
+
+    mode     workers x threads   cache    SMTP    req/s   p50 ms   p95 ms   p99 ms
+    gthread  1 x 4               locmem   fast     52.8      185      460     4184
+    gthread  1 x 8               locmem   fast     43.1      247      522     7427
+    gthread  3 x 4               file     fast     44.2      125      384     5388
+    sync     3 x 1               file     fast     44.4      229      643     4505
+    asgi     3                   file     fast     34.8      227     1031     7311
+    gthread  1 x 8               locmem   1 s      23.8      282     1706     4744
+    gthread  3 x 4               file     1 s      19.5      253     2055     4818
+    sync     3 x 1               file     1 s      10.9     1023     4230     7588
+    asgi     3                   file     1 s      28.9      217     1242     9817
+
+On one CPU the 3 x 4 PostgreSQL default has the best fast-path p50 and
+p95, and with slow I/O it stays close to 1 x 8 while sync workers fall to
+half the throughput. Only the one-CPU point of the 2 x CPUs + 1 rule was
+measured; larger machines and the GUNICORN_MAX_DB_CONNECTIONS cap (which
+is arithmetic on max_connections, not a benchmark) are extrapolated.
+
+Every value can be overridden from the environment: SERVER_MODE,
+WEB_CONCURRENCY (workers), GUNICORN_THREADS, GUNICORN_TIMEOUT,
+GUNICORN_KEEPALIVE, GUNICORN_MAX_REQUESTS, GUNICORN_LOG_LEVEL,
+GUNICORN_MAX_DB_CONNECTIONS and PORT.
+"""
+import os
+
+MODES = ('gthread', 'asgi', 'sync')
+PROCESS_LOCAL_CACHES = ('locmem', '')
+
+
+def cpu_count():
+    """CPUs this process may run on (container limits included where the OS reports them)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def database_vendor(url):
+    scheme = url.split(':', 1)[0].lower()
+    return 'postgresql' if scheme.startswith('postgres') else 'sqlite'
+
+
+def pick_concurrency(mode, vendor, cpus, cache_backend, max_db_connections=80):
+    """(workers, threads) for a mode, database vendor, CPU count and cache backend"""
+    if cache_backend in PROCESS_LOCAL_CACHES:
+        workers = 1
+    elif vendor == 'sqlite':
+        workers = min(cpus, 4)
+    else:
+        workers = 2 * cpus + 1
+
+    if mode != 'gthread':
+        threads = 1
+    elif workers == 1 or vendor == 'sqlite':
+        threads = 8
+    else:
+        threads = 4
+
+    if vendor == 'postgresql':
+        while workers > 1 and workers * threads > max_db_connections:
+            workers -= 1
+    return max(workers, 1), threads
+
+
+server_mode = os.environ.get('SERVER_MODE', 'gthread').lower()
+if server_mode not in MODES:
+    raise ValueError(f'SERVER_MODE must be one of {", ".join(MODES)}, not {server_mode!r}')
+# settings.py reads it to decide whether dashboards open the SSE stream
+os.environ['SERVER_MODE'] = server_mode
+
+_vendor = database_vendor(os.environ.get('DATABASE_URL', 'sqlite:///db.sqlite3'))
+_default_workers, _default_threads = pick_concurrency(
+    server_mode,
+    _vendor,
+    cpu_count(),
+    os.environ.get('CACHE_BACKEND', 'locmem').lower(),
+    int(os.environ.get('GUNICORN_MAX_DB_CONNECTIONS', '80')),
+)
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', _default_workers))
+threads = int(os.environ.get('GUNICORN_THREADS', _default_threads))
+
+if server_mode == 'asgi':
+    wsgi_app = 'pipsmade.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+    os.environ.setdefault('DATABASE_CONN_MAX_AGE', '0')
+else:
+    wsgi_app = 'pipsmade.wsgi:application'
+    worker_class = server_mode
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = 30
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    server.log.info(
+        f'Serving {wsgi_app} in {server_mode} mode on {_vendor}: {workers} workers'
+        + (f' x {threads} threads' if server_mode == 'gthread' else '')
+    )
+    if workers > 1 and os.environ.get('CACHE_BACKEND', 'locmem').lower() in PROCESS_LOCAL_CACHES:
+        server.log.warning('Several workers with a process-local cache serve stale cached data; set CACHE_BACKEND')
+
+
+def post_fork(server, worker):
+    # preload_app imports Django in the master; never share its connections
+    from django.db import connections
+    connections.close_all()
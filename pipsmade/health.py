@@ -0,0 +1,124 @@
+"""
+Liveness and readiness probes for load balancers and orchestrators.
+
+``/health/live/`` answers as long as the process can run Python: no I/O at
+all. ``/health/ready/`` (and the older ``/health/``) pings every configured
+database over Django's own, usually persistent, connections, round-trips a
+key through the default cache, and reports the static files check. That
+check touches the filesystem until it first passes and is then memoized,
+so probes cost microseconds.
+
+HealthCheckMiddleware sits first in MIDDLEWARE and answers the probe paths
+before the rest of the stack runs: probes skip the sessions, metrics and
+the ALLOWED_HOSTS check. Load balancers probe by IP, which is usually not
+an allowed host.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.cache import never_cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PROBE_KEY = 'health:probe:{pid}'
+
+_static_files_ok = False
+
+
+def check_databases():
+    """'ok' or the error, per configured database alias"""
+    results = {}
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            results[alias] = 'ok'
+        except DatabaseError as e:
+            results[alias] = f'error: {e}'
+    return results
+
+
+def check_cache():
+    alias = getattr(settings, 'HEALTH_CACHE_ALIAS', 'default')
+    key = CACHE_PROBE_KEY.format(pid=os.getpid())
+    try:
+        cache = caches[alias]
+        cache.set(key, 1, 30)
+        if cache.get(key) != 1:
+            return 'error: value did not round-trip'
+    except Exception as e:
+        # Cache clients raise their own exception types (redis, memcached)
+        return f'error: {e}'
+    return 'ok'
+
+
+def check_static_files():
+    """
+    collectstatic output does not change under a running server, so a pass is
+    remembered for the life of the process. A failure is not: a probe during
+    a deploy or a slow mount must not keep the worker unready until restart.
+    """
+    global _static_files_ok
+    if _static_files_ok:
+        return 'ok'
+    status = _check_static_files()
+    _static_files_ok = status == 'ok'
+    return status
+
+
+def _check_static_files():
+    if isinstance(staticfiles_storage, ManifestFilesMixin):
+        try:
+            manifest = staticfiles_storage.load_manifest()
+        except Exception as e:
+            return f'error: {e}'
+        return 'ok' if manifest else 'error: manifest missing or empty'
+    static_root = settings.STATIC_ROOT
+    if settings.DEBUG:
+        # runserver serves STATICFILES_DIRS directly
+        return 'ok'
+    try:
+        with os.scandir(static_root) as entries:
+            return 'ok' if next(entries, None) is not None else f'error: {static_root} is empty'
+    except (OSError, TypeError) as e:
+        return f'error: {e}'
+
+
+@never_cache
+def liveness(request):
+    return HttpResponse('ok', content_type='text/plain')
+
+
+@never_cache
+def readiness(request):
+    checks = {f'database:{alias}': status for alias, status in check_databases().items()}
+    checks['cache'] = check_cache()
+    checks['static_files'] = check_static_files()
+    ready = all(status == 'ok' for status in checks.values())
+    if not ready:
+        logger.warning(f'Readiness check failed: {checks}')
+    return JsonResponse({'status': 'ready' if ready else 'unavailable', 'checks': checks}, status=200 if ready else 503)
+
+
+class HealthCheckMiddleware:
+    """Must come first in MIDDLEWARE"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.probes = {
+            getattr(settings, 'HEALTH_LIVENESS_PATH', '/health/live/'): liveness,
+            getattr(settings, 'HEALTH_READINESS_PATH', '/health/ready/'): readiness,
+            '/health/': readiness,
+        }
+
+    def __call__(self, request):
+        probe = self.probes.get(request.path_info)
+        if probe is not None and request.method in ('GET', 'HEAD'):
+            return probe(request)
+        return self.get_response(request)
@@ -0,0 +1,156 @@
+"""
+Per-view request metrics in Prometheus text format.
+
+RequestMetricsMiddleware records, for a ``METRICS_SAMPLE_RATE`` fraction of
+requests, wall time, database time, query count and response size into
+fixed-bucket histograms keyed by the resolved URL name. Unsampled requests
+only pay for one random() call. Histograms live in process memory, so each
+worker exposes its own series at /metrics; Prometheus sums them per target.
+"""
+import random
+import threading
+from bisect import bisect_left
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = (
+    ('pipsmade_http_request_duration_seconds', 'Wall time from first middleware to response', DURATION_BUCKETS),
+    ('pipsmade_http_db_duration_seconds', 'Time spent executing SQL per request', DURATION_BUCKETS),
+    ('pipsmade_http_db_queries', 'SQL queries executed per request', QUERY_BUCKETS),
+    ('pipsmade_http_response_size_bytes', 'Response body size (non-streaming responses)', SIZE_BUCKETS),
+)
+UNRESOLVED_VIEW = 'unresolved'
+KNOWN_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestMetrics:
+    """Histograms for all views behind one lock (one acquisition per request)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._requests = {}
+
+    def _new_series(self):
+        # Per histogram: a count per bucket (+Inf last), then the sum
+        return [[0] * (len(buckets) + 1) + [0] for _, _, buckets in HISTOGRAMS]
+
+    def observe(self, view, method, status, values):
+        """``values`` lines up with HISTOGRAMS; None skips that histogram"""
+        indexes = [
+            None if value is None else bisect_left(buckets, value)
+            for value, (_, _, buckets) in zip(values, HISTOGRAMS)
+        ]
+        with self._lock:
+            series = self._views.get(view)
+            if series is None:
+                series = self._views[view] = self._new_series()
+            for histogram, index, value in zip(series, indexes, values):
+                if index is not None:
+                    histogram[index] += 1
+                    histogram[-1] += value
+            key = (view, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self._requests.clear()
+
+    def render(self, sample_rate):
+        with self._lock:
+            views = {view: [list(h) for h in series] for view, series in self._views.items()}
+            requests = dict(self._requests)
+
+        lines = [
+            '# HELP pipsmade_http_metrics_sample_rate Fraction of requests recorded below',
+            '# TYPE pipsmade_http_metrics_sample_rate gauge',
+            f'pipsmade_http_metrics_sample_rate {_format_number(float(sample_rate))}',
+            '# HELP pipsmade_http_requests_total Sampled requests by view, method and status',
+            '# TYPE pipsmade_http_requests_total counter',
+        ]
+        for (view, method, status), count in sorted(requests.items()):
+            lines.append(
+                f'pipsmade_http_requests_total{{view="{_escape(view)}",method="{method}",status="{status}"}} {count}'
+            )
+
+        for position, (name, help_text, buckets) in enumerate(HISTOGRAMS):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for view in sorted(views):
+                histogram = views[view][position]
+                label = f'view="{_escape(view)}"'
+                cumulative = 0
+                for bound, count in zip(buckets + ('+Inf',), histogram[:-1]):
+                    cumulative += count
+                    le = bound if bound == '+Inf' else _format_number(bound)
+                    lines.append(f'{name}_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label}}} {_format_number(histogram[-1])}')
+                lines.append(f'{name}_count{{{label}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+request_metrics = RequestMetrics()
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries and the time spent in them"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """Keep first in MIDDLEWARE so the timings include the other middleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 1.0)
+        if not getattr(settings, 'METRICS_ENABLED', True) or self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or UNRESOLVED_VIEW
+        method = request.method if request.method in KNOWN_METHODS else 'other'
+        size = None if response.streaming else len(response.content)
+        request_metrics.observe(
+            view, method, response.status_code, (duration, timer.duration, timer.count, size)
+        )
+        return response
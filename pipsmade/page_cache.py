@@ -0,0 +1,153 @@
+"""
+Whole-page caching for anonymous visitors.
+
+Views decorated with ``cache_anonymous_page`` are rendered once per URL and
+content version and then served from the page cache to every anonymous
+visitor. The content versions (FAQ snapshot, plan table, news) are part of
+the cache key, so saving an FAQ, plan or news item makes the next request
+render fresh HTML without any explicit purge.
+
+Content versions are counters in the ContentVersion table, so a save made by
+any process (a second worker, a shell, a management command) is seen by all
+of them. Reads are cached for CONTENT_VERSION_CACHE_TIMEOUT seconds; with a
+process-local cache that is how long another process may keep serving the
+previous version.
+
+A page about to be stored is rendered on the primary database (see
+pipsmade.db_router.use_primary), the same database its versions come from.
+
+Requests that carry a session or messages cookie are never served from or
+stored in the cache: they may be logged in or have a flash message queued.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+
+from dashboard.models import ContentVersion
+from .db_router import use_primary
+
+MESSAGES_COOKIE_NAME = 'messages'
+CONTENT_VERSION_KEY = 'content_version:{key}'
+
+
+def get_content_version(key):
+    """Current value of a content version counter, seeded from the clock"""
+    cache_key = CONTENT_VERSION_KEY.format(key=key)
+    version = cache.get(cache_key)
+    if version is None:
+        # From the primary even inside use_read_replica: snapshots and pages are stored under it
+        version = ContentVersion.objects.db_manager(DEFAULT_DB_ALIAS).filter(key=key).values_list(
+            'version', flat=True
+        ).first()
+        if version is None:
+            # The clock, so a recreated row never reuses a version still in a cache key
+            version = ContentVersion.objects.get_or_create(key=key, defaults={'version': time.time_ns()})[0].version
+        cache.set(cache_key, version, getattr(settings, 'CONTENT_VERSION_CACHE_TIMEOUT', 5))
+    return version
+
+
+def bump_content_version(key):
+    """Move a counter on; every process picks it up within CONTENT_VERSION_CACHE_TIMEOUT"""
+    if not ContentVersion.objects.filter(key=key).update(version=F('version') + 1):
+        try:
+            with transaction.atomic():
+                ContentVersion.objects.create(key=key, version=time.time_ns())
+        except IntegrityError:
+            # Created concurrently
+            ContentVersion.objects.filter(key=key).update(version=F('version') + 1)
+    cache_key = CONTENT_VERSION_KEY.format(key=key)
+    # After commit too, in case a request re-cached the old value meanwhile
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+
+
+def get_page_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def is_anonymous_request(request):
+    """True for GET/HEAD requests without a session or flash message cookie"""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return (
+        settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and MESSAGES_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def get_page_cache_key(request, version_funcs):
+    versions = ':'.join(str(get_version()) for get_version in version_funcs)
+    url = hashlib.md5(request.build_absolute_uri().encode(), usedforsecurity=False).hexdigest()
+    return f'page:{versions}:{url}'
+
+
+def _is_storable(request, response):
+    # A page that issued a CSRF token or set a cookie belongs to one visitor
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _public_headers(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'PAGE_CACHE_MAX_AGE', 60))
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def cache_anonymous_page(*version_funcs):
+    """
+    Cache a view's HTML for anonymous visitors, keyed by URL and the given
+    content version callables.
+
+    Use ``method_decorator(cache_anonymous_page(...), name='dispatch')`` on
+    class-based views.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_anonymous_request(request):
+                response = view_func(request, *args, **kwargs)
+                patch_cache_control(response, private=True)
+                patch_vary_headers(response, ['Cookie'])
+                return response
+
+            cache = get_page_cache()
+            key = get_page_cache_key(request, version_funcs)
+            entry = cache.get(key)
+            if entry is not None:
+                content, content_type, etag = entry
+                if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                    response = HttpResponseNotModified()
+                else:
+                    response = HttpResponse(content, content_type=content_type)
+                response['X-Page-Cache'] = 'HIT'
+                return _public_headers(response, etag)
+
+            with use_primary():
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+            if not _is_storable(request, response):
+                patch_cache_control(response, private=True)
+                patch_vary_headers(response, ['Cookie'])
+                return response
+
+            etag = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+            cache.set(key, (response.content, response['Content-Type'], etag),
+                      getattr(settings, 'PAGE_CACHE_TIMEOUT', 300))
+            response['X-Page-Cache'] = 'MISS'
+            return _public_headers(response, etag)
+        return wrapper
+    return decorator
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from pipsmade.db_config import database_from_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -48,11 +50,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pipsmade.health.HealthCheckMiddleware',
+    'pipsmade.metrics.RequestMetricsMiddleware',
+    'pipsmade.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'pipsmade.db_router.PrimaryPinMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'dashboard.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -70,6 +77,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'transactions.context_processors.notifications',
             ],
         },
     },
@@ -81,12 +89,134 @@ WSGI_APPLICATION = 'pipsmade.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite connection tuning, applied by pipsmade.sqlite_backend on every new
+# connection. WAL lets readers run while an admin approval holds the write
+# lock; busy_timeout makes competing writers wait instead of failing.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-64000')),  # negative = KiB
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+# IMMEDIATE takes the write lock at BEGIN, so atomic() blocks that read and
+# then write wait on busy_timeout instead of failing when upgrading the lock
+SQLITE_OPTIONS = {
+    'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+    'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')) / 1000,
+}
+
+# DATABASE_URL selects the primary (postgres://... or sqlite:///...); SQLite
+# db.sqlite3 when unset. DATABASE_REPLICA_URL adds a read replica used by the
+# views marked with pipsmade.db_router.use_read_replica.
+DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///db.sqlite3')
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '')
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', '60'))
+# PostgreSQL only: psycopg connection pool instead of persistent connections
+DATABASE_POOL = os.environ.get('DATABASE_POOL', 'false').lower() == 'true'
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10')),
+    'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', '10')),
+}
+DATABASE_REPLICA_ALIAS = 'replica'
+# Seconds a browser stays on the primary after a POST (read-your-writes)
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DATABASE_REPLICA_PIN_SECONDS', '5'))
+
+
+def _database(url):
+    return database_from_url(
+        url,
+        BASE_DIR,
+        conn_max_age=DATABASE_CONN_MAX_AGE,
+        pool=DATABASE_POOL_OPTIONS if DATABASE_POOL else None,
+        sqlite_options=SQLITE_OPTIONS,
+    )
+
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': _database(DATABASE_URL),
 }
+if DATABASE_REPLICA_URL:
+    DATABASES[DATABASE_REPLICA_ALIAS] = {
+        **_database(DATABASE_REPLICA_URL),
+        # Tests run against the primary's test database
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['pipsmade.db_router.ReplicaRouter']
+
+
+# Cache backend: locmem (default, per process), file or redis
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('CACHE_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'pipsmade',
+        }
+    }
+
+# Sessions are read from the cache and written through to the database
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = os.environ.get('SESSION_CACHE_ALIAS', 'default')
+
+# Email login (case-insensitive), see accounts/backends.py.
+# ModelBackend stays listed so sessions created before the switch remain valid.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Anonymous page cache (pipsmade/page_cache.py)
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '300'))
+PAGE_CACHE_MAX_AGE = int(os.environ.get('PAGE_CACHE_MAX_AGE', '60'))
+# Content versions (FAQ, plans, news) live in the database; processes re-read
+# them at most this often
+CONTENT_VERSION_CACHE_TIMEOUT = int(os.environ.get('CONTENT_VERSION_CACHE_TIMEOUT', '5'))
+
+
+# Per-view request metrics served at /metrics (pipsmade/metrics.py). Scrapers
+# authenticate with "Authorization: Bearer $METRICS_TOKEN"; staff can browse.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '1.0'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Load balancer probes (pipsmade/health.py), answered before the rest of MIDDLEWARE
+HEALTH_LIVENESS_PATH = '/health/live/'
+HEALTH_READINESS_PATH = '/health/ready/'
+HEALTH_CACHE_ALIAS = 'default'
+
+# Slow-query log (pipsmade/slow_queries.py), summarized by slow_query_report
+SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'true').lower() == 'true'
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_LOG_FILE = os.environ.get('SLOW_QUERY_LOG_FILE', str(BASE_DIR / 'logs' / 'slow_queries.log'))
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+# Repeats of a query within this window are logged without SQL and EXPLAIN
+SLOW_QUERY_DEDUPE_SECONDS = 300
+
+# Staff request profiling (dashboard/profiling.py): add ?_profile=1 or send
+# "X-Profile: 1"; captures are listed under Dashboard > Request profiles
+PROFILE_DIR = os.environ.get('PROFILE_DIR', str(BASE_DIR / 'profiles'))
+PROFILE_MAX_STORED = int(os.environ.get('PROFILE_MAX_STORED', '50'))
+PROFILE_QUERY_PARAM = '_profile'
+PROFILE_HEADER = 'X-Profile'
 
 
 # Password validation
@@ -196,6 +326,27 @@ SITE_URL = os.environ.get('SITE_URL', 'https://pipsmade.com')
 SUPPORT_RESPONSE_TIME = '2-4 hours'
 SUPPORT_BUSINESS_HOURS = '24/7 Available'
 
+# Deposit proof image pipeline (previews/thumbnails generated in a process pool)
+IMAGE_PIPELINE_ASYNC = os.environ.get('IMAGE_PIPELINE_ASYNC', 'true').lower() == 'true'
+IMAGE_PIPELINE_WORKERS = int(os.environ.get('IMAGE_PIPELINE_WORKERS', '2'))
+IMAGE_PREVIEW_MAX_SIZE = 1600
+IMAGE_THUMBNAIL_MAX_SIZE = 320
+
+# Live transaction/notification events (transactions/events.py). An open
+# stream or long poll holds its connection for up to EVENT_STREAM_MAX_SECONDS,
+# which only an ASGI server can afford: under WSGI each one pins a worker
+# thread. So the dashboard opens the SSE stream only when gunicorn runs with
+# SERVER_MODE=asgi, and otherwise polls every EVENT_POLL_INTERVAL_MS with
+# requests that return at once.
+EVENT_STREAM_ENABLED = os.environ.get(
+    'EVENT_STREAM_ENABLED', str(os.environ.get('SERVER_MODE', 'gthread').lower() == 'asgi')
+).lower() == 'true'
+EVENT_STREAM_POLL_INTERVAL = 5
+EVENT_STREAM_MAX_SECONDS = 300
+EVENT_STREAM_RETRY_MS = 3000
+EVENT_LONG_POLL_TIMEOUT = 25
+EVENT_POLL_INTERVAL_MS = 15000
+
 # Login/Logout URLs
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
@@ -207,13 +358,7 @@ if os.environ.get('RENDER'):
     DEBUG = False
     ALLOWED_HOSTS = ['.onrender.com', 'pipsmade.com', 'www.pipsmade.com',]
     
-    # Database - Use SQLite for Render.com free tier
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
-    }
+    # Database: DATABASE_URL (SQLite db.sqlite3 when unset)
     
     # Static files
     STATIC_ROOT = BASE_DIR / 'staticfiles'
@@ -248,13 +393,7 @@ elif os.environ.get('RAILWAY'):
 
     print(f"🌐 Allowed hosts: {ALLOWED_HOSTS}")
     
-    # Database - Use SQLite on Railway (same as local)
-    DATABASES = {
-        'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
-        }
-    }
+    # Database: DATABASE_URL (SQLite db.sqlite3 when unset, same as local)
     
     # Static files
     STATIC_ROOT = BASE_DIR / 'staticfiles'
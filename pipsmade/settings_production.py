@@ -8,13 +8,8 @@ import os
 DEBUG = False
 ALLOWED_HOSTS = ['.railway.app', '.up.railway.app', 'pipsmade.com', 'www.pipsmade.com',]
 
-# Database - Use SQLite for Railway
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Database: DATABASES from settings, driven by DATABASE_URL and
+# DATABASE_REPLICA_URL (SQLite db.sqlite3 when unset)
 
 # Static files configuration
 STATIC_URL = '/static/'
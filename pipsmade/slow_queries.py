@@ -0,0 +1,199 @@
+"""
+Slow-query log.
+
+SlowQueryMiddleware installs an execute wrapper on every database
+connection for the duration of a request. Queries slower than
+``SLOW_QUERY_THRESHOLD_MS`` are written as JSON lines to the rotating
+``SLOW_QUERY_LOG_FILE`` with the normalized SQL, its digest, a fingerprint of
+the parameters (an HMAC keyed with SECRET_KEY, so ids and emails cannot be
+recovered by hashing guesses; values themselves are never written) and the
+view that ran it. The first occurrence of a digest in
+``SLOW_QUERY_DEDUPE_SECONDS`` also records the SQL and its EXPLAIN plan;
+repeats are logged as short entries. The EXPLAIN runs on the backend's own
+cursor, outside Django's execute wrappers, so request metrics and profiles
+do not count it.
+``manage.py slow_query_report`` summarizes the file.
+
+Code outside requests (management commands) can opt in with
+``with log_slow_queries('command-name'):``.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAX_TRACKED_DIGESTS = 10000
+EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+_current_view = ContextVar('slow_query_view', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Replace literals and placeholders with ? and collapse IN lists"""
+    sql = sql.replace('%s', '?')
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def sql_digest(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:16]
+
+
+def params_fingerprint(params, many):
+    if many:
+        return 'executemany'
+    key = f'pipsmade.slow_queries:{settings.SECRET_KEY}'.encode()
+    return hmac.new(key, repr(params).encode(), hashlib.sha256).hexdigest()[:12]
+
+
+class SlowQueryLog:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._explained = {}
+        self._file_logger = None
+
+    def _get_file_logger(self):
+        if self._file_logger is None:
+            with self._lock:
+                if self._file_logger is None:
+                    path = str(settings.SLOW_QUERY_LOG_FILE)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    handler = RotatingFileHandler(
+                        path,
+                        maxBytes=getattr(settings, 'SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                        backupCount=getattr(settings, 'SLOW_QUERY_LOG_BACKUPS', 5),
+                    )
+                    file_logger = logging.getLogger(f'{__name__}.file')
+                    file_logger.addHandler(handler)
+                    file_logger.setLevel(logging.INFO)
+                    file_logger.propagate = False
+                    self._file_logger = file_logger
+        return self._file_logger
+
+    def _should_explain(self, digest):
+        now = time.monotonic()
+        window = getattr(settings, 'SLOW_QUERY_DEDUPE_SECONDS', 300)
+        with self._lock:
+            last = self._explained.get(digest)
+            if last is not None and now - last < window:
+                return False
+            if len(self._explained) >= MAX_TRACKED_DIGESTS:
+                self._explained.clear()
+            self._explained[digest] = now
+            return True
+
+    def record(self, connection, sql, params, many, duration_ms):
+        normalized = normalize_sql(sql)
+        digest = sql_digest(normalized)
+        entry = {
+            'ts': timezone.now().isoformat(),
+            'digest': digest,
+            'ms': round(duration_ms, 2),
+            'view': _current_view.get() or 'unknown',
+            'db': connection.alias,
+            'params': params_fingerprint(params, many),
+        }
+        if self._should_explain(digest):
+            entry['sql'] = normalized
+            if not many and sql.lstrip()[:6].upper() == 'SELECT':
+                entry['plan'] = explain(connection, sql, params)
+        try:
+            self._get_file_logger().info(json.dumps(entry))
+        except OSError as e:
+            logger.error(f'Could not write slow query log: {e}')
+
+
+slow_query_log = SlowQueryLog()
+
+
+def explain(connection, sql, params):
+    """
+    EXPLAIN output for a query that just ran, one string per plan row.
+
+    connection.cursor() would pass the EXPLAIN (and any savepoint) through
+    every execute wrapper, adding it to the query count and DB time of
+    exactly the slow requests; the backend cursor from create_cursor() does not.
+    """
+    # On PostgreSQL a failing statement would abort the surrounding transaction
+    savepoint = connection.in_atomic_block and connection.features.uses_savepoints
+    cursor = connection.create_cursor()
+    try:
+        if savepoint:
+            cursor.execute(connection.ops.savepoint_create_sql(EXPLAIN_SAVEPOINT))
+        try:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            rows = cursor.fetchall()
+        except connection.Database.DatabaseError as e:
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_rollback_sql(EXPLAIN_SAVEPOINT))
+            return [f'EXPLAIN failed: {e}']
+        if savepoint:
+            cursor.execute(connection.ops.savepoint_commit_sql(EXPLAIN_SAVEPOINT))
+        return [' '.join(str(column) for column in row) for row in rows]
+    finally:
+        cursor.close()
+
+
+class SlowQueryWrapper:
+    def __init__(self, connection, threshold_ms):
+        self.connection = connection
+        self.threshold_ms = threshold_ms
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= self.threshold_ms:
+            slow_query_log.record(self.connection, sql, params, many, duration_ms)
+        return result
+
+
+@contextmanager
+def log_slow_queries(label):
+    """Log slow queries run inside the block, attributed to ``label``"""
+    threshold_ms = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 200)
+    token = _current_view.set(label)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                connection = connections[alias]
+                stack.enter_context(connection.execute_wrapper(SlowQueryWrapper(connection, threshold_ms)))
+            yield
+    finally:
+        _current_view.reset(token)
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not getattr(settings, 'SLOW_QUERY_LOG_ENABLED', True):
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        # Queries from middleware before URL resolution are attributed to the path
+        with log_slow_queries(request.path):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _current_view.set(request.resolver_match.view_name or request.path)
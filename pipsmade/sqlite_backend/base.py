@@ -0,0 +1,55 @@
+"""
+SQLite backend tuned for concurrent requests.
+
+Each new connection runs the PRAGMAs in ``settings.SQLITE_PRAGMAS``. The
+defaults switch the database to WAL, so readers keep reading from the last
+committed snapshot while a writer (e.g. an admin approving a deposit) holds
+the write lock, and set a busy timeout so competing writers wait for the
+lock instead of failing with "database is locked".
+"""
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+
+def get_pragmas():
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    return pragmas
+
+
+def pragma_statements(pragmas):
+    statements = []
+    for name, value in pragmas.items():
+        if value is None or value == '':
+            continue
+        if not name.isidentifier() or not str(value).replace('-', '', 1).isalnum():
+            raise ImproperlyConfigured(f'Invalid SQLite pragma {name}={value!r}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def apply_pragmas(connection, pragmas=None):
+    """Run the configured PRAGMAs on a raw sqlite3 connection"""
+    cursor = connection.cursor()
+    try:
+        for statement in pragma_statements(get_pragmas() if pragmas is None else pragmas):
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection)
+        return connection
@@ -0,0 +1,148 @@
+"""
+Content-addressed file storage for user uploads.
+
+Uploads are streamed to disk in chunks while being hashed, then stored under
+a sharded SHA-256 path (``<prefix>/ab/cd/abcd....ext``). Identical uploads map
+to the same path, so a re-uploaded screenshot costs no extra disk or I/O.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.db.models.fields.files import FieldFile, ImageFieldFile
+from django.utils.deconstruct import deconstructible
+
+logger = logging.getLogger(__name__)
+
+HASH_LENGTH = 64
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by the SHA-256 of their content.
+
+    The directory part of the requested name (e.g. ``deposit_proofs/``) is kept
+    as a prefix and the extension is preserved, everything else is replaced by
+    the content hash.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            from django.core.files import File
+            content = File(content, name)
+
+        prefix = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+
+        # Stream into a temp file next to the final location so the rename is atomic
+        os.makedirs(self.location, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.location, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            name = self.hashed_name(prefix, digest.hexdigest(), extension)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                logger.info(f"Deduplicated upload {name}")
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                # mkstemp creates files as 0600, which the web server may not be able to serve
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, full_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return name.replace('\\', '/')
+
+    @staticmethod
+    def hashed_name(prefix, hexdigest, extension=''):
+        """Build the sharded storage name for a content hash"""
+        filename = f"{hexdigest}{extension}"
+        return os.path.join(prefix, hexdigest[:2], hexdigest[2:4], filename)
+
+    @staticmethod
+    def digest_from_name(name):
+        """Extract the SHA-256 hex digest from a stored name, or '' for legacy names"""
+        stem = os.path.splitext(os.path.basename(name or ''))[0]
+        if len(stem) == HASH_LENGTH and all(c in '0123456789abcdef' for c in stem):
+            return stem
+        return ''
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def get_content_addressed_storage():
+    return content_addressed_storage
+
+
+class ContentAddressedFieldFileMixin:
+    """Record hash and size on the model instance whenever the file is stored"""
+
+    def save(self, name, content, save=True):
+        size = content.size
+        super().save(name, content, save=False)
+        self.field.update_content_fields(self.instance, self.name, size)
+        if save:
+            self.instance.save()
+
+    save.alters_data = True
+
+
+class ContentAddressedFieldFile(ContentAddressedFieldFileMixin, FieldFile):
+    pass
+
+
+class ContentAddressedImageFieldFile(ContentAddressedFieldFileMixin, ImageFieldFile):
+    pass
+
+
+class ContentAddressedFieldMixin:
+    """
+    File field stored through ContentAddressedStorage.
+
+    ``hash_field`` and ``size_field`` name sibling model fields that receive the
+    SHA-256 hex digest and byte size of the stored file, the same way
+    ImageField fills ``width_field``/``height_field``.
+    """
+
+    def __init__(self, *args, hash_field=None, size_field=None, **kwargs):
+        self.hash_field = hash_field
+        self.size_field = size_field
+        kwargs.setdefault('storage', get_content_addressed_storage)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.hash_field:
+            kwargs['hash_field'] = self.hash_field
+        if self.size_field:
+            kwargs['size_field'] = self.size_field
+        return name, path, args, kwargs
+
+    def update_content_fields(self, instance, name, size):
+        if self.hash_field:
+            setattr(instance, self.hash_field, ContentAddressedStorage.digest_from_name(name))
+        if self.size_field:
+            setattr(instance, self.size_field, size)
+
+
+class ContentAddressedFileField(ContentAddressedFieldMixin, models.FileField):
+    attr_class = ContentAddressedFieldFile
+
+
+class ContentAddressedImageField(ContentAddressedFieldMixin, models.ImageField):
+    attr_class = ContentAddressedImageFieldFile
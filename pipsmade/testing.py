@@ -0,0 +1,195 @@
+"""
+Query-budget test harness for the hot views.
+
+``QueryBudgetTestCase.assertQueryBudget`` requests a URL with cold caches,
+asserts its exact query count (assertNumQueries) and a latency ceiling,
+then grows the data with ``grow`` and asserts the same count again. A view
+that issues a query per row (N+1) fails the second assertion instead of
+reaching production. When a budget legitimately changes, update the
+constant next to the test.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase
+from django.utils import timezone
+
+from crypto_news.models import CryptoNews
+from faq import services as faq_services
+from faq.models import FAQ, FAQCategory
+from investments import calculator, catalog
+from investments.models import InvestmentPlan, InvestmentReturn, UserInvestment
+from investments.portfolio import recompute_user_portfolio
+from support.models import SupportCategory, SupportFAQ, SupportKnowledgeBase, SupportMessage, SupportTicket
+from transactions.models import (
+    CryptoWallet, DepositRequest, Transaction, TransactionNotification, UserWallet, WithdrawalRequest
+)
+from transactions.notifications import UNREAD_LIMIT, record_notifications_created
+
+LATENCY_CEILING_MS = 1500
+
+
+def clear_caches():
+    """Every cache, plus the in-process snapshots that outlive cache.clear()"""
+    for cache in caches.all():
+        cache.clear()
+    faq_services._snapshot = None
+    calculator._table = None
+    catalog._catalog = None
+
+
+def seed_catalog():
+    """Plans, wallets, FAQs, news and help articles shared by every user"""
+    for crypto_type, network in [('BTC', 'Bitcoin'), ('ETH', 'ERC-20'), ('USDT', 'TRC-20')]:
+        CryptoWallet.objects.create(crypto_type=crypto_type, wallet_address=f'{crypto_type}-address', network=network)
+    for index, (name, plan_type) in enumerate([('Starter', 'basic'), ('Growth', 'standard'), ('Elite', 'premium')]):
+        InvestmentPlan.objects.create(
+            name=name, plan_type=plan_type, description=f'{name} plan',
+            min_investment=Decimal(100 * 10 ** index), max_investment=Decimal(1000 * 10 ** index),
+            min_roi_percentage=Decimal(5 + index), max_roi_percentage=Decimal(10 + index * 5),
+            duration_days=30 * (index + 1),
+        )
+    support_category = SupportCategory.objects.create(name='Deposits')
+    for index in range(3):
+        category = FAQCategory.objects.create(name=f'Category {index}', order=index)
+        for question in range(4):
+            FAQ.objects.create(category=category, question=f'Question {index}.{question}?', answer='Answer', order=question)
+        SupportFAQ.objects.create(category=support_category, question=f'Support question {index}?', answer='Answer')
+        SupportKnowledgeBase.objects.create(
+            title=f'Article {index}', content='Content', category=support_category,
+            slug=f'article-{index}', is_featured=True,
+        )
+    now = timezone.now()
+    for index in range(5):
+        CryptoNews.objects.create(
+            title=f'News {index}', summary='Summary', content='Content', source='Wire',
+            published_at=now - timedelta(hours=index),
+        )
+    return support_category
+
+
+def seed_activity(user, count, support_category=None):
+    """``count`` transactions, notifications, investments and tickets for ``user``"""
+    plans = list(InvestmentPlan.objects.all())
+    wallets = {wallet.crypto_type: wallet for wallet in CryptoWallet.objects.all()}
+    crypto_types = list(wallets)
+    statuses = ['pending', 'completed', 'processing', 'completed']
+    today = timezone.now().date()
+
+    for crypto_type in crypto_types:
+        UserWallet.objects.get_or_create(user=user, crypto_type=crypto_type, defaults={'balance': Decimal('1.5')})
+
+    for index in range(count):
+        crypto_type = crypto_types[index % len(crypto_types)]
+        is_deposit = index % 3 != 2
+        transaction = Transaction.objects.create(
+            user=user,
+            transaction_type='deposit' if is_deposit else 'withdrawal',
+            status=statuses[index % len(statuses)],
+            amount=Decimal(50 + index),
+            crypto_type=crypto_type,
+            transaction_hash=f'hash-{user.pk}-{index}',
+        )
+        if is_deposit:
+            DepositRequest.objects.create(
+                user=user, transaction=transaction, crypto_wallet=wallets[crypto_type],
+                amount=transaction.amount, transaction_hash=transaction.transaction_hash,
+                sender_address='sender', admin_verified=transaction.status == 'completed',
+            )
+        else:
+            WithdrawalRequest.objects.create(
+                user=user, transaction=transaction, crypto_type=crypto_type, amount=transaction.amount,
+                destination_address='destination', network='ERC-20', ip_address='127.0.0.1', user_agent='tests',
+            )
+        TransactionNotification.objects.create(
+            user=user, transaction=transaction, title=f'Update {index}', message='Status changed',
+            notification_type='deposit_confirmed' if is_deposit else 'withdrawal_approved',
+            is_read=index % 2 == 0,
+        )
+
+        plan = plans[index % len(plans)]
+        investment = UserInvestment.objects.create(
+            user=user, investment_plan=plan, amount=plan.min_investment, roi_percentage=plan.max_roi_percentage,
+            end_date=timezone.now() + timedelta(days=plan.duration_days),
+            status='active' if index % 4 else 'completed',
+            expected_return=plan.min_investment * plan.max_roi_percentage / 100,
+        )
+        InvestmentReturn.objects.bulk_create([
+            InvestmentReturn(
+                investment=investment, date=today - timedelta(days=day), daily_return=Decimal('1.25'),
+                cumulative_return=Decimal('1.25') * (day + 1), return_percentage=Decimal('0.50'),
+            )
+            for day in range(3)
+        ])
+
+        ticket = SupportTicket.objects.create(
+            user=user, category=support_category, subject=f'Ticket {index}', description='Help',
+            status='open' if index % 2 else 'resolved',
+        )
+        SupportMessage.objects.create(ticket=ticket, user=user, message='Any update?')
+
+    # The dashboard creates a missing portfolio on first view; do it here so
+    # the measured request only reads
+    recompute_user_portfolio(user)
+
+
+def seed_unread_notifications(user, count=UNREAD_LIMIT):
+    """Enough unread notifications that the tray always shows the capped badge"""
+    transaction = Transaction.objects.create(
+        user=user, transaction_type='deposit', status='completed', amount=Decimal('100'),
+        crypto_type='USDT', transaction_hash=f'welcome-{user.pk}',
+    )
+    notifications = TransactionNotification.objects.bulk_create([
+        TransactionNotification(
+            user=user, transaction=transaction, title=f'Deposit {index}', message='Confirmed',
+            notification_type='deposit_confirmed',
+        )
+        for index in range(count)
+    ])
+    record_notifications_created(notifications)
+
+
+class QueryBudgetTestCase(TestCase):
+    latency_ceiling_ms = LATENCY_CEILING_MS
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.support_category = seed_catalog()
+        cls.investor = User.objects.create_user('investor@example.com', 'investor@example.com', 'pw')
+        cls.staff = User.objects.create_user('staff@example.com', 'staff@example.com', 'pw', is_staff=True)
+        # Past the tray's unread limit from the start, so growing the data
+        # does not switch the badge to its extra count query mid-test
+        seed_unread_notifications(cls.investor)
+
+    def setUp(self):
+        clear_caches()
+
+    def login(self, user):
+        self.client.force_login(user)
+
+    def seed_activity(self, user, count):
+        seed_activity(user, count, self.support_category)
+
+    def get_within_budget(self, url, budget):
+        # Cold caches, so the count covers the session, user and cache misses
+        clear_caches()
+        start = perf_counter()
+        with self.assertNumQueries(budget):
+            response = self.client.get(url)
+        elapsed_ms = (perf_counter() - start) * 1000
+        self.assertEqual(response.status_code, 200, f'{url} returned {response.status_code}')
+        self.assertLess(
+            elapsed_ms, self.latency_ceiling_ms,
+            f'{url} took {elapsed_ms:.0f} ms (ceiling {self.latency_ceiling_ms} ms)',
+        )
+        return response
+
+    def assertQueryBudget(self, url, budget, grow=None):
+        """Same exact query count before and after ``grow()`` adds rows"""
+        self.get_within_budget(url, budget)
+        if grow is not None:
+            grow()
+            self.get_within_budget(url, budget)
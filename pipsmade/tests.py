@@ -0,0 +1,279 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from crypto_news.models import CryptoNews
+from investments.models import InvestmentPlan
+from pipsmade import health
+from pipsmade.db_router import PIN_COOKIE, PrimaryPinMiddleware, ReplicaRouter, use_primary, use_read_replica
+from pipsmade import metrics
+from pipsmade.metrics import QueryTimer, RequestMetrics, RequestMetricsMiddleware
+from pipsmade.page_cache import cache_anonymous_page
+from pipsmade.slow_queries import SlowQueryLog, explain, normalize_sql, params_fingerprint
+from pipsmade.testing import QueryBudgetTestCase, clear_caches
+
+HOME_QUERIES = 8
+
+
+class HomeQueryBudgetTests(QueryBudgetTestCase):
+    def add_plans_and_news(self):
+        for index in range(10):
+            InvestmentPlan.objects.create(
+                name=f'Extra {index}', plan_type='standard', description='Extra plan',
+                min_investment=50 + index, min_roi_percentage=3, max_roi_percentage=9,
+            )
+            CryptoNews.objects.create(
+                title=f'Extra news {index}', summary='Summary', content='Content', source='Wire',
+                published_at=timezone.now() - timedelta(days=1, hours=index),
+            )
+
+    def test_home_view(self):
+        self.assertQueryBudget('/', HOME_QUERIES, grow=self.add_plans_and_news)
+
+
+class StaticFilesHealthTests(SimpleTestCase):
+    def setUp(self):
+        health._static_files_ok = False
+        self.addCleanup(setattr, health, '_static_files_ok', False)
+
+    def test_failure_is_rechecked_and_success_is_remembered(self):
+        static_root = tempfile.mkdtemp()
+        with override_settings(DEBUG=False, STATIC_ROOT=static_root):
+            self.assertTrue(health.check_static_files().startswith('error'))
+
+            # collectstatic finishes after the first probe
+            open(os.path.join(static_root, 'app.css'), 'w').close()
+            self.assertEqual(health.check_static_files(), 'ok')
+
+            os.remove(os.path.join(static_root, 'app.css'))
+            self.assertEqual(health.check_static_files(), 'ok')
+
+
+@mock.patch('pipsmade.db_router.get_replica_alias', return_value='replica')
+class ReplicaRouterTests(TransactionTestCase):
+    """TransactionTestCase, so the test itself is not inside an atomic block"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = ReplicaRouter()
+
+    def read_alias(self, request, view=None):
+        @use_read_replica
+        def routed_view(request):
+            return HttpResponse(view() if view else self.router.db_for_read(CryptoNews))
+
+        return routed_view(request).content.decode()
+
+    def test_reads_outside_replica_views_use_the_primary(self, _):
+        self.assertEqual(self.router.db_for_read(CryptoNews), DEFAULT_DB_ALIAS)
+
+    def test_get_inside_replica_view_reads_the_replica(self, _):
+        self.assertEqual(self.read_alias(self.factory.get('/')), 'replica')
+        self.assertEqual(self.router.db_for_read(CryptoNews), DEFAULT_DB_ALIAS)
+
+    def test_reads_inside_atomic_use_the_primary(self, _):
+        def read_in_atomic():
+            with transaction.atomic():
+                return self.router.db_for_read(CryptoNews)
+
+        self.assertEqual(self.read_alias(self.factory.get('/'), read_in_atomic), DEFAULT_DB_ALIAS)
+
+    def test_pin_cookie_keeps_reads_on_the_primary(self, _):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(self.read_alias(request), DEFAULT_DB_ALIAS)
+
+    def test_post_requests_use_the_primary(self, _):
+        self.assertEqual(self.read_alias(self.factory.post('/')), DEFAULT_DB_ALIAS)
+
+    def test_use_primary_overrides_replica_views(self, _):
+        with use_primary():
+            self.assertEqual(self.read_alias(self.factory.get('/')), DEFAULT_DB_ALIAS)
+
+    def test_writes_always_use_the_primary(self, _):
+        self.assertEqual(self.router.db_for_write(CryptoNews), DEFAULT_DB_ALIAS)
+
+    def test_post_response_sets_the_pin_cookie(self, _):
+        middleware = PrimaryPinMiddleware(lambda request: HttpResponse())
+        self.assertIn(PIN_COOKIE, middleware(self.factory.post('/')).cookies)
+        self.assertNotIn(PIN_COOKIE, middleware(self.factory.get('/')).cookies)
+
+    def test_cached_pages_are_rendered_on_the_primary(self, _):
+        clear_caches()
+        self.addCleanup(clear_caches)
+
+        @cache_anonymous_page(lambda: 1)
+        @use_read_replica
+        def cached_view(request):
+            return HttpResponse(self.router.db_for_read(CryptoNews))
+
+        response = cached_view(self.factory.get('/cached/'))
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertEqual(response.content.decode(), DEFAULT_DB_ALIAS)
+
+
+class SlowQueryLogTests(TestCase):
+    def setUp(self):
+        self.log = SlowQueryLog()
+        self.file_logger = mock.Mock()
+        self.log._get_file_logger = lambda: self.file_logger
+
+    def entries(self):
+        return [json.loads(call.args[0]) for call in self.file_logger.info.call_args_list]
+
+    def test_normalize_sql_strips_values_and_collapses_in_lists(self):
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM t\n WHERE a = 'it''s' AND b = 4.5 AND c IN (%s, %s, %s) LIMIT 21"),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...) LIMIT ?',
+        )
+        self.assertEqual(normalize_sql('SELECT "t2"."id" FROM "t2"'), 'SELECT "t2"."id" FROM "t2"')
+
+    def test_params_fingerprint_is_keyed_with_the_secret_key(self):
+        fingerprint = params_fingerprint((42, 'user@example.com'), many=False)
+        self.assertEqual(fingerprint, params_fingerprint((42, 'user@example.com'), many=False))
+        self.assertNotEqual(fingerprint, params_fingerprint((43, 'user@example.com'), many=False))
+        with override_settings(SECRET_KEY='another-secret-key'):
+            self.assertNotEqual(fingerprint, params_fingerprint((42, 'user@example.com'), many=False))
+        self.assertEqual(params_fingerprint([(1,), (2,)], many=True), 'executemany')
+
+    def test_repeats_inside_the_dedupe_window_are_short_entries(self):
+        sql = 'SELECT id FROM auth_user WHERE id = %s'
+        self.log.record(connection, sql, (1,), False, 250)
+        self.log.record(connection, sql, (2,), False, 300)
+        first, repeat = self.entries()
+        self.assertEqual(first['digest'], repeat['digest'])
+        self.assertEqual(first['sql'], 'SELECT id FROM auth_user WHERE id = ?')
+        self.assertTrue(first['plan'])
+        self.assertNotIn('sql', repeat)
+        self.assertNotIn('plan', repeat)
+        self.assertNotEqual(first['params'], repeat['params'])
+
+        with override_settings(SLOW_QUERY_DEDUPE_SECONDS=0):
+            self.log.record(connection, sql, (3,), False, 250)
+        self.assertIn('plan', self.entries()[-1])
+
+    def test_explain_bypasses_execute_wrappers(self):
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer), self.assertNumQueries(0):
+            plan = explain(connection, 'SELECT id FROM auth_user WHERE id = %s', (1,))
+            failed = explain(connection, 'SELECT id FROM no_such_table', None)
+        self.assertEqual(timer.count, 0)
+        self.assertTrue(plan)
+        self.assertTrue(failed[0].startswith('EXPLAIN failed'))
+        # The failed EXPLAIN was rolled back to its savepoint; the transaction is still usable
+        self.assertEqual(InvestmentPlan.objects.count(), 0)
+
+
+class SlowQueryReportTests(SimpleTestCase):
+    def test_report_ranks_queries_by_total_time(self):
+        path = os.path.join(tempfile.mkdtemp(), 'slow.log')
+        entries = [
+            {'ts': '2026-01-01T00:00:00+00:00', 'digest': 'a', 'ms': 300, 'view': 'home', 'sql': 'SELECT a',
+             'plan': ['SCAN a']},
+            {'ts': '2026-01-01T00:00:01+00:00', 'digest': 'a', 'ms': 500, 'view': 'faq'},
+            {'ts': '2026-01-01T00:00:02+00:00', 'digest': 'b', 'ms': 600, 'view': 'home', 'sql': 'SELECT b'},
+        ]
+        with open(path, 'w') as log_file:
+            log_file.write('\n'.join(json.dumps(entry) for entry in entries) + '\nnot json\n')
+
+        stdout = StringIO()
+        call_command('slow_query_report', file=path, json=True, stdout=stdout)
+        report = json.loads(stdout.getvalue())
+        self.assertEqual([query['digest'] for query in report], ['a', 'b'])
+        self.assertEqual(report[0]['count'], 2)
+        self.assertEqual(report[0]['total_ms'], 800)
+        self.assertEqual(report[0]['max_ms'], 500)
+        self.assertEqual(report[0]['avg_ms'], 400)
+        self.assertEqual(report[0]['views'], {'home': 1, 'faq': 1})
+        self.assertEqual(report[0]['plan'], ['SCAN a'])
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.metrics = RequestMetrics()
+        patcher = mock.patch.object(metrics, 'request_metrics', self.metrics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lines(self):
+        return self.metrics.render(1.0).splitlines()
+
+    def test_histograms_are_cumulative_with_sum_and_count(self):
+        self.metrics.observe('home', 'GET', 200, (0.02, 0.004, 3, 2000))
+        self.metrics.observe('home', 'GET', 200, (0.3, 0.2, 12, None))
+        self.metrics.observe('home', 'POST', 302, (7.0, 0.0, 0, 10))
+        lines = self.lines()
+
+        self.assertIn('pipsmade_http_requests_total{view="home",method="GET",status="200"} 2', lines)
+        self.assertIn('pipsmade_http_requests_total{view="home",method="POST",status="302"} 1', lines)
+        duration = 'pipsmade_http_request_duration_seconds'
+        self.assertIn(f'{duration}_bucket{{view="home",le="0.025"}} 1', lines)
+        self.assertIn(f'{duration}_bucket{{view="home",le="0.25"}} 1', lines)
+        self.assertIn(f'{duration}_bucket{{view="home",le="0.5"}} 2', lines)
+        self.assertIn(f'{duration}_bucket{{view="home",le="10.0"}} 3', lines)
+        self.assertIn(f'{duration}_bucket{{view="home",le="+Inf"}} 3', lines)
+        self.assertIn(f'{duration}_sum{{view="home"}} 7.32', lines)
+        self.assertIn(f'{duration}_count{{view="home"}} 3', lines)
+        self.assertIn('pipsmade_http_db_queries_bucket{view="home",le="0"} 1', lines)
+        self.assertIn('pipsmade_http_db_queries_sum{view="home"} 15', lines)
+        # Streaming responses have no size
+        self.assertIn('pipsmade_http_response_size_bytes_count{view="home"} 2', lines)
+
+    def test_label_values_are_escaped(self):
+        self.metrics.observe('a"b\\c\nd', 'GET', 200, (0.01, 0.0, 1, 10))
+        self.assertIn(
+            'pipsmade_http_requests_total{view="a\\"b\\\\c\\nd",method="GET",status="200"} 1', self.lines()
+        )
+
+    def test_sample_rate_zero_disables_the_middleware(self):
+        with override_settings(METRICS_SAMPLE_RATE=0):
+            with self.assertRaises(MiddlewareNotUsed):
+                RequestMetricsMiddleware(lambda request: HttpResponse())
+
+    def test_sample_rate_one_records_every_request(self):
+        with override_settings(METRICS_SAMPLE_RATE=1.0):
+            for _ in range(3):
+                self.client.get('/about/')
+        self.assertIn('pipsmade_http_requests_total{view="about",method="GET",status="200"} 3', self.lines())
+
+    def test_unsampled_requests_are_not_recorded(self):
+        middleware = RequestMetricsMiddleware.__new__(RequestMetricsMiddleware)
+        middleware.get_response = lambda request: HttpResponse('ok')
+        middleware.sample_rate = 0.5
+        request = RequestFactory().get('/')
+        with mock.patch('pipsmade.metrics.random.random', side_effect=[0.7, 0.2]):
+            middleware(request)
+            middleware(request)
+        self.assertIn(
+            f'pipsmade_http_requests_total{{view="{metrics.UNRESOLVED_VIEW}",method="GET",status="200"}} 1',
+            self.lines(),
+        )
+
+    @override_settings(METRICS_TOKEN='scrape-token')
+    def test_metrics_endpoint_requires_staff_or_the_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        self.client.force_login(User.objects.create_user('member@example.com', 'member@example.com', 'pw'))
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('pipsmade_http_metrics_sample_rate', response.content.decode())
+
+        self.client.force_login(User.objects.create_user('staff@example.com', 'staff@example.com', 'pw', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_metrics_endpoint_without_a_token_configured(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
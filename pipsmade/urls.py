@@ -4,7 +4,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
-from .views import HomeView, AboutView, ContactView, health_check, test_static, csrf_test
+from .health import liveness, readiness
+from .views import HomeView, AboutView, ContactView, metrics_view, test_static, csrf_test
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -14,7 +15,10 @@ urlpatterns = [
     path('about/', AboutView.as_view(), name='about'),
     path('contact/', ContactView.as_view(), name='contact'),
     path('alert-demo/', TemplateView.as_view(template_name='alert_demo.html'), name='alert_demo'),
-    path('health/', health_check, name='health_check'),
+    path('health/', readiness, name='health_check'),
+    path('health/live/', liveness, name='health_liveness'),
+    path('health/ready/', readiness, name='health_readiness'),
+    path('metrics', metrics_view, name='metrics'),
     path('test-static/', test_static, name='test_static'),
     path('csrf-test/', csrf_test, name='csrf_test'),
 
@@ -1,18 +1,24 @@
 from django.shortcuts import render
+from django.conf import settings
 from django.views.generic import TemplateView
-from investments.models import InvestmentPlan
-from django.db.models import Min, Max
+from django.utils.decorators import method_decorator
+from investments.catalog import get_plan_catalog
+from investments.calculator import get_plan_table_version
+from faq.services import get_faq_version
+from crypto_news.versioning import get_news_version
+from .page_cache import cache_anonymous_page
+from .metrics import request_metrics
 import logging
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_protect, csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.middleware.csrf import get_token
+import hmac
 import os
-import sqlite3
-from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+@method_decorator(cache_anonymous_page(get_plan_table_version, get_faq_version, get_news_version), name='dispatch')
 class HomeView(TemplateView):
     template_name = 'index.html'
     
@@ -21,31 +27,15 @@ class HomeView(TemplateView):
         context['page_title'] = 'Home - Professional Investment Platform'
         
         try:
-            # Get active investment plans for pricing section
-            investment_plans = InvestmentPlan.objects.filter(is_active=True).order_by('min_investment')[:6]
-            context['investment_plans'] = investment_plans
-            
-            # Calculate pricing statistics
-            if investment_plans.exists():
-                context['pricing_stats'] = {
-                    'total_plans': investment_plans.count(),
-                    'min_roi': investment_plans.aggregate(Min('min_roi_percentage'))['min_roi_percentage__min'] or 0,
-                    'max_roi': investment_plans.aggregate(Max('max_roi_percentage'))['max_roi_percentage__max'] or 0,
-                }
-                logger.info(f"Loaded {context['pricing_stats']['total_plans']} investment plans for homepage")
-            else:
-                context['pricing_stats'] = {
-                    'total_plans': 0,
-                    'min_roi': 0,
-                    'max_roi': 0,
-                }
-                logger.info("No active investment plans found for homepage")
+            # Active plans and pricing stats come from the cached plan catalog
+            catalog = get_plan_catalog()
+            context['investment_plans'] = catalog.homepage_plans
+            context['pricing_stats'] = catalog.pricing_stats
             
             # Get FAQs for the home page
             try:
-                from faq.models import FAQCategory
-                platform_category = FAQCategory.objects.get(name='Platform & Security', is_active=True)
-                context['faqs'] = platform_category.faqs.filter(is_active=True)[:6]
+                from faq.services import get_faq_snapshot, MAIN_CATEGORY
+                context['faqs'] = get_faq_snapshot().faqs_for(MAIN_CATEGORY, limit=6)
                 logger.info(f"Loaded {len(context['faqs'])} FAQs for homepage")
             except Exception as e:
                 logger.warning(f"Could not load FAQs for homepage: {str(e)}")
@@ -64,6 +54,7 @@ class HomeView(TemplateView):
         
         return context
 
+@method_decorator(cache_anonymous_page(), name='dispatch')
 class AboutView(TemplateView):
     template_name = 'about.html'
     
@@ -72,6 +63,7 @@ class AboutView(TemplateView):
         context['page_title'] = 'About Us - pipsmade'
         return context
 
+@method_decorator(cache_anonymous_page(get_faq_version), name='dispatch')
 class ContactView(TemplateView):
     template_name = 'contact.html'
     
@@ -81,9 +73,8 @@ class ContactView(TemplateView):
         
         # Get FAQs for the contact page
         try:
-            from faq.models import FAQCategory
-            support_category = FAQCategory.objects.get(name='Support & Contact', is_active=True)
-            context['faqs'] = support_category.faqs.filter(is_active=True)[:3]
+            from faq.services import get_faq_snapshot, SUPPORT_CATEGORY
+            context['faqs'] = get_faq_snapshot().faqs_for(SUPPORT_CATEGORY, limit=3)
         except Exception as e:
             logger.warning(f"Could not load FAQs for contact page: {str(e)}")
             context['faqs'] = []
@@ -93,47 +84,18 @@ class ContactView(TemplateView):
 def index(request):
     return render(request, 'index.html')
 
-@csrf_exempt
 @require_http_methods(["GET"])
-def health_check(request):
-    """Simple health check endpoint for monitoring"""
-    try:
-        # Check database connection
-        db_path = Path(__file__).parent.parent / 'db.sqlite3'
-        if db_path.exists():
-            conn = sqlite3.connect(str(db_path))
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-            conn.close()
-            db_status = "healthy"
-        else:
-            db_status = "database file not found"
-        
-        # Check static files
-        static_path = Path(__file__).parent.parent / 'staticfiles'
-        if static_path.exists():
-            static_status = "healthy"
-            static_count = len(list(static_path.rglob('*')))
-        else:
-            static_status = "static files not found"
-            static_count = 0
-        
-        return JsonResponse({
-            'status': 'healthy',
-            'timestamp': str(Path(__file__).parent.parent),
-            'database': db_status,
-            'static_files': static_status,
-            'static_count': static_count,
-            'environment': os.environ.get('DJANGO_SETTINGS_MODULE', 'not set'),
-            'static_root': str(static_path),
-            'static_url': '/static/'
-        })
-    except Exception as e:
-        return JsonResponse({
-            'status': 'unhealthy',
-            'error': str(e)
-        }, status=500)
+def metrics_view(request):
+    """Prometheus scrape endpoint: staff session or ``Authorization: Bearer <METRICS_TOKEN>``"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.headers.get('Authorization', '')
+    authorized = request.user.is_staff or (
+        token and hmac.compare_digest(authorization, f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    body = request_metrics.render(getattr(settings, 'METRICS_SAMPLE_RATE', 1.0))
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -13,10 +13,11 @@ check_django_health() {
     # Wait a bit for Django to start
     sleep 5
     
-    # Try to make a simple request
+    # Liveness probe: restarting only helps when the process itself is stuck,
+    # not when the database or cache is down (that is /health/ready/)
     if command -v curl >/dev/null 2>&1; then
-        response=$(curl -s -o /dev/null -w "%{http_code}" http://localhost:$PORT/ || echo "000")
-        if [ "$response" = "200" ] || [ "$response" = "404" ] || [ "$response" = "302" ]; then
+        response=$(curl -s -o /dev/null -w "%{http_code}" http://localhost:$PORT/health/live/ || echo "000")
+        if [ "$response" = "200" ]; then
             echo "Django is responding (HTTP $response)"
             return 0
         else
@@ -41,19 +42,9 @@ restart_django() {
 start_django() {
     echo "Starting Django with gunicorn..."
     
-    # Start gunicorn in background
-    gunicorn pipsmade.wsgi:application \
-        --bind 0.0.0.0:$PORT \
-        --workers 1 \
-        --timeout 300 \
-        --keep-alive 5 \
-        --max-requests 1000 \
-        --max-requests-jitter 100 \
-        --access-logfile - \
-        --error-logfile - \
-        --log-level debug \
-        --preload \
-        --daemon
+    # Start gunicorn in background; workers, threads and SERVER_MODE
+    # (gthread/asgi/sync) are chosen in pipsmade/gunicorn_conf.py
+    gunicorn -c pipsmade/gunicorn_conf.py --daemon
     
     # Wait for startup
     sleep 3
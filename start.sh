@@ -46,14 +46,5 @@ fi
 
 # Start gunicorn with the port and better error handling
 echo "Starting gunicorn on port $PORT..."
-exec gunicorn pipsmade.wsgi:application \
-    --bind 0.0.0.0:$PORT \
-    --workers 1 \
-    --timeout 300 \
-    --keep-alive 5 \
-    --max-requests 1000 \
-    --max-requests-jitter 100 \
-    --access-logfile - \
-    --error-logfile - \
-    --log-level debug \
-    --preload 
\ No newline at end of file
+# Workers, threads and SERVER_MODE (gthread/asgi/sync): pipsmade/gunicorn_conf.py
+exec gunicorn -c pipsmade/gunicorn_conf.py 
\ No newline at end of file
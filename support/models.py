@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from pipsmade.storage import ContentAddressedFileField
 
 class SupportCategory(models.Model):
     """Support ticket categories"""
@@ -110,7 +111,12 @@ class SupportMessage(models.Model):
     is_staff_reply = models.BooleanField(default=False)
 
     # Attachments
-    attachment = models.FileField(upload_to='support_attachments/', null=True, blank=True)
+    attachment = ContentAddressedFileField(
+        upload_to='support_attachments/', null=True, blank=True,
+        hash_field='attachment_sha256', size_field='attachment_size'
+    )
+    attachment_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    attachment_size = models.PositiveBigIntegerField(null=True, blank=True)
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -1,3 +1,89 @@
+import hashlib
+import os
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from pipsmade.testing import QueryBudgetTestCase
+
+from .models import SupportCategory, SupportMessage, SupportTicket
+
+SUPPORT_CENTER_QUERIES = 7
+SCREENSHOT = b'\x89PNG same screenshot bytes'
+
+
+class SupportQueryBudgetTests(QueryBudgetTestCase):
+    def test_support_center(self):
+        self.login(self.investor)
+        self.seed_activity(self.investor, 3)
+        self.assertQueryBudget(
+            '/support/', SUPPORT_CENTER_QUERIES, grow=lambda: self.seed_activity(self.investor, 30)
+        )
+
+
+class SupportAttachmentStorageTests(TestCase):
+    def setUp(self):
+        media_root = self.settings(MEDIA_ROOT=tempfile.mkdtemp())
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.user = User.objects.create_user('member@example.com', 'member@example.com', 'pw')
+        self.ticket = SupportTicket.objects.create(
+            user=self.user, category=SupportCategory.objects.create(name='Deposits'),
+            subject='Deposit missing', description='Help',
+        )
+
+    def stored_files(self):
+        return [
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(settings.MEDIA_ROOT) for name in names
+        ]
+
+    def test_identical_uploads_share_one_file(self):
+        messages = []
+        for filename in ['screenshot.png', 'screenshot (1).PNG']:
+            message = SupportMessage(ticket=self.ticket, user=self.user, message='See attached')
+            message.attachment.save(filename, ContentFile(SCREENSHOT))
+            messages.append(message)
+
+        digest = hashlib.sha256(SCREENSHOT).hexdigest()
+        self.assertEqual(len(self.stored_files()), 1)
+        self.assertEqual(SupportMessage.objects.count(), 2)
+        for message in SupportMessage.objects.all():
+            self.assertEqual(message.attachment.name, f'support_attachments/{digest[:2]}/{digest[2:4]}/{digest}.png')
+            self.assertEqual(message.attachment_sha256, digest)
+            self.assertEqual(message.attachment_size, len(SCREENSHOT))
+        with messages[1].attachment.open('rb') as stored:
+            self.assertEqual(stored.read(), SCREENSHOT)
+
+    def test_email_support_inserts_all_attachments_at_once(self):
+        self.client.force_login(self.user)
+        attachments = [
+            SimpleUploadedFile('first.png', SCREENSHOT, content_type='image/png'),
+            SimpleUploadedFile('again.png', SCREENSHOT, content_type='image/png'),
+            SimpleUploadedFile('notes.txt', b'steps to reproduce', content_type='text/plain'),
+        ]
+        with mock.patch('support.views.send_support_notification'), CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/support/email-support/', {
+                'topic': 'deposit', 'priority': 'high', 'subject': 'Deposit missing', 'message': 'Details',
+                'contact_email': 'member@example.com', 'attachments': attachments,
+            })
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()['success'])
 
-# Create your tests here.
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "support_supportmessage"')]
+        self.assertEqual(len(inserts), 1)
+        ticket = SupportTicket.objects.get(pk=response.json()['ticket_id'])
+        stored = list(ticket.messages.order_by('id').values_list('attachment_sha256', 'attachment_size'))
+        self.assertEqual(stored, [
+            (hashlib.sha256(SCREENSHOT).hexdigest(), len(SCREENSHOT)),
+            (hashlib.sha256(SCREENSHOT).hexdigest(), len(SCREENSHOT)),
+            (hashlib.sha256(b'steps to reproduce').hexdigest(), 18),
+        ])
+        self.assertEqual(len(self.stored_files()), 2)
@@ -12,6 +12,7 @@ from django.utils.html import strip_tags
 from .models import SupportTicket, SupportMessage, SupportCategory, SupportKnowledgeBase, SupportFAQ
 from .forms import SupportTicketForm, SupportMessageForm, QuickSupportForm, AdminTicketUpdateForm, EmailSupportForm
 from .email_notifications import send_support_notification
+from pipsmade.db_router import use_read_replica
 
 @login_required
 def support_center(request):
@@ -34,13 +35,6 @@ def support_center(request):
     # Get support categories
     categories = SupportCategory.objects.filter(is_active=True)
 
-    # Get user notifications
-    from transactions.models import TransactionNotification
-    unread_notifications = TransactionNotification.objects.filter(
-        user=request.user,
-        is_read=False
-    ).order_by('-created_at')[:10]
-
     # Support statistics (use the unsliced queryset)
     stats = {
         'total_tickets': user_tickets_all.count(),
@@ -54,7 +48,6 @@ def support_center(request):
         'popular_faqs': popular_faqs,
         'categories': categories,
         'stats': stats,
-        'unread_notifications': unread_notifications,
     }
 
     return render(request, 'dashboard/support.html', context)
@@ -150,6 +143,7 @@ def my_tickets(request):
     return render(request, 'support/my_tickets.html', context)
 
 @login_required
+@use_read_replica
 def knowledge_base(request):
     """Knowledge base articles"""
     articles = SupportKnowledgeBase.objects.filter(is_published=True)
@@ -207,6 +201,7 @@ def article_detail(request, slug):
     return render(request, 'support/article_detail.html', context)
 
 @login_required
+@use_read_replica
 def faq_list(request):
     """FAQ list page"""
     faqs = SupportFAQ.objects.filter(is_active=True)
@@ -357,24 +352,27 @@ def email_support(request):
                     category=category,
                     priority=priority,
                     subject=subject,
-                    message=message,
+                    description=message,
                     status='open'
                 )
                 
                 print(f"Ticket created with ID: {ticket.id}")
                 
-                # Handle attachments
+                # Handle attachments - files are streamed into content-addressed
+                # storage first, then all messages are written in one insert
                 if attachments:
+                    support_messages = []
                     for attachment in attachments:
-                        support_message = SupportMessage.objects.create(
+                        support_message = SupportMessage(
                             ticket=ticket,
                             user=request.user,
                             message=f"Email support request from {contact_email}",
                             is_staff_reply=False
                         )
-                        support_message.attachment = attachment
-                        support_message.save()
-                        print(f"Attachment saved: {attachment.name}")
+                        support_message.attachment.save(attachment.name, attachment, save=False)
+                        support_messages.append(support_message)
+                        print(f"Attachment stored: {attachment.name} -> {support_message.attachment.name}")
+                    SupportMessage.objects.bulk_create(support_messages)
                 
                 # Send admin notification email using the simple email system
                 try:
@@ -6,6 +6,7 @@ from .models import (
     CryptoWallet, UserWallet, Transaction,
     DepositRequest, WithdrawalRequest, TransactionNotification
 )
+from .image_pipeline import schedule_proof_processing
 
 @admin.register(CryptoWallet)
 class CryptoWalletAdmin(admin.ModelAdmin):
@@ -130,7 +131,10 @@ class DepositRequestAdmin(admin.ModelAdmin):
         'user__username', 'user__email', 'transaction_hash',
         'sender_address'
     ]
-    readonly_fields = ['created_at', 'updated_at', 'verified_at', 'proof_image_display']
+    readonly_fields = [
+        'created_at', 'updated_at', 'verified_at', 'proof_image_display',
+        'proof_image_sha256', 'proof_image_size', 'proof_image_status'
+    ]
 
     fieldsets = (
         ('Deposit Information', {
@@ -140,7 +144,10 @@ class DepositRequestAdmin(admin.ModelAdmin):
             )
         }),
         ('Proof of Payment', {
-            'fields': ('proof_image',)
+            'fields': (
+                'proof_image', 'proof_image_display', 'proof_image_status',
+                'proof_image_sha256', 'proof_image_size'
+            )
         }),
         ('Admin Verification', {
             'fields': (
@@ -157,11 +164,21 @@ class DepositRequestAdmin(admin.ModelAdmin):
         return f"{obj.transaction_hash[:20]}..." if len(obj.transaction_hash) > 20 else obj.transaction_hash
     transaction_hash_short.short_description = 'Transaction Hash'
 
+    def save_model(self, request, obj, form, change):
+        # A replaced image needs new derivatives; until then serve the original
+        image_changed = 'proof_image' in form.changed_data
+        if image_changed:
+            obj.proof_image_status = 'pending' if obj.proof_image else ''
+        super().save_model(request, obj, form, change)
+        if image_changed:
+            schedule_proof_processing(obj)
+
     def proof_image_display(self, obj):
         if obj.proof_image:
             return format_html(
-                '<img src="{}" style="max-width: 300px; max-height: 200px;" />',
-                obj.proof_image.url
+                '<a href="{}" target="_blank"><img src="{}" style="max-width: 300px; max-height: 200px;" /></a>',
+                obj.proof_image.url,
+                obj.get_proof_thumbnail_url()
             )
         return 'No image uploaded'
     proof_image_display.short_description = 'Proof Image'
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+from .notifications import NotificationTray
+
+
+def notifications(request):
+    """
+    Notification tray for the dashboard bell.
+
+    Values are callables so nothing is loaded unless a template renders them;
+    the tray itself loads at most once per request.
+    """
+    if not hasattr(request, 'user'):
+        return {}
+
+    tray = NotificationTray(request.user)
+    return {
+        'notification_tray': tray,
+        'unread_notifications': lambda: tray.unread,
+        'recent_notifications': lambda: tray.recent,
+        'unread_notification_count': lambda: tray.unread_count,
+        'event_stream_enabled': getattr(settings, 'EVENT_STREAM_ENABLED', False),
+        'event_poll_interval_ms': getattr(settings, 'EVENT_POLL_INTERVAL_MS', 15000),
+    }
@@ -0,0 +1,279 @@
+"""
+Push transaction and notification updates to the browser.
+
+post_save signals publish events into an in-process broker once the write
+commits; every open stream for that user in the same process receives them
+immediately. Streams served by other workers (or changes made without
+signals, e.g. bulk writes) are picked up by polling the database every
+``EVENT_STREAM_POLL_INTERVAL`` seconds, so delivery never depends on which
+worker handled the write.
+
+The stream cursor ``<notification id>:<transaction updated_at in µs>`` is
+sent as the SSE event id, so a reconnecting EventSource resumes where it
+left off through ``Last-Event-ID``. Each push also triggers a poll, so the
+cursor always covers what was delivered.
+
+Holding a stream open only works under ASGI. Django's WSGI handler drains
+an async streaming body completely before sending any of it, so a stream
+served over WSGI would deliver nothing for EVENT_STREAM_MAX_SECONDS while
+pinning a worker thread. Over WSGI the stream endpoint therefore answers
+with what is pending and asks the browser to reconnect later
+(``snapshot_events``), and long polls return immediately.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .models import Transaction, TransactionNotification
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+SEEN_EVENTS = 500
+
+
+def notification_event(notification):
+    return {
+        'type': 'notification',
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def transaction_event(transaction):
+    return {
+        'type': 'transaction',
+        'id': transaction.id,
+        'transaction_type': transaction.transaction_type,
+        'status': transaction.status,
+        'amount': str(transaction.amount),
+        'crypto_type': transaction.crypto_type,
+        'updated_at': transaction.updated_at.isoformat(),
+    }
+
+
+def _event_key(event):
+    # Transactions can emit several events (one per status)
+    return (event['type'], event['id'], event.get('status'))
+
+
+class Subscription:
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client; the database poll catches it up
+            pass
+
+
+class EventBroker:
+    """Thread-safe fan-out from signal handlers to per-user asyncio queues"""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The stream's event loop has already shut down
+                self.unsubscribe(subscription)
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions
+
+
+broker = EventBroker()
+
+
+class EventCursor:
+    """Position in a user's notification/transaction history"""
+
+    def __init__(self, notification_id, transactions_since):
+        self.notification_id = notification_id
+        self.transactions_since = transactions_since
+
+    @classmethod
+    def parse(cls, value):
+        try:
+            notification_id, micros = value.split(':')
+            since = datetime.fromtimestamp(int(micros) / 1_000_000, tz=dt_timezone.utc)
+            return cls(int(notification_id), since)
+        except (AttributeError, ValueError, OverflowError, OSError):
+            return None
+
+    @classmethod
+    def initial(cls, user_id):
+        """Start from now: the page already rendered everything older"""
+        latest = TransactionNotification.objects.filter(user_id=user_id).order_by('-id').values_list('id', flat=True).first()
+        return cls(latest or 0, timezone.now())
+
+    def __str__(self):
+        return f'{self.notification_id}:{int(self.transactions_since.timestamp() * 1_000_000)}'
+
+
+def poll_events(user_id, cursor):
+    """Events committed after ``cursor``; advances the cursor"""
+    notifications = list(
+        TransactionNotification.objects.filter(user_id=user_id, id__gt=cursor.notification_id).order_by('id')[:50]
+    )
+    transactions = list(
+        Transaction.objects.filter(user_id=user_id, updated_at__gt=cursor.transactions_since)
+        .order_by('updated_at')[:50]
+    )
+    if notifications:
+        cursor.notification_id = notifications[-1].id
+    if transactions:
+        cursor.transactions_since = transactions[-1].updated_at
+    return [notification_event(n) for n in notifications] + [transaction_event(t) for t in transactions]
+
+
+class EventStream:
+    """Waits for pushed events, polling the database between pushes"""
+
+    def __init__(self, user_id, cursor):
+        self.user_id = user_id
+        self.cursor = cursor
+        self.poll_interval = getattr(settings, 'EVENT_STREAM_POLL_INTERVAL', 5)
+        self._seen = deque(maxlen=SEEN_EVENTS)
+        self._seen_keys = set()
+        self._last_poll = None
+
+    def _unseen(self, events):
+        fresh = []
+        for event in events:
+            key = _event_key(event)
+            if key in self._seen_keys:
+                continue
+            if len(self._seen) == self._seen.maxlen:
+                self._seen_keys.discard(self._seen[0])
+            self._seen.append(key)
+            self._seen_keys.add(key)
+            fresh.append(event)
+        return fresh
+
+    async def poll(self):
+        self._last_poll = asyncio.get_running_loop().time()
+        return self._unseen(await sync_to_async(poll_events)(self.user_id, self.cursor))
+
+    async def next_events(self, subscription, timeout):
+        """Return new events, or [] once ``timeout`` seconds pass without any"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            now = loop.time()
+            if self._last_poll is None or now - self._last_poll >= self.poll_interval:
+                events = await self.poll()
+                if events:
+                    return events
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return []
+            wait = min(remaining, self.poll_interval)
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=wait)
+            except asyncio.TimeoutError:
+                continue
+            events = [event]
+            while not subscription.queue.empty():
+                events.append(subscription.queue.get_nowait())
+            # Deliver the pushed events at once and poll behind them so the
+            # cursor moves past everything that has committed
+            events = self._unseen(events) + await self.poll()
+            if events:
+                return events
+
+
+def format_sse(event, cursor):
+    return f"id: {cursor}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def format_keepalive(cursor):
+    # An id without data dispatches nothing but still moves Last-Event-ID,
+    # so a reconnect resumes from here rather than from "now"
+    return f'id: {cursor}\n: keepalive\n\n'
+
+
+def served_over_asgi(request):
+    return isinstance(request, ASGIRequest)
+
+
+def snapshot_events(user_id, cursor):
+    """Complete SSE body for WSGI: pending events, then reconnect after EVENT_POLL_INTERVAL_MS"""
+    pending = poll_events(user_id, cursor)
+    body = [f"retry: {getattr(settings, 'EVENT_POLL_INTERVAL_MS', 15000)}\n\n"]
+    body.extend(format_sse(event, cursor) for event in pending)
+    body.append(format_keepalive(cursor))
+    return ''.join(body)
+
+
+async def stream_events(user_id, cursor):
+    """Async generator producing an SSE body for one connection"""
+    subscription = broker.subscribe(user_id)
+    stream = EventStream(user_id, cursor)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + getattr(settings, 'EVENT_STREAM_MAX_SECONDS', 300)
+    try:
+        yield f"retry: {getattr(settings, 'EVENT_STREAM_RETRY_MS', 3000)}\n\n"
+        while loop.time() < deadline:
+            events = await stream.next_events(subscription, timeout=min(15, deadline - loop.time()))
+            if not events:
+                # Comment line keeps proxies from closing an idle connection
+                yield format_keepalive(stream.cursor)
+                continue
+            for event in events:
+                yield format_sse(event, stream.cursor)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def wait_for_events(user_id, cursor, timeout):
+    """Long-poll: return (events, cursor) as soon as anything happens or after ``timeout``"""
+    subscription = broker.subscribe(user_id)
+    try:
+        stream = EventStream(user_id, cursor)
+        events = await stream.next_events(subscription, timeout)
+        return events, stream.cursor
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def publish_on_commit(user_id, event):
+    """Publish after the surrounding transaction commits (immediately outside one)"""
+    if broker.has_subscribers(user_id):
+        db_transaction.on_commit(lambda: broker.publish(user_id, event))
@@ -0,0 +1,139 @@
+"""
+Background processing for deposit proof screenshots.
+
+After a deposit request is saved, the uploaded screenshot is handed to a
+process pool that verifies it with Pillow, drops EXIF metadata, and writes a
+downscaled WebP preview plus a small WebP thumbnail next to the original.
+Admin review pages serve those derivatives instead of multi-megabyte originals.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_DIR = 'previews'
+THUMBNAIL_DIR = 'thumbnails'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Lazily create the process pool (after gunicorn has forked its workers)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = getattr(settings, 'IMAGE_PIPELINE_WORKERS', 2)
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        return _executor
+
+
+def derivative_names(name):
+    """Return the (preview, thumbnail) storage names for a stored original"""
+    prefix, filename = os.path.split(name)
+    # Content-addressed originals live under <prefix>/ab/cd/, keep derivatives beside the prefix
+    parts = prefix.split('/')
+    if len(parts) >= 3 and all(len(part) == 2 for part in parts[-2:]):
+        prefix = '/'.join(parts[:-2])
+    stem = os.path.splitext(filename)[0]
+    return (
+        f"{prefix}/{PREVIEW_DIR}/{stem}.webp",
+        f"{prefix}/{THUMBNAIL_DIR}/{stem}.webp",
+    )
+
+
+def render_derivatives(source_path, preview_path, thumbnail_path, preview_size, thumbnail_size):
+    """
+    Verify an image and write EXIF-free WebP preview and thumbnail files.
+
+    Runs inside the process pool, so it must only depend on Pillow and the
+    file system. Returns True on success and False if the image is invalid.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(source_path) as image:
+            image.verify()
+    except Exception:
+        return False
+
+    # verify() leaves the image unusable, so reopen for the actual work
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+        for path, size in ((preview_path, preview_size), (thumbnail_path, thumbnail_size)):
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            # A fresh image carries no EXIF/XMP from the original
+            clean = Image.new(resized.mode, resized.size)
+            clean.paste(resized)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            clean.save(temp_path, 'WEBP', quality=80, method=4)
+            os.replace(temp_path, path)
+
+    return True
+
+
+def process_deposit_proof(deposit_request_id, name):
+    """Generate derivatives for one proof image and record the outcome"""
+    from .models import DepositRequest
+
+    storage = DepositRequest._meta.get_field('proof_image').storage
+    preview_name, thumbnail_name = derivative_names(name)
+    args = (
+        storage.path(name),
+        storage.path(preview_name),
+        storage.path(thumbnail_name),
+        getattr(settings, 'IMAGE_PREVIEW_MAX_SIZE', 1600),
+        getattr(settings, 'IMAGE_THUMBNAIL_MAX_SIZE', 320),
+    )
+
+    if not getattr(settings, 'IMAGE_PIPELINE_ASYNC', True):
+        # Runs inside the upload request: a broken file must not turn it into a 500
+        try:
+            status = 'ready' if render_derivatives(*args) else 'invalid'
+        except Exception as e:
+            logger.error(f"Proof image processing failed for deposit {deposit_request_id}: {e}")
+            status = 'failed'
+        _record_result(deposit_request_id, status)
+        return
+
+    future = get_executor().submit(render_derivatives, *args)
+    future.add_done_callback(lambda f: _on_done(deposit_request_id, f))
+
+
+def _on_done(deposit_request_id, future):
+    # Runs on an executor helper thread, which has its own DB connection
+    try:
+        status = 'ready' if future.result() else 'invalid'
+    except Exception as e:
+        logger.error(f"Proof image processing failed for deposit {deposit_request_id}: {e}")
+        status = 'failed'
+    try:
+        _record_result(deposit_request_id, status)
+    finally:
+        close_old_connections()
+
+
+def _record_result(deposit_request_id, status):
+    from .models import DepositRequest
+
+    DepositRequest.objects.filter(id=deposit_request_id).update(proof_image_status=status)
+    logger.info(f"Proof image for deposit {deposit_request_id} processed: {status}")
+
+
+def schedule_proof_processing(deposit_request):
+    """Queue derivative generation once the deposit request is committed"""
+    if not deposit_request.proof_image:
+        return
+    deposit_request_id = deposit_request.id
+    name = deposit_request.proof_image.name
+    transaction.on_commit(lambda: process_deposit_proof(deposit_request_id, name))
@@ -0,0 +1,174 @@
+"""
+Measure how dashboard reads behave while admin approvals are writing.
+
+Runs against a scratch SQLite file, never the project database. Each mode
+starts from a fresh file: ``default`` uses SQLite's stock settings (rollback
+journal) and ``tuned`` applies ``settings.SQLITE_PRAGMAS``. A writer thread
+repeatedly "approves" a deposit: inside one transaction it flips the
+transaction status, credits the wallet, writes a notification plus an audit
+trail, holds the transaction open for ``--hold-ms`` (the rest of the admin
+request) and commits. Reader threads meanwhile run the dashboard queries.
+"""
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from pipsmade.sqlite_backend.base import get_pragmas, pragma_statements
+
+USERS = 200
+TRANSACTIONS_PER_USER = 25
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def create_schema(path, pragmas):
+    connection = sqlite3.connect(path, isolation_level=None)
+    for statement in pragmas:
+        connection.execute(statement)
+    connection.executescript("""
+        CREATE TABLE tx (id INTEGER PRIMARY KEY, user_id INTEGER, amount REAL, status TEXT, updated_at REAL);
+        CREATE INDEX tx_user ON tx (user_id, updated_at);
+        CREATE TABLE wallet (user_id INTEGER PRIMARY KEY, balance REAL);
+        CREATE TABLE notification (id INTEGER PRIMARY KEY, user_id INTEGER, body TEXT, is_read INTEGER);
+        CREATE INDEX notification_user ON notification (user_id, is_read);
+        CREATE TABLE audit (id INTEGER PRIMARY KEY, tx_id INTEGER, payload TEXT);
+    """)
+    connection.execute('BEGIN')
+    connection.executemany('INSERT INTO wallet VALUES (?, 0)', [(user,) for user in range(USERS)])
+    connection.executemany(
+        'INSERT INTO tx (user_id, amount, status, updated_at) VALUES (?, ?, ?, ?)',
+        [
+            (user, random.uniform(10, 5000), 'pending', time.time())
+            for user in range(USERS) for _ in range(TRANSACTIONS_PER_USER)
+        ],
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark dashboard reads against concurrent admin approvals on SQLite'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Concurrent reader threads')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per mode')
+        parser.add_argument('--hold-ms', type=int, default=150, help='How long each approval keeps its transaction open')
+        parser.add_argument('--audit-rows', type=int, default=2000, help='Audit rows written per approval')
+        parser.add_argument('--modes', default='default,tuned', help='Comma separated: default, tuned')
+
+    def handle(self, *args, **options):
+        modes = {
+            'default': [],
+            'tuned': pragma_statements(get_pragmas()),
+        }
+        for mode in options['modes'].split(','):
+            mode = mode.strip()
+            if mode not in modes:
+                self.stderr.write(f'Unknown mode {mode!r}')
+                continue
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                create_schema(path, modes[mode])
+                result = self.run_mode(path, modes[mode], options)
+            self.report(mode, result)
+
+    def connect(self, path, pragmas):
+        # Same as Django: sqlite3's default 5 second busy handler
+        connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        for statement in pragmas:
+            connection.execute(statement)
+        return connection
+
+    def run_mode(self, path, pragmas, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        result = {'latencies': [], 'read_errors': 0, 'approvals': 0, 'write_errors': 0, 'approval_ms': []}
+        payload = 'x' * 2000
+
+        def reader():
+            connection = self.connect(path, pragmas)
+            latencies, errors = [], 0
+            while not stop.is_set():
+                user = random.randrange(USERS)
+                started = time.perf_counter()
+                try:
+                    connection.execute('SELECT balance FROM wallet WHERE user_id = ?', (user,)).fetchone()
+                    connection.execute(
+                        'SELECT id, amount, status FROM tx WHERE user_id = ? ORDER BY updated_at DESC LIMIT 10', (user,)
+                    ).fetchall()
+                    connection.execute(
+                        'SELECT COUNT(*) FROM notification WHERE user_id = ? AND is_read = 0', (user,)
+                    ).fetchone()
+                    latencies.append((time.perf_counter() - started) * 1000)
+                except sqlite3.OperationalError:
+                    errors += 1
+            connection.close()
+            with lock:
+                result['latencies'].extend(latencies)
+                result['read_errors'] += errors
+
+        def writer():
+            connection = self.connect(path, pragmas)
+            while not stop.is_set():
+                user = random.randrange(USERS)
+                started = time.perf_counter()
+                try:
+                    connection.execute('BEGIN IMMEDIATE')
+                    tx_id, amount = connection.execute(
+                        'SELECT id, amount FROM tx WHERE user_id = ? ORDER BY random() LIMIT 1', (user,)
+                    ).fetchone()
+                    connection.execute("UPDATE tx SET status = 'completed', updated_at = ? WHERE id = ?", (time.time(), tx_id))
+                    connection.execute('UPDATE wallet SET balance = balance + ? WHERE user_id = ?', (amount, user))
+                    connection.execute(
+                        'INSERT INTO notification (user_id, body, is_read) VALUES (?, ?, 0)', (user, 'Deposit approved')
+                    )
+                    connection.executemany(
+                        'INSERT INTO audit (tx_id, payload) VALUES (?, ?)',
+                        [(tx_id, payload)] * options['audit_rows'],
+                    )
+                    time.sleep(options['hold_ms'] / 1000)
+                    connection.execute('COMMIT')
+                    result['approvals'] += 1
+                    result['approval_ms'].append((time.perf_counter() - started) * 1000)
+                except sqlite3.OperationalError:
+                    result['write_errors'] += 1
+                    if connection.in_transaction:
+                        connection.execute('ROLLBACK')
+            connection.close()
+
+        threads = [threading.Thread(target=writer)] + [
+            threading.Thread(target=reader) for _ in range(options['readers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        result['reads'] = len(result['latencies'])
+        result['duration'] = options['duration']
+        return result
+
+    def report(self, mode, result):
+        latencies = result['latencies']
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n{mode}'))
+        self.stdout.write(f"   Approvals:        {result['approvals']} ({result['write_errors']} failed)")
+        if result['approval_ms']:
+            self.stdout.write(f"   Approval p50:     {statistics.median(result['approval_ms']):.1f} ms")
+        self.stdout.write(f"   Reads:            {result['reads']} ({result['reads'] / result['duration']:.0f}/s)")
+        self.stdout.write(f"   Read errors:      {result['read_errors']} (database is locked)")
+        self.stdout.write(f'   Read p50:         {percentile(latencies, 50):.2f} ms')
+        self.stdout.write(f'   Read p95:         {percentile(latencies, 95):.2f} ms')
+        self.stdout.write(f'   Read p99:         {percentile(latencies, 99):.2f} ms')
+        self.stdout.write(f"   Read max:         {max(latencies, default=0):.2f} ms")
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.2 on 2026-10-19 17:47
+
+import pipsmade.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='depositrequest',
+            name='proof_image_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='depositrequest',
+            name='proof_image_size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='depositrequest',
+            name='proof_image',
+            field=pipsmade.storage.ContentAddressedImageField(blank=True, hash_field='proof_image_sha256', help_text='Screenshot of transaction', null=True, size_field='proof_image_size', storage=pipsmade.storage.get_content_addressed_storage, upload_to='deposit_proofs/'),
+        ),
+    ]
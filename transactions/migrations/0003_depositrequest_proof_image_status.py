@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-19 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_depositrequest_proof_image_sha256_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='depositrequest',
+            name='proof_image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Processing'), ('ready', 'Ready'), ('invalid', 'Invalid Image')], help_text='State of the background preview/thumbnail generation', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_depositrequest_proof_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transactionnotification',
+            name='notification_type',
+            field=models.CharField(choices=[('deposit_confirmed', 'Deposit Confirmed'), ('withdrawal_approved', 'Withdrawal Approved'), ('withdrawal_rejected', 'Withdrawal Rejected'), ('withdrawal_completed', 'Withdrawal Completed'), ('transaction_failed', 'Transaction Failed'), ('investment_matured', 'Investment Matured')], max_length=20),
+        ),
+    ]
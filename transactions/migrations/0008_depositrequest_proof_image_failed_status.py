@@ -0,0 +1,18 @@
+# Generated by Django 5.2.2 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0007_notificationcounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='depositrequest',
+            name='proof_image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Processing'), ('ready', 'Ready'), ('invalid', 'Invalid Image'), ('failed', 'Processing Failed')], help_text='State of the background preview/thumbnail generation', max_length=20),
+        ),
+    ]
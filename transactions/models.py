@@ -3,6 +3,7 @@ from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from django.utils import timezone
+from pipsmade.storage import ContentAddressedImageField
 
 class CryptoWallet(models.Model):
     """Admin-managed crypto wallet addresses"""
@@ -128,6 +129,7 @@ class Transaction(models.Model):
             models.Index(fields=['user', 'status']),
             models.Index(fields=['transaction_type', 'status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['user', 'updated_at']),
         ]
 
     def __str__(self):
@@ -186,7 +188,18 @@ class DepositRequest(models.Model):
 
     # Proof of Payment
     transaction_hash = models.CharField(max_length=255, help_text="Blockchain transaction hash")
-    proof_image = models.ImageField(upload_to='deposit_proofs/', null=True, blank=True, help_text="Screenshot of transaction")
+    proof_image = ContentAddressedImageField(
+        upload_to='deposit_proofs/', null=True, blank=True, help_text="Screenshot of transaction",
+        hash_field='proof_image_sha256', size_field='proof_image_size'
+    )
+    proof_image_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    proof_image_size = models.PositiveBigIntegerField(null=True, blank=True)
+    proof_image_status = models.CharField(max_length=20, blank=True, choices=[
+        ('pending', 'Processing'),
+        ('ready', 'Ready'),
+        ('invalid', 'Invalid Image'),
+        ('failed', 'Processing Failed'),
+    ], help_text="State of the background preview/thumbnail generation")
     sender_address = models.CharField(max_length=255, help_text="Address you sent from")
 
     # Admin Review
@@ -204,6 +217,22 @@ class DepositRequest(models.Model):
     def __str__(self):
         return f"Deposit: {self.user.username} - {self.amount} {self.crypto_wallet.crypto_type}"
 
+    def _proof_derivative_url(self, index):
+        if not self.proof_image:
+            return ''
+        if self.proof_image_status != 'ready':
+            return self.proof_image.url
+        from .image_pipeline import derivative_names
+        return self.proof_image.storage.url(derivative_names(self.proof_image.name)[index])
+
+    def get_proof_preview_url(self):
+        """Downscaled proof image for the review page, falls back to the original"""
+        return self._proof_derivative_url(0)
+
+    def get_proof_thumbnail_url(self):
+        """Small proof thumbnail for admin lists, falls back to the original"""
+        return self._proof_derivative_url(1)
+
 class WithdrawalRequest(models.Model):
     """User withdrawal requests"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='withdrawal_requests')
@@ -259,6 +288,7 @@ class TransactionNotification(models.Model):
         ('withdrawal_rejected', 'Withdrawal Rejected'),
         ('withdrawal_completed', 'Withdrawal Completed'),
         ('transaction_failed', 'Transaction Failed'),
+        ('investment_matured', 'Investment Matured'),
     ])
 
     is_read = models.BooleanField(default=False)
@@ -266,6 +296,20 @@ class TransactionNotification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_user_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
+
+
+class NotificationCounter(models.Model):
+    """Denormalized unread notification count, kept in step by transactions.notifications"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread_count = models.PositiveIntegerField(default=0)
+    # Moved on with every notification write; part of the cached tray's key
+    tray_version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} - {self.unread_count} unread"
@@ -0,0 +1,217 @@
+"""
+Notification inbox operations and the per-user notification tray.
+
+Unread counts come from the denormalized NotificationCounter row, which is
+adjusted with F() updates on every write that changes read state. The
+mark-read helpers run their UPDATE and the counter change in one
+transaction; creates and deletes adjust it from their signals, inside the
+caller's transaction when there is one. Code that writes notifications
+without signals (bulk_create) calls ``record_notifications_created``.
+
+The bell dropdown's latest items are cached per user under the counter's
+``tray_version``, which every one of those writes moves on in the same
+UPDATE. The tray reads the counter row first, so a notification created by
+a cron process or another worker shows up on the next page view whatever
+the cache backend.
+"""
+import time
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils.functional import cached_property
+
+from .models import TransactionNotification, NotificationCounter
+
+UNREAD_LIMIT = 10
+RECENT_LIMIT = 5
+TRAY_CACHE_TIMEOUT = 60 * 10
+INBOX_PAGE_SIZE = 20
+INBOX_MAX_PAGE_SIZE = 100
+MARK_READ_MAX_IDS = 1000
+
+TRAY_ITEMS_KEY = 'notifications:tray:{user_id}:{version}'
+
+
+def _items_key(user_id, version):
+    return TRAY_ITEMS_KEY.format(user_id=user_id, version=version)
+
+
+def _count_unread(user_id):
+    return TransactionNotification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def _recount(user_id):
+    count = _count_unread(user_id)
+    NotificationCounter.objects.update_or_create(
+        user_id=user_id,
+        defaults={'unread_count': count, 'tray_version': F('tray_version') + 1},
+        # The clock, so a recreated row never reuses a version still in a cache key
+        create_defaults={'unread_count': count, 'tray_version': time.time_ns()},
+    )
+    return count
+
+
+def _adjust_unread_counts(user_ids, delta, seed=True):
+    """Move the unread count by ``delta`` and the tray version on"""
+    if not user_ids:
+        return
+    updated = NotificationCounter.objects.filter(user_id__in=user_ids).update(
+        unread_count=Greatest(F('unread_count') + delta, Value(0)),
+        tray_version=F('tray_version') + 1,
+    )
+    if seed and updated < len(user_ids):
+        # First write for these users: seed their counters from the table
+        existing = set(NotificationCounter.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        for user_id in set(user_ids) - existing:
+            _recount(user_id)
+
+
+def get_unread_count(user_id):
+    count = NotificationCounter.objects.filter(user_id=user_id).values_list('unread_count', flat=True).first()
+    return _recount(user_id) if count is None else count
+
+
+def notification_created(notification):
+    """Account for a new notification without re-counting"""
+    _adjust_unread_counts([notification.user_id], 0 if notification.is_read else 1)
+
+
+def notification_changed(notification):
+    """A notification saved outside these helpers (e.g. the admin); its old state is unknown"""
+    _recount(notification.user_id)
+
+
+def notification_deleted(notification):
+    # Never seed here: the user may be mid-deletion, taking the counter with it
+    _adjust_unread_counts([notification.user_id], 0 if notification.is_read else -1, seed=False)
+
+
+def record_notifications_created(notifications):
+    """Counterpart of notification_created for bulk_create()"""
+    unread_per_user = Counter()
+    for notification in notifications:
+        unread_per_user[notification.user_id] += not notification.is_read
+    # Users with the same number of new notifications share one UPDATE
+    users_by_count = defaultdict(list)
+    for user_id, count in unread_per_user.items():
+        users_by_count[count].append(user_id)
+    for count, user_ids in users_by_count.items():
+        _adjust_unread_counts(user_ids, count)
+
+
+def mark_notifications_read(user, notification_ids):
+    """Mark the given notifications read with one UPDATE; returns how many changed"""
+    with transaction.atomic():
+        changed = TransactionNotification.objects.filter(
+            user=user, id__in=notification_ids, is_read=False
+        ).update(is_read=True)
+        if changed:
+            _adjust_unread_counts([user.id], -changed)
+    return changed
+
+
+def mark_notification_read(user, notification_id):
+    """Mark one of the user's notifications read; returns False if it does not exist"""
+    if mark_notifications_read(user, [notification_id]):
+        return True
+    return TransactionNotification.objects.filter(id=notification_id, user=user).exists()
+
+
+def mark_all_notifications_read(user):
+    """Mark every unread notification read; returns how many changed"""
+    with transaction.atomic():
+        changed = TransactionNotification.objects.filter(user=user, is_read=False).update(is_read=True)
+        # Subtract rather than zero: a notification created meanwhile stays counted
+        if changed:
+            _adjust_unread_counts([user.id], -changed)
+    return changed
+
+
+def get_inbox_page(user, cursor=None, limit=INBOX_PAGE_SIZE, notification_type=None, unread_only=False):
+    """
+    One page of the user's notifications, newest first.
+
+    Keyset pagination on id (ids follow created_at): pass the returned
+    ``next_cursor`` to continue. Returns (notifications, next_cursor).
+    """
+    limit = max(1, min(limit, INBOX_MAX_PAGE_SIZE))
+    queryset = TransactionNotification.objects.filter(user=user)
+    if notification_type:
+        queryset = queryset.filter(notification_type=notification_type)
+    if unread_only:
+        queryset = queryset.filter(is_read=False)
+    if cursor:
+        queryset = queryset.filter(id__lt=cursor)
+
+    page = list(queryset.order_by('-id')[:limit + 1])
+    next_cursor = page[limit - 1].id if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+class NotificationTray:
+    """Lazily loaded unread/recent notifications for the bell dropdown"""
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def _counter(self):
+        """(unread count, tray version), or (None, None) before the user's first notification write"""
+        counter = NotificationCounter.objects.filter(user=self.user).values_list(
+            'unread_count', 'tray_version'
+        ).first()
+        # Without a version nothing is cached
+        return counter or (None, None)
+
+    @cached_property
+    def _key(self):
+        version = self._counter[1]
+        return None if version is None else _items_key(self.user.id, version)
+
+    @cached_property
+    def _items(self):
+        if not self.user.is_authenticated:
+            return {'unread': [], 'recent': []}
+        items = cache.get(self._key) if self._key else None
+        if items is None:
+            items = {
+                'unread': list(
+                    TransactionNotification.objects.filter(user=self.user, is_read=False)
+                    .order_by('-created_at')[:UNREAD_LIMIT]
+                ),
+            }
+            self._store(items)
+        return items
+
+    def _store(self, items):
+        if self._key:
+            cache.set(self._key, items, TRAY_CACHE_TIMEOUT)
+
+    @cached_property
+    def unread(self):
+        return self._items['unread']
+
+    @cached_property
+    def recent(self):
+        # Only shown when nothing is unread, so it is fetched on first use
+        items = self._items
+        if 'recent' not in items:
+            items['recent'] = list(
+                TransactionNotification.objects.filter(user=self.user).order_by('-created_at')[:RECENT_LIMIT]
+            )
+            self._store(items)
+        return items['recent']
+
+    @cached_property
+    def unread_count(self):
+        if not self.user.is_authenticated:
+            return 0
+        count = self._counter[0]
+        if count is None:
+            # A short unread list is the whole set, so only a long one needs counting
+            unread = self._items['unread']
+            count = len(unread) if len(unread) < UNREAD_LIMIT else _count_unread(self.user.id)
+        return count
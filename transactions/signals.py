@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .events import publish_on_commit, notification_event, transaction_event
+from .models import Transaction, TransactionNotification
+from .notifications import notification_created, notification_changed, notification_deleted
+
+
+@receiver(post_save, sender=TransactionNotification)
+def update_notification_tray(sender, instance, created, **kwargs):
+    """Keep the unread counter and cached tray in step with notification writes"""
+    if created:
+        notification_created(instance)
+    else:
+        notification_changed(instance)
+
+
+@receiver(post_delete, sender=TransactionNotification)
+def drop_notification_tray(sender, instance, **kwargs):
+    notification_deleted(instance)
+
+
+@receiver(post_save, sender=TransactionNotification)
+def push_notification(sender, instance, created, **kwargs):
+    if created:
+        publish_on_commit(instance.user_id, notification_event(instance))
+
+
+@receiver(post_save, sender=Transaction)
+def push_transaction_status(sender, instance, **kwargs):
+    """Streams show the latest status; repeated saves of one status are de-duplicated client side"""
+    publish_on_commit(instance.user_id, transaction_event(instance))
@@ -1,3 +1,208 @@
-from django.test import TestCase
+import tempfile
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from pipsmade.testing import QueryBudgetTestCase
+
+from . import notifications
+from .events import EventCursor
+from .image_pipeline import process_deposit_proof
+from .models import CryptoWallet, DepositRequest, NotificationCounter, Transaction, TransactionNotification
+
+TRANSACTIONS_QUERIES = 9
+ADMIN_TRANSACTIONS_QUERIES = 11
+
+
+class TransactionsQueryBudgetTests(QueryBudgetTestCase):
+    def test_transactions_view(self):
+        self.login(self.investor)
+        self.seed_activity(self.investor, 3)
+        self.assertQueryBudget(
+            '/transactions/', TRANSACTIONS_QUERIES, grow=lambda: self.seed_activity(self.investor, 30)
+        )
+
+    def test_admin_transactions(self):
+        self.login(self.staff)
+        self.seed_activity(self.investor, 3)
+        self.assertQueryBudget(
+            '/transactions/admin/', ADMIN_TRANSACTIONS_QUERIES, grow=lambda: self.seed_activity(self.investor, 60)
+        )
+
+
+class EventEndpointsUnderWSGITests(TestCase):
+    """The test client is a WSGI client: nothing may wait for new events"""
+
+    def setUp(self):
+        # Trays and counters are cached by user id; an earlier test's user may share this one's
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('events@example.com', 'events@example.com', 'pw')
+        self.client.force_login(self.user)
+
+    def notify(self, title):
+        transaction = Transaction.objects.create(
+            user=self.user, transaction_type='deposit', status='pending', amount=Decimal('10'), crypto_type='USDT',
+        )
+        return TransactionNotification.objects.create(
+            user=self.user, transaction=transaction, title=title, message='Received',
+            notification_type='deposit_confirmed',
+        )
+
+    def test_stream_returns_pending_events_at_once(self):
+        cursor = EventCursor.initial(self.user.id)
+        notification = self.notify('Deposit received')
+
+        with self.settings(EVENT_STREAM_MAX_SECONDS=60):
+            response = self.client.get('/transactions/events/stream/', HTTP_LAST_EVENT_ID=str(cursor))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        body = response.content.decode()
+        self.assertIn('retry: 15000', body)
+        self.assertIn(f'"id": {notification.id}', body)
+        self.assertTrue(body.rstrip().endswith(': keepalive'))
+
+    def test_poll_does_not_wait(self):
+        cursor = EventCursor.initial(self.user.id)
+
+        with self.settings(EVENT_LONG_POLL_TIMEOUT=60):
+            response = self.client.get('/transactions/events/poll/', {'cursor': str(cursor)})
+
+        self.assertEqual(response.json()['events'], [])
+        notification = self.notify('Deposit received')
+        response = self.client.get('/transactions/events/poll/', {'cursor': response.json()['cursor']})
+        delivered = [event['id'] for event in response.json()['events'] if event['type'] == 'notification']
+        self.assertEqual(delivered, [notification.id])
+
+
+class NotificationCounterTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('counter@example.com', 'counter@example.com', 'pw')
+        self.transaction = Transaction.objects.create(
+            user=self.user, transaction_type='deposit', status='completed', amount=Decimal('10'), crypto_type='USDT',
+        )
+
+    def notify(self, count, **fields):
+        return [
+            TransactionNotification.objects.create(
+                user=self.user, transaction=self.transaction, title=f'Deposit {index}', message='Confirmed',
+                notification_type='deposit_confirmed', **fields
+            )
+            for index in range(count)
+        ]
+
+    def assertCounterMatchesTable(self):
+        unread = TransactionNotification.objects.filter(user=self.user, is_read=False).count()
+        self.assertEqual(NotificationCounter.objects.get(user=self.user).unread_count, unread)
+        self.assertEqual(notifications.get_unread_count(self.user.id), unread)
+        return unread
+
+    def test_counter_follows_create_mark_read_and_mark_all(self):
+        created = self.notify(5) + self.notify(2, is_read=True)
+        self.assertEqual(self.assertCounterMatchesTable(), 5)
+
+        self.assertEqual(notifications.mark_notifications_read(self.user, [created[0].id, created[1].id]), 2)
+        self.assertEqual(self.assertCounterMatchesTable(), 3)
+        # Already read: nothing changes twice
+        self.assertEqual(notifications.mark_notifications_read(self.user, [created[0].id, created[6].id]), 0)
+        self.assertTrue(notifications.mark_notification_read(self.user, created[2].id))
+        self.assertEqual(self.assertCounterMatchesTable(), 2)
+
+        self.assertEqual(notifications.mark_all_notifications_read(self.user), 2)
+        self.assertEqual(self.assertCounterMatchesTable(), 0)
+        self.notify(1)
+        self.assertEqual(self.assertCounterMatchesTable(), 1)
+
+    def test_bulk_created_notifications_are_counted(self):
+        self.notify(1)
+        created = TransactionNotification.objects.bulk_create([
+            TransactionNotification(
+                user=self.user, transaction=self.transaction, title='Bulk', message='Confirmed',
+                notification_type='deposit_confirmed', is_read=index == 0,
+            )
+            for index in range(4)
+        ])
+        notifications.record_notifications_created(created)
+        self.assertEqual(self.assertCounterMatchesTable(), 4)
+
+        created[1].delete()
+        self.assertEqual(self.assertCounterMatchesTable(), 3)
+
+    def test_tray_sees_writes_that_left_its_cache_alone(self):
+        self.notify(1)
+        tray = notifications.NotificationTray(self.user)
+        self.assertEqual((tray.unread_count, len(tray.unread)), (1, 1))
+        old_key = notifications._items_key(self.user.id, NotificationCounter.objects.get(user=self.user).tray_version)
+        self.assertIsNotNone(caches['default'].get(old_key))
+
+        # As a cron process would: new rows and counters, nothing deleted from this cache
+        created = TransactionNotification.objects.bulk_create([
+            TransactionNotification(
+                user=self.user, transaction=self.transaction, title='Matured', message='Completed',
+                notification_type='investment_matured',
+            )
+        ])
+        notifications.record_notifications_created(created)
+        self.assertIsNotNone(caches['default'].get(old_key))
+
+        tray = notifications.NotificationTray(self.user)
+        self.assertEqual((tray.unread_count, len(tray.unread)), (2, 2))
+        self.assertEqual(tray.unread[0].title, 'Matured')
+
+    def test_mark_read_view_requires_a_list_of_integers(self):
+        created = self.notify(3)
+        self.client.force_login(self.user)
+        url = '/transactions/notifications/mark-read/'
+
+        for ids in ['123', 12, [str(created[0].id)], [True]]:
+            response = self.client.post(url, {'ids': ids}, content_type='application/json')
+            self.assertEqual(response.status_code, 400, ids)
+        self.assertEqual(self.assertCounterMatchesTable(), 3)
+
+        response = self.client.post(url, {'ids': [created[0].id]}, content_type='application/json')
+        self.assertEqual(response.json(), {'success': True, 'updated': 1, 'unread_count': 2})
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), IMAGE_PIPELINE_ASYNC=False)
+class DepositProofPipelineTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('proof@example.com', 'proof@example.com', 'pw')
+        wallet = CryptoWallet.objects.create(crypto_type='USDT', wallet_address='USDT-address', network='TRC-20')
+        transaction = Transaction.objects.create(
+            user=user, transaction_type='deposit', status='pending', amount=Decimal('10'), crypto_type='USDT',
+        )
+        self.deposit = DepositRequest.objects.create(
+            user=user, transaction=transaction, crypto_wallet=wallet, amount=Decimal('10'),
+            transaction_hash='hash', sender_address='sender', proof_image_status='ready',
+            proof_image=SimpleUploadedFile('proof.png', b'not really a png', content_type='image/png'),
+        )
+
+    def test_processing_error_marks_the_proof_failed(self):
+        with mock.patch('transactions.image_pipeline.render_derivatives', side_effect=OSError('disk full')):
+            process_deposit_proof(self.deposit.id, self.deposit.proof_image.name)
+        self.deposit.refresh_from_db()
+        self.assertEqual(self.deposit.proof_image_status, 'failed')
+
+    def test_invalid_image_is_marked_invalid(self):
+        process_deposit_proof(self.deposit.id, self.deposit.proof_image.name)
+        self.deposit.refresh_from_db()
+        self.assertEqual(self.deposit.proof_image_status, 'invalid')
+        # Without derivatives the original is served
+        self.assertEqual(self.deposit.get_proof_thumbnail_url(), self.deposit.proof_image.url)
+
+    def test_admin_replacing_the_image_schedules_processing(self):
+        self.deposit.proof_image = SimpleUploadedFile('new.png', b'another file', content_type='image/png')
+        form = mock.Mock(changed_data=['proof_image'])
+        with self.captureOnCommitCallbacks() as callbacks:
+            site._registry[DepositRequest].save_model(None, self.deposit, form, change=True)
+        self.deposit.refresh_from_db()
+        self.assertEqual(self.deposit.proof_image_status, 'pending')
+        self.assertEqual(len(callbacks), 1)
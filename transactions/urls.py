@@ -13,6 +13,10 @@ urlpatterns = [
     path('admin/withdrawal/<int:withdrawal_id>/process/', views.admin_process_withdrawal, name='admin_process_withdrawal'),
     
     # Notification URLs
+    path('notifications/', views.notification_inbox, name='notification_inbox'),
+    path('notifications/mark-read/', views.mark_notifications_read, name='mark_notifications_read'),
     path('notifications/mark-read/<int:notification_id>/', views.mark_notification_read, name='mark_notification_read'),
     path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
+    path('events/stream/', views.event_stream, name='event_stream'),
+    path('events/poll/', views.event_poll, name='event_poll'),
 ]
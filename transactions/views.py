@@ -2,20 +2,28 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.views.decorators.http import require_GET, require_POST
+from asgiref.sync import sync_to_async
 from django.core.paginator import Paginator
 from django.db.models import Q, Sum
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
+import json
 from .models import (
     CryptoWallet, UserWallet, Transaction,
     DepositRequest, WithdrawalRequest, TransactionNotification
 )
 from .forms import DepositForm, WithdrawalForm
 from .email_notifications import send_deposit_notification, send_withdrawal_notification
+from . import events, notifications
+from .image_pipeline import schedule_proof_processing
+from pipsmade.db_router import use_read_replica
 
 @login_required
+@use_read_replica
 def transactions_view(request):
     """Main transactions page showing history and options"""
     # Get user's transactions
@@ -104,9 +112,13 @@ def deposit_view(request):
                 amount=amount,
                 transaction_hash=transaction_hash,
                 sender_address=sender_address,
-                proof_image=proof_image
+                proof_image=proof_image,
+                proof_image_status='pending' if proof_image else ''
             )
 
+            # Verify, strip EXIF and generate WebP previews in the background
+            schedule_proof_processing(deposit_request)
+
             # Send admin notification email using the simple email system
             try:
                 send_deposit_notification(deposit_request)
@@ -246,6 +258,7 @@ def withdrawal_view(request):
     return render(request, 'dashboard/withdraw.html', context)
 
 @login_required
+@use_read_replica
 def transaction_detail(request, transaction_id):
     """View detailed information about a specific transaction"""
     transaction = get_object_or_404(Transaction, id=transaction_id, user=request.user)
@@ -264,7 +277,10 @@ def admin_transactions(request):
     print(f"DEBUG: Request method: {request.method}")
     print(f"DEBUG: Request GET params: {request.GET}")
     
-    transactions = Transaction.objects.all().order_by('-created_at')
+    # The list shows each row's user and approve/process link
+    transactions = Transaction.objects.select_related(
+        'user', 'deposit_request', 'withdrawal_request'
+    ).order_by('-created_at')
 
     # Filter by status
     status = request.GET.get('status')
@@ -552,26 +568,84 @@ def admin_process_withdrawal(request, withdrawal_id):
 
     return render(request, 'transactions/admin_process_withdrawal.html', context)
 
+def serialize_notification(notification):
+    return {
+        'id': notification.id,
+        'title': notification.title,
+        'message': notification.message,
+        'notification_type': notification.notification_type,
+        'is_read': notification.is_read,
+        'transaction_id': notification.transaction_id,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+@login_required
+@require_GET
+def notification_inbox(request):
+    """JSON inbox with cursor pagination, filterable by notification_type and unread"""
+    notification_type = request.GET.get('type') or None
+    valid_types = dict(TransactionNotification._meta.get_field('notification_type').choices)
+    if notification_type and notification_type not in valid_types:
+        return JsonResponse({'error': f'Unknown notification type: {notification_type}'}, status=400)
+    try:
+        cursor = int(request.GET['cursor']) if request.GET.get('cursor') else None
+        limit = int(request.GET.get('limit', notifications.INBOX_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({'error': 'cursor and limit must be integers'}, status=400)
+
+    page, next_cursor = notifications.get_inbox_page(
+        request.user,
+        cursor=cursor,
+        limit=limit,
+        notification_type=notification_type,
+        unread_only=request.GET.get('unread') in ('1', 'true'),
+    )
+    return JsonResponse({
+        'results': [serialize_notification(notification) for notification in page],
+        'next_cursor': next_cursor,
+        'unread_count': notifications.get_unread_count(request.user.id),
+    })
+
+@login_required
+@require_POST
+def mark_notifications_read(request):
+    """Bulk mark-read: ids from a JSON body {"ids": [...]} or repeated ``ids`` form fields"""
+    if request.content_type == 'application/json':
+        try:
+            ids = json.loads(request.body or b'{}').get('ids', [])
+        except (ValueError, AttributeError):
+            return JsonResponse({'success': False, 'message': 'Invalid JSON body'}, status=400)
+        # A string would otherwise be iterated digit by digit
+        if not isinstance(ids, list) or not all(type(notification_id) is int for notification_id in ids):
+            return JsonResponse({'success': False, 'message': 'ids must be a list of integers'}, status=400)
+    else:
+        ids = request.POST.getlist('ids')
+    try:
+        ids = [int(notification_id) for notification_id in ids][:notifications.MARK_READ_MAX_IDS]
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'ids must be integers'}, status=400)
+
+    updated = notifications.mark_notifications_read(request.user, ids) if ids else 0
+    return JsonResponse({
+        'success': True,
+        'updated': updated,
+        'unread_count': notifications.get_unread_count(request.user.id),
+    })
+
 @login_required
 def mark_notification_read(request, notification_id):
     """Mark a single notification as read"""
     try:
-        notification = TransactionNotification.objects.get(
-            id=notification_id,
-            user=request.user
-        )
-        notification.is_read = True
-        notification.save()
-        
+        if not notifications.mark_notification_read(request.user, notification_id):
+            return JsonResponse({
+                'success': False,
+                'message': 'Notification not found'
+            }, status=404)
+
         return JsonResponse({
             'success': True,
             'message': 'Notification marked as read'
         })
-    except TransactionNotification.DoesNotExist:
-        return JsonResponse({
-            'success': False,
-            'message': 'Notification not found'
-        }, status=404)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -582,10 +656,7 @@ def mark_notification_read(request, notification_id):
 def mark_all_notifications_read(request):
     """Mark all user notifications as read"""
     try:
-        TransactionNotification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).update(is_read=True)
+        notifications.mark_all_notifications_read(request.user)
         
         return JsonResponse({
             'success': True,
@@ -596,3 +667,40 @@ def mark_all_notifications_read(request):
             'success': False,
             'message': str(e)
         }, status=500)
+
+
+async def event_stream(request):
+    """Server-sent events: new notifications and transaction status changes"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    cursor = events.EventCursor.parse(request.headers.get('Last-Event-ID') or request.GET.get('cursor'))
+    if cursor is None:
+        cursor = await sync_to_async(events.EventCursor.initial)(user.id)
+
+    if events.served_over_asgi(request):
+        response = StreamingHttpResponse(events.stream_events(user.id, cursor), content_type='text/event-stream')
+    else:
+        body = await sync_to_async(events.snapshot_events)(user.id, cursor)
+        response = HttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def event_poll(request):
+    """Long-poll fallback for clients without EventSource"""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    cursor = events.EventCursor.parse(request.GET.get('cursor'))
+    if cursor is None:
+        cursor = await sync_to_async(events.EventCursor.initial)(user.id)
+
+    # Under WSGI a waiting poll pins a worker thread; answer at once instead
+    timeout = getattr(settings, 'EVENT_LONG_POLL_TIMEOUT', 25) if events.served_over_asgi(request) else 0
+    new_events, cursor = await events.wait_for_events(user.id, cursor, timeout)
+    return JsonResponse({'events': new_events, 'cursor': str(cursor)})
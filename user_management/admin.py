@@ -5,7 +5,8 @@ from django.contrib import messages
 from django.urls import path
 from django.template.response import TemplateResponse
 from django.utils import timezone
-from investments.models import UserPortfolio, UserInvestment, InvestmentPlan
+from investments.models import UserPortfolio, UserInvestment, InvestmentPlan, ManualProfit
+from investments.portfolio import recompute_user_portfolio
 from .models import UserManagementProxy
 
 User = get_user_model()
@@ -106,25 +107,8 @@ class UserManagementAdmin(admin.ModelAdmin):
                         messages.error(request, f'Error creating investment: {str(e)}')
                         return redirect('admin:user_management_usermanagementproxy_changelist')
                     
-                    # Update user portfolio
-                    portfolio, created = UserPortfolio.objects.get_or_create(
-                        user=user,
-                        defaults={
-                            'total_invested': amount,
-                            'total_current_value': amount,
-                            'total_profit': 0,
-                            'total_roi_percentage': 0,
-                            'total_withdrawable': amount,
-                            'active_investments': 1
-                        }
-                    )
-                    
-                    if not created:
-                        portfolio.total_invested += amount
-                        portfolio.total_current_value += amount
-                        portfolio.total_withdrawable += amount
-                        portfolio.active_investments += 1
-                        portfolio.save()
+                    # Rebuild the portfolio from the user's investments
+                    recompute_user_portfolio(user)
                     
                     return redirect('admin:user_management_usermanagementproxy_changelist')
                     
@@ -159,31 +143,14 @@ class UserManagementAdmin(admin.ModelAdmin):
                     user = User.objects.get(id=user_id)
                     profit_amount = Decimal(profit_amount)
                     
-                    # Get or create user portfolio
-                    portfolio, created = UserPortfolio.objects.get_or_create(
+                    # Record the profit and rebuild the portfolio from its sources
+                    ManualProfit.objects.create(
                         user=user,
-                        defaults={
-                            'total_invested': 0,
-                            'total_current_value': profit_amount,
-                            'total_profit': profit_amount,
-                            'total_roi_percentage': 0,
-                            'total_withdrawable': profit_amount,
-                            'active_investments': 0,
-                            'manual_profit_total': profit_amount
-                        }
+                        amount=profit_amount,
+                        description=(notes or f'{profit_type or "Manual"} profit')[:255],
+                        given_by=request.user,
                     )
-                    
-                    if not created:
-                        portfolio.total_profit += profit_amount
-                        portfolio.total_current_value += profit_amount
-                        portfolio.total_withdrawable += profit_amount
-                        portfolio.manual_profit_total += profit_amount
-                        
-                        # Recalculate ROI if there are investments
-                        if portfolio.total_invested > 0:
-                            portfolio.total_roi_percentage = (portfolio.total_profit / portfolio.total_invested) * 100
-                        
-                        portfolio.save()
+                    recompute_user_portfolio(user)
                     
                     # Create a transaction record for the profit
                     Transaction.objects.create(